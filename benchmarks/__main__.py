@@ -0,0 +1,36 @@
+"""
+Run the Poogle benchmarks and report timings, throughput and peak memory.
+
+    $ python -m benchmarks [--suite parse|startup] [--sizes 10,50,100] [--min-time 0.5] [--runs 10]
+"""
+import argparse
+
+from benchmarks import bench_parse, bench_startup
+from benchmarks.fixtures import SIZES
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the Poogle benchmarks')
+    parser.add_argument('--suite', choices=['parse', 'startup'], action='append',
+                        help='Benchmark suite to run, may be repeated. Defaults to every suite')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in SIZES),
+                        help='Comma separated results per page sizes to benchmark')
+    parser.add_argument('--min-time', type=float, default=0.5,
+                        help='Minimum number of seconds to spend timing each benchmark')
+    parser.add_argument('--runs', type=int, default=10,
+                        help='Number of times to run each command in the startup suite')
+    args = parser.parse_args()
+    suites = args.suite or ['parse', 'startup']
+
+    if 'parse' in suites:
+        sizes = [int(s) for s in args.sizes.split(',')]
+        for result in bench_parse.run(sizes, args.min_time):
+            print(result)
+
+    if 'startup' in suites:
+        for result in bench_startup.run(args.runs):
+            print(result)
+
+
+if __name__ == '__main__':
+    main()
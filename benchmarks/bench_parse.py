@@ -0,0 +1,91 @@
+"""
+Benchmarks of the search results page parsing pipeline.
+"""
+import logging
+
+import poogle
+from poogle import containers, parsers
+
+from benchmarks.fixtures import SIZES, FakeSession, search_page
+from benchmarks.runner import benchmark
+
+
+class PoogleStub(object):
+    """
+    The parent Poogle attributes read by the containers.
+    """
+    query  = 'test'
+    strict = False
+
+
+def bench_results_page(html, parser):
+    """
+    PoogleResultsPage construction, including the parser backend.
+    """
+    stub = PoogleStub()
+    return lambda: containers.PoogleResultsPage(stub, parser.parse(html))
+
+
+def bench_parse_result(html):
+    """
+    PoogleResult.from_link for every result on a page, excluding the parser backend.
+    """
+    page = containers.PoogleResultsPage(PoogleStub(), parsers.get_parser().parse(html))
+    links = parsers.get_parser().parse(html).results
+
+    def run():
+        for title, href in links:
+            containers.PoogleResult.from_link(page, title, href)
+
+    return run
+
+
+def bench_total_results(html):
+    """
+    Total results count parsing.
+    """
+    page = containers.PoogleResultsPage(PoogleStub(), parsers.get_parser().parse(html))
+    stats = parsers.get_parser().parse(html).stats
+
+    def run():
+        page._parsed = parsers.ParsedPage(stats=stats)
+        page._parse_total_results_count()
+
+    return run
+
+
+def bench_google_search(html, results):
+    """
+    google_search end to end, against a transport serving the same page for every request.
+    """
+    session = FakeSession(html)
+    return lambda: poogle.google_search('test', results, pause=0, session=session)
+
+
+def run(sizes=SIZES, min_time=0.5):
+    """
+    Run every parsing benchmark.
+
+    Args:
+        sizes(iterable[int]):   The results per page sizes to benchmark.
+        min_time(float):        The minimum number of seconds to spend timing each benchmark.
+
+    Yields:
+        benchmarks.runner.BenchmarkResult
+    """
+    # Benchmark parsing, not log formatting
+    logging.getLogger('poogle').setLevel(logging.WARNING)
+
+    for size in sizes:
+        html = search_page(size)
+
+        for name in sorted(parsers.PARSERS):
+            yield benchmark('PoogleResultsPage[{p}, {n}]'.format(p=name, n=size),
+                            bench_results_page(html, parsers.get_parser(name)), min_time=min_time)
+
+        yield benchmark('PoogleResult.from_link[{n}]'.format(n=size), bench_parse_result(html), min_time=min_time)
+        yield benchmark('_parse_total_results_count[{n}]'.format(n=size), bench_total_results(html), min_time=min_time)
+
+        # Three pages worth of results, so pagination is included
+        yield benchmark('google_search[{n}]'.format(n=size), bench_google_search(html, size * 3),
+                        pages=3, min_time=min_time)
@@ -0,0 +1,71 @@
+"""
+Benchmarks of the command line utility startup time.
+"""
+import subprocess
+import sys
+import time
+
+# Run the CLI the same way the console script does, then report which heavy dependencies ended up imported
+SCRIPT = '''
+import sys
+from poogle.cli import cli
+try:
+    cli(sys.argv[1:], prog_name='poogle')
+except SystemExit:
+    pass
+heavy = ('requests', 'bs4', 'yurl', 'lxml', 'aiohttp')
+sys.stderr.write(','.join(m for m in heavy if m in sys.modules))
+'''
+
+COMMANDS = (
+    ['--version'],
+    ['--help'],
+    ['search', '--help'],
+)
+
+
+def startup_time(args, runs=10):
+    """
+    Time the command line utility from process start to exit.
+
+    Args:
+        args(list[str]):    The command line arguments.
+        runs(int):          The number of times to run the command.
+
+    Returns:
+        tuple(float, str):  The mean number of seconds per run, and the heavy dependencies that were imported.
+    """
+    elapsed = 0.0
+    imported = ''
+    for __ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, '-c', SCRIPT] + args, stdout=subprocess.DEVNULL,
+                                 stderr=subprocess.PIPE, check=True)
+        elapsed += time.perf_counter() - start
+        imported = process.stderr.decode('utf-8')
+
+    return elapsed / runs, imported
+
+
+def run(runs=10):
+    """
+    Run every startup benchmark.
+
+    Args:
+        runs(int):  The number of times to run each command.
+
+    Yields:
+        str
+    """
+    # The bare interpreter startup time, for reference
+    start = time.perf_counter()
+    for __ in range(runs):
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    baseline = (time.perf_counter() - start) / runs
+    yield '{name:<45} {ms:>10.3f} ms'.format(name='python -c pass', ms=baseline * 1000)
+
+    for args in COMMANDS:
+        elapsed, imported = startup_time(args, runs)
+        yield '{name:<45} {ms:>10.3f} ms   imports: {i}'.format(
+            name='poogle ' + ' '.join(args), ms=elapsed * 1000, i=imported or 'none'
+        )
@@ -0,0 +1,85 @@
+"""
+Synthetic search results pages for benchmarking, modelled on the markup of tests/html/test.html.
+"""
+
+RESULT_TEMPLATE = (
+    '<li class="g"><h3 class="r"><a href="/url?q=http://www.example{n}.com/page/{n}/&amp;sa=U&amp;ved=0ahUKEwih9pW8'
+    'prLJAhXG1CYKHfelCsEQFggUMAA&amp;usg=AFQjCNGXsvN-v4izEgZFzfJ69ibVmskIvg">Example result number {n} - The '
+    '<b>Test</b> Page</a></h3><div class="s"><div class="kv" style="margin-bottom:2px"><cite>www.example{n}.com/'
+    'page/{n}/</cite><div class="_nBb"><div style="display:inline" tabindex="0"><span class="_O0"></span></div>'
+    '<div class="am-dropdown-menu" role="menu" style="display:none" tabindex="-1"><ul><li class="_Ykb">'
+    '<a class="_Zkb" href="/url?q=http://webcache.googleusercontent.com/search%3Fq%3Dcache:M47_v0xF3m8J:'
+    'http://www.example{n}.com/&amp;sa=U&amp;ved=0ahUKEwih9pW8prLJAhXG1CYKHfelCsEQIAgXMAA">Cached</a></li>'
+    '<li class="_Ykb"><a class="_Zkb" href="/search?ie=UTF-8&amp;q=related:www.example{n}.com/+test&amp;tbo=1">'
+    'Similar</a></li></ul></div></div></div><span class="st">A synthetic search result snippet for result {n}, '
+    'describing the <b>test</b> page<br>\nin about as much detail as a real search result would.</span><br></div>'
+    '</li>'
+)
+
+PAGE_TEMPLATE = (
+    '<!doctype html><html><head><meta content="text/html; charset=utf-8" http-equiv="Content-Type">'
+    '<title>test - Google Search</title><style>{padding}</style></head><body><div id="gbar"><nobr>Search Images '
+    'Maps Play YouTube News Gmail Drive More</nobr></div><div id="mn"><table><tr><td id="leftnav"></td><td>'
+    '<div id="resultStats">About {total:,} results</div><div id="res"><div id="topstuff"></div><div id="search">'
+    '<div id="ires"><ol>{results}</ol></div></div></div><div id="foot"><table align="center" id="nav"><tr '
+    'valign="top"><td align="left" class="b"><b></b></td><td><b>1</b></td>{pages}</tr></table></div></td></tr>'
+    '</table></div></body></html>'
+)
+
+PAGE_LINK_TEMPLATE = '<td><a class="fl" href="/search?q=test&amp;num={num}&amp;start={start}&amp;sa=N">{page}</a></td>'
+
+#: The results per page sizes benchmarked by default
+SIZES = (10, 50, 100)
+
+
+def search_page(results=10, total=2390000000):
+    """
+    Build a synthetic search results page.
+
+    Args:
+        results(int):   The number of search results on the page.
+        total(int):     The total results count reported by the page.
+
+    Returns:
+        bytes
+    """
+    pages = ''.join(PAGE_LINK_TEMPLATE.format(num=results, start=results * (i - 1), page=i) for i in range(2, 11))
+    html = PAGE_TEMPLATE.format(
+        padding='.g{margin:0}' * 500,
+        total=total,
+        results=''.join(RESULT_TEMPLATE.format(n=n) for n in range(results)),
+        pages=pages
+    )
+
+    return html.encode('utf-8')
+
+
+class FakeResponse(object):
+    """
+    Minimal requests.Response stand in.
+    """
+    status_code = 200
+
+    def __init__(self, url, content):
+        self.url     = url
+        self.content = content
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession(object):
+    """
+    requests.Session stand in that serves the same page for every request, to benchmark without network access.
+    """
+    def __init__(self, content):
+        self.content  = content
+        self.requests = 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        return FakeResponse(url, self.content)
+
+    def close(self):
+        pass
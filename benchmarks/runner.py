@@ -0,0 +1,73 @@
+"""
+Timing and peak memory measurement helpers shared by the benchmarks.
+"""
+import gc
+import time
+import tracemalloc
+
+
+class BenchmarkResult(object):
+
+    def __init__(self, name, iterations, elapsed, pages, peak_memory):
+        """
+        Args:
+            name(str):          The benchmark name.
+            iterations(int):    The number of times the benchmark was run.
+            elapsed(float):     The total number of seconds taken by every iteration.
+            pages(int):         The number of search results pages processed by each iteration.
+            peak_memory(int):   The peak number of bytes allocated during a single iteration.
+        """
+        self.name        = name
+        self.iterations  = iterations
+        self.elapsed     = elapsed
+        self.pages       = pages
+        self.peak_memory = peak_memory
+
+    @property
+    def per_iteration(self):
+        return self.elapsed / self.iterations
+
+    @property
+    def pages_per_second(self):
+        return (self.pages * self.iterations) / self.elapsed
+
+    def __str__(self):
+        return '{name:<45} {ms:>10.3f} ms {pps:>12.1f} pages/s {peak:>10.1f} KiB peak'.format(
+            name=self.name, ms=self.per_iteration * 1000, pps=self.pages_per_second, peak=self.peak_memory / 1024.0
+        )
+
+
+def benchmark(name, func, pages=1, min_time=0.5):
+    """
+    Time a benchmark function, running it repeatedly for at least min_time seconds, and measure its peak memory use.
+    Peak memory is measured with tracemalloc, so it only covers allocations made through the Python allocator, and
+    not those made internally by C libraries such as libxml2.
+
+    Args:
+        name(str):          The benchmark name.
+        func(callable):     The benchmark function, called without arguments.
+        pages(int):         The number of search results pages processed by each call.
+        min_time(float):    The minimum number of seconds to spend timing the benchmark.
+
+    Returns:
+        BenchmarkResult
+    """
+    # Warm up, then measure the peak memory of a single call separately so tracing doesn't skew the timings
+    func()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    iterations = 0
+    elapsed = 0.0
+    while elapsed < min_time:
+        start = time.perf_counter()
+        func()
+        elapsed += time.perf_counter() - start
+        iterations += 1
+
+    return BenchmarkResult(name, iterations, elapsed, pages, peak_memory)
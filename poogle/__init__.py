@@ -1,12 +1,24 @@
 import logging
+import threading
 from time import sleep
 
-import requests
-from requests.utils import quote
-from bs4 import BeautifulSoup
-
-from poogle.errors import PoogleRequestError, PoogleNoMoreResultsError
-from poogle.containers import PoogleResultsPage
+try:
+    from urllib.parse import quote
+except ImportError:  # pragma: no cover
+    from urllib import quote
+
+from poogle.errors import PoogleRequestError, PoogleNoMoreResultsError, PoogleNoResultsError, PoogleThrottledError, \
+    PoogleTimeoutError, PoogleDeadlineError, PoogleMaxQueriesError
+from poogle.containers import PoogleResultsPage, PoogleResultList
+from poogle.dedup import create_dedup_index
+from poogle.parsers import get_parser
+from poogle.parallel import parse_page_record
+from poogle.planner import DEFAULT_SKIP_RATE, QueryPlan, plan_search
+from poogle.session import create_session, get_shared_session
+from poogle.ratelimit import IntervalLimiter, get_default_limiter
+from poogle.retention import PageStore, ResultsView
+from poogle.retry import THROTTLE_STATUSES, parse_retry_after, is_captcha
+from poogle.stats import PageStats, SearchStats, timer
 
 __author__     = "Makoto Fujimoto"
 __copyright__  = 'Copyright 2015, Makoto Fujimoto'
@@ -19,6 +31,12 @@ class Poogle(object):
 
     SEARCH_URL = 'https://www.google.com/search?q='
 
+    # Seconds to wait to connect, and then between bytes received, before giving up on a page request
+    TIMEOUT = (10.0, 30.0)
+
+    # Bytes read at a time when downloading a page against a deadline
+    CHUNK_SIZE = 65536
+
     def __init__(self, query, per_page=10, start_page=1, lazy=True, **kwargs):
         """
         Args:
@@ -28,6 +46,42 @@ class Poogle(object):
             lazy(bool):         Don't execute the query until results are requested. Defaults to True.
             **kwargs:           Arbitrary keyword arguments, refer to the documentation for more information.
 
+        Keyword Args:
+            strict(bool):               Raise errors on non-critical parsing failures. Defaults to False.
+            session(requests.Session):  The HTTP session to execute queries with.
+            shared_session(bool):       Use the process-wide pooled session instead of creating a new one.
+            timeout(float|tuple):       Seconds to wait to connect and between bytes received, either for both or as a
+                                        (connect, read) tuple. Defaults to Poogle.TIMEOUT, (None, None) waits forever.
+            deadline(float):            The poogle.stats.timer() value every page request must complete by. Requests
+                                        in flight past it are abandoned with a PoogleDeadlineError.
+            limiter(object):            A rate limiter whose acquire() method is called before every request, with
+                                        the seconds left until the deadline as its timeout if there is one.
+                                        Defaults to the process-wide limiter, see poogle.ratelimit, and None
+                                        disables rate limiting. Wrap it in a poogle.retry.CircuitBreaker to pause
+                                        every search sharing it while throttled.
+            retry(poogle.retry.RetryPolicy):    Retry failed and throttled page requests with exponential backoff.
+                                                Failed requests are not retried by default.
+            coalescer(poogle.coalesce.RequestCoalescer):    Share the parsed page between identical page requests
+                                                            made at the same time by every search using it.
+            coalesce_timeout(float):    The number of seconds to wait on an identical page request in flight.
+                                        Defaults to the coalescer timeout.
+            cache(poogle.cache.ResponseCache):  Serve repeated page requests from this cache.
+            archive(poogle.archive.PageArchive):    Record the raw content of every page fetched from the network, so
+                                                    it can be replayed or re-parsed later.
+            parser(str|object):         The HTML parser backend, see poogle.parsers. Defaults to the fastest available.
+            keep_html(bool):            Keep the raw HTML of every page on PoogleResultsPage.html. Defaults to False.
+            prefetch(bool):             Start fetching the next page in the background as soon as a page has been
+                                        parsed. Defaults to False.
+            stats(poogle.stats.SearchStats):    Accumulate page statistics into this object, so they can be shared
+                                                between searches. Available as Poogle.stats.
+            observers(list[callable]):  Called with the poogle.stats.PageStats of every page once it is parsed.
+            keep_pages(int):            The number of most recent pages to keep in memory. Defaults to every page.
+            spill_pages(bool):          Spill pages beyond keep_pages to a temporary file instead of dropping them.
+                                        Defaults to False.
+            parse_executor(concurrent.futures.Executor):    Parse pages in this executor, usually a process pool
+                                                            shared between searches, see poogle.parallel.
+            sink(poogle.sinks.ResultSink):  Stream the results of every page into this sink as it is parsed.
+
         Raises:
             ValueError: Raised if the supplied per_page argument is less than 1 or greater than 100
         """
@@ -44,45 +98,344 @@ class Poogle(object):
         self._query_count  = 0
         self.total_results = 0
 
-        self._results      = []
+        self._results      = PageStore(self, kwargs.get('keep_pages'), kwargs.get('spill_pages', False))
         self._current_page = start_page - 1
+        self._exhausted    = False
         self.last          = None
 
         self.strict = kwargs.get('strict', False)
 
+        # Reuse pooled keep-alive connections between pages instead of connecting for every request
+        self._owns_session = False
+        self._session      = kwargs.get('session')
+        if self._session is None:
+            self._session, self._owns_session = self._create_session(kwargs)
+
+        self._timeout  = kwargs.get('timeout') or self.TIMEOUT
+        self._deadline = kwargs.get('deadline')
+
+        # Only a missing limiter falls back on the process-wide one, so passing None disables rate limiting
+        self._limiter = kwargs.get('limiter', get_default_limiter())
+
+        self._retry = kwargs.get('retry')
+
+        self._coalescer        = kwargs.get('coalescer')
+        self._coalesce_timeout = kwargs.get('coalesce_timeout')
+
+        self._cache   = kwargs.get('cache')
+        self._archive = kwargs.get('archive')
+        self._parser  = get_parser(kwargs.get('parser'))
+        self._keep_html = kwargs.get('keep_html', False)
+        self._parse_executor = kwargs.get('parse_executor')
+
+        self.stats      = kwargs.get('stats')
+        if self.stats is None:
+            self.stats = SearchStats()
+        self._observers = kwargs.get('observers', [])
+        self._sink      = kwargs.get('sink')
+
+        self._prefetch          = kwargs.get('prefetch', False)
+        self._prefetch_executor = None
+        self._prefetched        = None
+
+        # Background fetches abandoned while already running, which still use the session
+        self._abandoned = []
+
         if not self._lazy:
             self.next_page()
 
-    def next_page(self):
+    def next_page(self, needed=None):
         """
         Get the next page of search results.
 
+        Args:
+            needed(int|None):   The number of results still needed from this page onwards. The page after it is
+                                only prefetched if this page falls short. Defaults to always prefetching.
+
         Returns:
             PoogleResultsPage
 
         Raises:
             PoogleRequestError: Raised if an error occurs while executing the search query.
         """
-        if self._query_count and not self.last.next_url:
+        url = self._next_url()
+
+        # Execute the search query and parse the results page, unless it is already being prefetched
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched and prefetched[0] == url:
+            self._log.info('Waiting on prefetched search query: %s', url)
+            page = self._add_page(self._result(prefetched[1]), prefetched[2])
+        elif self._coalescer is not None:
+            page = self._append_page(*self._coalesced_page(url))
+        else:
+            self._log.info('Executing search query: %s', url)
+            stats = PageStats(url)
+            page = self._add_page(self._fetch(url, stats), stats)
+
+        if self._prefetch and page.next_url and (needed is None or page.count < needed):
+            self._prefetch_next()
+
+        return page
+
+    def _coalesced_page(self, url):
+        """
+        Fetch and parse a search results page, or share the page parsed by an identical request already in flight.
+
+        Args:
+            url(str):   The search results page URL.
+
+        Returns:
+            tuple(PoogleResultsPage, poogle.stats.PageStats)
+
+        Raises:
+            PoogleRequestError:     Raised if an error occurs while executing the search query.
+            PoogleTimeoutError:     Raised if an identical request in flight did not complete within coalesce_timeout.
+            PoogleDeadlineError:    Raised if the deadline passed first.
+        """
+        def load():
+            self._log.info('Executing search query: %s', url)
+            return self._parse_page(self._fetch(url, stats), stats)
+
+        timeout = self._coalesce_timeout if self._coalesce_timeout is not None else self._coalescer.timeout
+
+        stats = PageStats(url)
+        try:
+            page, shared = self._coalescer.do(url, load, self._wait_timeout(timeout))
+        except PoogleTimeoutError:
+            # Running out of time is reported as such, rather than as timing out on the request in flight
+            self._wait_timeout()
+            raise
+        if shared:
+            # The network and parsing costs were recorded by the request we waited on
+            stats = PageStats(url)
+            stats.coalesced = True
+
+        return page, stats
+
+    def _prefetch_next(self):
+        """
+        Start fetching the next page of search results in the background.
+        """
+        if self._prefetch_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._prefetch_executor = ThreadPoolExecutor(1)
+
+        url = self._next_url()
+        self._log.info('Prefetching search query: %s', url)
+
+        stats = PageStats(url)
+        self._prefetched = (url, self._prefetch_executor.submit(self._fetch, url, stats), stats)
+
+    def _create_session(self, options):
+        """
+        Get the HTTP session to execute queries with when one has not been supplied.
+
+        Args:
+            options(dict):  The keyword arguments this search was created with.
+
+        Returns:
+            tuple(requests.Session, bool): The session, and whether this search owns (and should close) it.
+        """
+        if options.get('shared_session', False):
+            return get_shared_session(), False
+
+        return create_session(), True
+
+    def page_url(self, page):
+        """
+        Build the URL for any page of search results.
+
+        Args:
+            page(int):  The page number, starting at 1.
+
+        Returns:
+            str
+        """
+        return '{url}&num={n}&start={s}'.format(url=self._search_url, n=self._per_page, s=(page - 1) * self._per_page)
+
+    def _next_url(self):
+        """
+        Build the URL for the next page of search results.
+
+        Returns:
+            str
+
+        Raises:
+            PoogleNoMoreResultsError: Raised if the last page retrieved was the final page of results.
+        """
+        if self._exhausted or (self._query_count and not self.last.next_url):
             raise PoogleNoMoreResultsError('There are no more search results available')
 
-        url = '{url}&num={n}&start={s}'.format(url=self._search_url, n=self._per_page,
-                                               s=self._current_page * self._query_count)
-        self._log.info('Executing search query: %s', url)
+        return self.page_url(self._current_page + 1)
+
+    def fan_out(self, count, workers=4):
+        """
+        Fetch the next pages of search results concurrently, yielding them in rank order.
+
+        Every page URL is planned up front from its start offset rather than following next page links, so all of
+        the requests can be in flight at once, within the rate limit. Requests that haven't started are cancelled
+        once a page reports there are no more results, or when the generator is closed.
+
+        Args:
+            count(int):     The number of pages to fetch.
+            workers(int):   The maximum number of requests in flight.
+
+        Yields:
+            PoogleResultsPage
+
+        Raises:
+            PoogleRequestError:         Raised if an error occurs while executing a search query.
+            PoogleNoMoreResultsError:   Raised if the last page retrieved was the final page of results.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Make sure there are more results before planning anything
+        self._next_url()
+        first = self._current_page + 1
+
+        executor = ThreadPoolExecutor(workers)
+        planned = []
+        for number in range(first, first + count):
+            stats = PageStats(self.page_url(number))
+            self._log.info('Executing search query: %s', stats.url)
+            planned.append((executor.submit(self._fetch, stats.url, stats), stats))
 
-        # Execute the search query
         try:
-            page = requests.get(url)
-            page.raise_for_status()
-        except requests.RequestException as e:
-            self._log.error('An error occurred when executing the search query: %s', str(e))
-            raise PoogleRequestError(str(e))
+            for future, stats in planned:
+                try:
+                    page = self._add_page(self._result(future), stats)
+                except PoogleNoResultsError:
+                    # Planned pages past the end of the results are empty, rather than missing a next page link
+                    if not self._query_count:
+                        raise
+                    self._exhausted = True
+                    return
+
+                yield page
+
+                if not page.next_url:
+                    return
+        finally:
+            # Requests already in flight can't be cancelled, so the session is only closed once they complete
+            for future, __ in planned:
+                if not future.cancel() and not future.done():
+                    self._abandoned.append(future)
+            executor.shutdown(wait=False)
+
+    def _wait_timeout(self, timeout=None):
+        """
+        Shorten a timeout to end by the deadline, if there is one.
+
+        Args:
+            timeout(float|None):    The number of seconds to wait, or None to wait forever.
+
+        Returns:
+            float|None
+
+        Raises:
+            PoogleDeadlineError: Raised if the deadline has already passed
+        """
+        if self._deadline is None:
+            return timeout
+
+        remaining = self._deadline - timer()
+        if remaining <= 0:
+            self._log.error('Search query deadline exceeded')
+            raise PoogleDeadlineError('Search query deadline exceeded')
+
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def _result(self, future):
+        """
+        Wait on a page fetched or parsed in the background, no longer than the deadline.
+
+        Args:
+            future(concurrent.futures.Future):  The page fetch or parse.
+
+        Returns:
+            object:     The result of the future.
+
+        Raises:
+            PoogleRequestError:     Raised if an error occurs while executing the search query.
+            PoogleDeadlineError:    Raised if the deadline passed first.
+        """
+        from concurrent.futures import TimeoutError
+
+        try:
+            return future.result(self._wait_timeout())
+        except TimeoutError:
+            future.cancel()
+            self._log.error('Search query deadline exceeded while waiting on a page')
+            raise PoogleDeadlineError('Search query deadline exceeded')
+
+    def _add_page(self, content, stats=None):
+        """
+        Parse a fetched search results page and append it to our results.
+
+        Args:
+            content(bytes):                     The raw search results page HTML.
+            stats(poogle.stats.PageStats|None): The statistics recorded while fetching the page.
+
+        Returns:
+            PoogleResultsPage
+        """
+        stats = stats or PageStats()
+        return self._append_page(self._parse_page(content, stats), stats)
+
+    def _parse_page(self, content, stats):
+        """
+        Parse a fetched search results page.
+
+        Args:
+            content(bytes):                 The raw search results page HTML.
+            stats(poogle.stats.PageStats):  Record parsing statistics here.
+
+        Returns:
+            PoogleResultsPage
+        """
+        html = content if self._keep_html else None
+
+        start = timer()
+        if self._parse_executor is not None:
+            # Only the raw page and a compact record of the results cross the process boundary
+            record = self._result(self._parse_executor.submit(parse_page_record, content, self._parser, self._query,
+                                                              self.strict))
+            parsed_at = timer()
+            page = PoogleResultsPage.from_record(self, record, html)
+        else:
+            parsed = self._parser.parse(content)
+            parsed_at = timer()
+            page = PoogleResultsPage(self, parsed, html)
+
+        stats.parse_time   = parsed_at - start
+        stats.extract_time = timer() - parsed_at
+
+        return page
+
+    def _append_page(self, page, stats):
+        """
+        Append a parsed search results page to our results.
+
+        Args:
+            page(PoogleResultsPage):        The parsed page.
+            stats(poogle.stats.PageStats):  The statistics recorded while fetching and parsing the page.
+
+        Returns:
+            PoogleResultsPage
+        """
+        stats.page    = page.number
+        stats.results = page.count
+        stats.skipped = page.skipped
+
+        self.stats.add(stats)
+        for observer in self._observers:
+            observer(stats)
 
-        # Parse the search results page
-        soup = BeautifulSoup(page.content, 'html.parser')
-        page = PoogleResultsPage(self, soup)
         self.total_results = page.total_results
 
+        if self._sink is not None:
+            self._sink.write_page(self._query, page, self._results.result_count + 1)
+
         self._current_page += 1
         self._query_count += 1
         self.last = page
@@ -90,6 +443,267 @@ class Poogle(object):
 
         return page
 
+    def _fetch(self, url, stats=None):
+        """
+        Fetch the raw content of a search results page.
+
+        Args:
+            url(str):                           The search results page URL.
+            stats(poogle.stats.PageStats|None): Record request statistics here.
+
+        Returns:
+            bytes
+
+        Raises:
+            PoogleRequestError: Raised if an error occurs while executing the search query.
+        """
+        stats = stats or PageStats(url)
+
+        # Cached pages don't cost a round trip or a rate limit token
+        if self._cache is not None:
+            content = self._cache.get(url)
+            if content is not None:
+                self._log.info('Search results page loaded from cache')
+                stats.cached = True
+                return content
+
+        attempt = 0
+        while True:
+            try:
+                content = self._request(url, stats)
+            except PoogleDeadlineError:
+                # Running out of time says nothing about the health of Google, so isn't recorded
+                raise
+            except PoogleRequestError as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+
+                attempt += 1
+                sleep(delay)
+                continue
+
+            self._record()
+            break
+
+        if self._cache is not None:
+            self._cache.set(url, content)
+
+        return content
+
+    def _retry_delay(self, attempt, error):
+        """
+        Record a failed page request, and work out how long to wait before retrying it.
+
+        Args:
+            attempt(int):               The number of retries already made.
+            error(PoogleRequestError):  The error the request failed with.
+
+        Returns:
+            float|None: The number of seconds to wait, or None if the request should not be retried.
+
+        Raises:
+            PoogleDeadlineError: Raised if the deadline would pass before the retry
+        """
+        self._record(error)
+
+        delay = self._retry.delay(attempt, error) if self._retry is not None else None
+        if delay is None:
+            return None
+
+        if self._deadline is not None and timer() + delay >= self._deadline:
+            self._log.error('Not retrying search query, the deadline would pass first')
+            raise PoogleDeadlineError('Search query deadline exceeded: {e}'.format(e=error))
+
+        self._log.warning('Retrying search query in %.1f seconds (attempt %d of %d)', delay, attempt + 1,
+                          self._retry.retries)
+        return delay
+
+    def _request(self, url, stats):
+        """
+        Execute a single search results page request.
+
+        Args:
+            url(str):                       The search results page URL.
+            stats(poogle.stats.PageStats):  Record request statistics here.
+
+        Returns:
+            bytes
+
+        Raises:
+            PoogleThrottledError:   Raised if Google throttled the request.
+            PoogleTimeoutError:     Raised if connecting or receiving the response timed out.
+            PoogleDeadlineError:    Raised if the deadline passed before the response was received.
+            PoogleRequestError:     Raised if an error occurs while executing the search query.
+        """
+        # requests is imported when the first page is fetched, rather than slowing down every import of poogle
+        from requests import RequestException, Timeout
+
+        if self._limiter is not None:
+            start = timer()
+            self._acquire()
+            stats.limiter_wait += timer() - start
+
+        # Neither timeout may run past the deadline
+        timeout = self._timeout if isinstance(self._timeout, tuple) else (self._timeout, self._timeout)
+        timeout = tuple(self._wait_timeout(t) for t in timeout)
+
+        try:
+            # Stream the response so the time to first byte can be measured separately from the download
+            start = timer()
+            response = self._session.get(url, stream=True, timeout=timeout)
+            stats.time_to_first_byte = timer() - start
+
+            if response.status_code in THROTTLE_STATUSES:
+                self._release(response)
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                self._log.error('Search query throttled with status %d', response.status_code)
+                raise PoogleThrottledError('Throttled with status {s}'.format(s=response.status_code), retry_after,
+                                           response.status_code)
+
+            if is_captcha(response.url):
+                self._release(response)
+                self._log.error('Search query redirected to the CAPTCHA page: %s', response.url)
+                raise PoogleThrottledError('Redirected to the CAPTCHA page')
+
+            try:
+                response.raise_for_status()
+            except RequestException:
+                self._release(response)
+                raise
+
+            content = response.content if self._deadline is None else self._download(response)
+            stats.download_time = timer() - start - stats.time_to_first_byte
+        except Timeout as e:
+            self._log.error('The search query timed out: %s', str(e))
+            raise PoogleTimeoutError(str(e))
+        except RequestException as e:
+            self._log.error('An error occurred when executing the search query: %s', str(e))
+            error_response = getattr(e, 'response', None)
+            raise PoogleRequestError(str(e), error_response.status_code if error_response is not None else None)
+
+        stats.download_bytes = len(content)
+
+        if self._archive is not None:
+            self._archive.add(url, content, response.headers, response.status_code)
+
+        return content
+
+    def _acquire(self):
+        """
+        Wait on the rate limiter, no longer than the deadline.
+
+        Raises:
+            PoogleDeadlineError: Raised if the rate limiter would hold the request past the deadline
+        """
+        if self._deadline is None:
+            self._limiter.acquire()
+            return
+
+        try:
+            self._limiter.acquire(self._wait_timeout())
+        except PoogleTimeoutError:
+            self._log.error('Search query deadline exceeded while rate limited')
+            raise PoogleDeadlineError('Search query deadline exceeded while rate limited')
+
+    @staticmethod
+    def _release(response):
+        """
+        Release the connection of a streamed response that is not used, so it goes back to the pool.
+
+        Args:
+            response(requests.Response):    The streamed response.
+        """
+        from requests import RequestException
+
+        # Error pages are small, and reading them is what lets their keep-alive connection be reused
+        try:
+            response.content
+        except RequestException:
+            pass
+        response.close()
+
+    def _download(self, response):
+        """
+        Download a streamed response a chunk at a time, abandoning it once the deadline passes.
+
+        Args:
+            response(requests.Response):    The streamed response.
+
+        Returns:
+            bytes
+
+        Raises:
+            PoogleDeadlineError: Raised if the deadline passed before the download completed
+        """
+        chunks = []
+        try:
+            for chunk in response.iter_content(self.CHUNK_SIZE):
+                chunks.append(chunk)
+                self._wait_timeout()
+        except PoogleDeadlineError:
+            response.close()
+            raise
+
+        return b''.join(chunks)
+
+    def _record(self, error=None):
+        """
+        Report the outcome of a request to the rate limiter, if it keeps track of them, see poogle.retry.CircuitBreaker.
+
+        Args:
+            error(PoogleRequestError|None): The error the request failed with, or None if it succeeded.
+        """
+        record = getattr(self._limiter, 'record', None)
+        if record is not None:
+            record(error)
+
+    def close(self):
+        """
+        Stop prefetching, remove spilled pages and release the HTTP session if it is owned by this search. An owned
+        session is only closed once any prefetch or fan-out request already in flight has completed.
+        """
+        running, self._abandoned = self._abandoned, []
+        if self._prefetch_executor is not None:
+            # A prefetch that has already started can't be cancelled, so it is left to finish in the background
+            if self._prefetched and not self._prefetched[1].cancel():
+                running.append(self._prefetched[1])
+            self._prefetched = None
+            self._prefetch_executor.shutdown(wait=False)
+            self._prefetch_executor = None
+
+        self._results.close()
+
+        if self._owns_session:
+            running = [future for future in running if not future.done()]
+            if running:
+                # Closing the session under them would only turn the abandoned fetches into errors
+                self._close_after(running, self._session)
+            else:
+                self._session.close()
+
+    @staticmethod
+    def _close_after(futures, session):
+        """
+        Close a session once every background fetch still using it has completed.
+
+        Args:
+            futures(list[concurrent.futures.Future]):   The fetches using the session.
+            session(requests.Session):                  The session to close.
+        """
+        lock = threading.Lock()
+        left = [len(futures)]
+
+        def done(future):
+            with lock:
+                left[0] -= 1
+                last = not left[0]
+            if last:
+                session.close()
+
+        for future in futures:
+            future.add_done_callback(done)
+
     @property
     def query(self):
         return self._query
@@ -112,52 +726,279 @@ class Poogle(object):
     @property
     def results(self):
         """
-        Concatenate results from all pages together and return
+        A lazy view of the results from all pages, see poogle.retention.ResultsView.
 
         Returns:
-            list[poogle.containers.PoogleResult]
+            poogle.retention.ResultsView
         """
         # If we're querying lazily, make sure we've fetched our initial results
         if self._lazy and not self._query_count:
             self._log.info('Executing query lazily')
-            return self.next_page().results
+            self.next_page()
+
+        return ResultsView(self._results)
+
+    def __iter__(self):
+        """
+        Iterate over every search result, fetching further pages only as they are needed.
+
+        Yields:
+            poogle.containers.PoogleResult
+        """
+        index = 0
+        while True:
+            if index >= len(self._results):
+                try:
+                    self.next_page()
+                except PoogleNoMoreResultsError:
+                    return
 
-        # Concatenate results from all pages together and return
-        all_results = []
-        for __, r in self._results:
-            all_results += r.results
+            # Pages dropped by the retention policy before they were iterated over are skipped
+            page = self._results.page(index)
+            for result in (page.results if page is not None else []):
+                yield result
 
-        return all_results
+            index += 1
 
     def __repr__(self):
         return '<Poogle Search: {q!r}>'.format(q=self._query)
 
 
-def google_search(query, results=10, pause=0.5):
-    # Get the per page limit and ready our Poogle object
-    per_page = min(results, 90) + 10
-    poogle = Poogle(query, per_page)
+def _take(results, count, index=None):
+    """
+    Take search results from a page, skipping any URL already seen by the dedup index.
 
-    # Set a query limit to prevent infinite loops
-    limit = int(results / 100) + 3
-    query_count = 0
-
-    query_results = []
-    while len(query_results) < results:
-        # Make sure we haven't exceeded our query limit
-        if query_count >= limit:
-            raise RuntimeError('Recursion error, exceeded query limit of %d with %d results', limit, len(query_results))
+    Args:
+        results(list[poogle.containers.PoogleResult]):  The page results.
+        count(int):                                     The maximum number of results to take.
+        index(poogle.dedup.DedupIndex|None):            Skips results whose URL was already added to the index.
 
-        # Pause if this is not our first query
-        if pause and query_count:
-            sleep(pause)
+    Returns:
+        list[poogle.containers.PoogleResult]
+    """
+    if index is None:
+        return results[:count]
 
-        try:
-            query_results += poogle.next_page().results
-        except PoogleNoMoreResultsError:
-            # If we have no more results, break now
+    # Only the results taken are added to the index, so those beyond count may still be taken by later searches
+    taken = []
+    for result in results:
+        if len(taken) >= count:
             break
+        if index.add(result.url_string):
+            taken.append(result)
+
+    return taken
+
+
+def iter_google_search(query, results=10, pause=0.5, fan_out=0, plan=None, dedup=None, time_limit=None, **kwargs):
+    """
+    Execute a search query, yielding results as soon as each page has been parsed.
+
+    By default the next page is only fetched once every result of the previous page has been consumed, so stopping
+    early saves the remaining page requests. With fan_out, every page needed for the requested number of results is
+    fetched concurrently instead, see Poogle.fan_out().
+
+    Args:
+        query(str):             The search query to execute.
+        results(int):           The maximum number of results to yield.
+        pause(float):           The number of seconds to wait between page requests. Ignored when a rate limiter is
+                                in use.
+        fan_out(int):           The maximum number of page requests in flight at once. Defaults to sequential
+                                requests.
+        plan(QueryPlan|None):   The page requests to make, see poogle.planner.plan_search(). Defaults to the fewest
+                                requests for the number of results, with any headroom for
+                                poogle.planner.DEFAULT_SKIP_RATE that fits. The default is the same on every run, so
+                                cache, coalescer and archive keys stay stable.
+        dedup(bool|object):     Skip results whose normalized URL was already yielded, fetching further pages until
+                                there are enough unique results or the query limit is reached. Pass a poogle.dedup
+                                index to deduplicate across searches.
+        time_limit(float|None): The number of seconds the whole search may take. Pages in flight once it has passed
+                                are abandoned, and a PoogleDeadlineError is raised after the results retrieved so far.
+        **kwargs:               Keyword arguments passed on to the Poogle object. A sink keyword argument receives
+                                only the results yielded, rather than every result on each page.
+
+    Yields:
+        poogle.containers.PoogleResult
+
+    Raises:
+        PoogleMaxQueriesError:  Raised after the results found so far if the query limit is reached first, usually as
+                                too many results were skipped or duplicates.
+        PoogleDeadlineError:    Raised after the results found so far if the time limit passes first.
+    """
+    # A rate limiter paces our requests instead of fixed pauses
+    if kwargs.get('limiter', get_default_limiter()) is not None:
+        pause = 0
+    elif fan_out and pause:
+        # Concurrent requests are spaced out by a limiter instead
+        kwargs['limiter'] = IntervalLimiter(pause)
+        pause = 0
+
+    # Results are only read from the page being yielded, so older pages needn't be kept by the search
+    kwargs.setdefault('keep_pages', 1)
+    sink = kwargs.pop('sink', None)
+    if time_limit is not None:
+        kwargs['deadline'] = timer() + time_limit
+
+    # Plan our page requests and ready our Poogle object
+    if plan is None:
+        plan = plan_search(results, DEFAULT_SKIP_RATE)
+    poogle = Poogle(query, plan.per_page, **kwargs)
+
+    # Set a query limit to prevent infinite loops, allowing for a couple of pages of skipped results beyond the plan
+    limit = plan.requests + 2
+    query_count = 0
 
-        query_count += 1
-
-    return query_results[:results]
+    index = create_dedup_index(dedup)
+    if index is not None:
+        # And as many pages again for duplicate results
+        limit += plan.requests
+
+    yielded = 0
+    planned = None
+    try:
+        if fan_out:
+            planned = poogle.fan_out(plan.requests, fan_out)
+            for page in planned:
+                query_count += 1
+
+                taken = _take(page.results, results - yielded, index)
+                if sink is not None:
+                    sink.write_results(query, taken, yielded + 1)
+
+                for result in taken:
+                    yielded += 1
+                    yield result
+
+        # Fetch any results still missing (after skipping unparsable results, for example) one page at a time
+        while yielded < results:
+            # Make sure we haven't exceeded our query limit
+            if query_count >= limit:
+                poogle._log.warning('Exceeded the query limit of %d with %d of %d results', limit, yielded, results)
+                raise PoogleMaxQueriesError('Exceeded the query limit of {l} with {y} results'.format(l=limit,
+                                                                                                      y=yielded))
+
+            # Pause if this is not our first query, but not past the deadline
+            if pause and query_count:
+                sleep(poogle._wait_timeout(pause))
+
+            try:
+                page = poogle.next_page(results - yielded)
+            except PoogleNoMoreResultsError:
+                # If we have no more results, break now
+                break
+
+            query_count += 1
+
+            taken = _take(page.results, results - yielded, index)
+            if sink is not None:
+                sink.write_results(query, taken, yielded + 1)
+
+            for result in taken:
+                yielded += 1
+                yield result
+    finally:
+        if planned is not None:
+            planned.close()
+        poogle.close()
+
+
+def google_search(query, results=10, pause=0.5, fan_out=0, plan=None, dedup=None, time_limit=None, **kwargs):
+    """
+    Execute a search query and return the requested number of results.
+
+    When the search runs out of time, or reaches its query limit before finding enough (unique) results, the results
+    retrieved so far are returned with their incomplete attribute set.
+
+    Args:
+        query(str):             The search query to execute.
+        results(int):           The number of results to retrieve.
+        pause(float):           The number of seconds to wait between page requests. Ignored when a rate limiter is
+                                in use.
+        fan_out(int):           The maximum number of page requests in flight at once. Defaults to sequential
+                                requests.
+        plan(QueryPlan|None):   The page requests to make, see iter_google_search().
+        dedup(bool|object):     Only return results with unique normalized URLs, see iter_google_search().
+        time_limit(float|None): The number of seconds the whole search may take. Defaults to no limit.
+        **kwargs:               Keyword arguments passed on to the Poogle object.
+
+    Returns:
+        poogle.containers.PoogleResultList
+    """
+    found = PoogleResultList()
+    try:
+        for result in iter_google_search(query, results, pause, fan_out, plan, dedup, time_limit, **kwargs):
+            found.append(result)
+    except PoogleDeadlineError:
+        logging.getLogger('poogle').warning('Search query %r ran out of time with %d of %d results', query,
+                                            len(found), results)
+        found.stop(PoogleResultList.DEADLINE)
+    except PoogleMaxQueriesError:
+        found.stop(PoogleResultList.QUERY_LIMIT)
+
+    return found
+
+
+def google_search_many(queries, results=10, pause=0.5, workers=4, dedup=None, **kwargs):
+    """
+    Execute many search queries concurrently on a pool of worker threads.
+
+    All workers share a single pooled HTTP session and a single rate limiter, so pause applies to the combined
+    request rate of every worker rather than to each query individually. Duplicate queries running at the same time
+    share their page requests.
+
+    Args:
+        queries(iterable[str]): The search queries to execute.
+        results(int):           The number of results to retrieve for each query.
+        pause(float):           The minimum number of seconds between any two page requests. Ignored when a rate
+                                limiter is in use.
+        workers(int):           The number of worker threads.
+        dedup(bool|object):     Only return each normalized URL once across every query, see iter_google_search().
+        **kwargs:               Keyword arguments passed on to the Poogle objects.
+
+    Yields:
+        tuple(str, list[poogle.containers.PoogleResult]|Exception): Each query paired with its results, or with the
+            error that was raised while executing it, in order of completion.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    from poogle.coalesce import RequestCoalescer
+
+    log = logging.getLogger('poogle')
+
+    if 'limiter' not in kwargs:
+        kwargs['limiter'] = get_default_limiter() or IntervalLimiter(pause)
+    owns_session = kwargs.get('session') is None
+    if owns_session:
+        kwargs['session'] = create_session(pool_maxsize=workers)
+    if kwargs.get('coalescer') is None:
+        kwargs['coalescer'] = RequestCoalescer()
+    index = create_dedup_index(dedup)
+
+    def search(query):
+        try:
+            return google_search(query, results, 0, dedup=index, **kwargs)
+        except Exception as e:
+            log.warning('Search query %r failed: %s', query, e)
+            return e
+
+    queries = iter(queries)
+    try:
+        with ThreadPoolExecutor(workers) as executor:
+            # Only keep a bounded window of queries pending, so large query iterators aren't consumed up front
+            pending = {}
+            for query in queries:
+                pending[executor.submit(search, query)] = query
+                if len(pending) >= workers * 2:
+                    break
+
+            while pending:
+                done, __ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+
+                    for query in queries:
+                        pending[executor.submit(search, query)] = query
+                        break
+    finally:
+        # The executor has waited on every running search by now
+        if owns_session:
+            kwargs['session'].close()
@@ -0,0 +1,362 @@
+"""
+asyncio counterparts of the Poogle search engine. Requires Python 3.5+ and aiohttp.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+
+from poogle import Poogle
+from poogle.containers import PoogleResultsPage
+from poogle.errors import PoogleRequestError, PoogleNoMoreResultsError, PoogleDeadlineError, PoogleMaxQueriesError, \
+    PoogleThrottledError, PoogleTimeoutError
+from poogle.parallel import parse_page_record
+from poogle.planner import DEFAULT_SKIP_RATE, plan_search
+from poogle.ratelimit import get_default_limiter
+from poogle.retention import ResultsView
+from poogle.retry import THROTTLE_STATUSES, parse_retry_after, is_captcha
+from poogle.stats import PageStats, timer
+
+
+#: The number of threads blocking rate limiters are waited on in, shared by every async search
+LIMITER_WORKERS = 4
+
+_limiter_executor = None
+_limiter_lock     = threading.Lock()
+
+
+def _get_limiter_executor():
+    """
+    Get the thread pool rate limiters are waited on in. It is kept apart from the event loop's default executor, so
+    searches waiting on a limiter can't starve aiohttp's DNS resolver and other run_in_executor() calls of threads.
+
+    Returns:
+        concurrent.futures.ThreadPoolExecutor
+    """
+    global _limiter_executor
+    with _limiter_lock:
+        if _limiter_executor is None:
+            _limiter_executor = ThreadPoolExecutor(LIMITER_WORKERS)
+
+    return _limiter_executor
+
+
+def create_client_session(limit=100, limit_per_host=10, keep_alive=True, headers=None):
+    """
+    Create a new pooled aiohttp client session.
+
+    Args:
+        limit(int):             The total number of simultaneous connections.
+        limit_per_host(int):    The number of simultaneous connections to a single host.
+        keep_alive(bool):       Reuse connections between requests. Defaults to True.
+        headers(dict):          Default headers to send with every request.
+
+    Returns:
+        aiohttp.ClientSession
+    """
+    connector = aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host, force_close=not keep_alive)
+    return aiohttp.ClientSession(connector=connector, headers=headers)
+
+
+class AsyncPoogle(Poogle):
+    """
+    Poogle search engine fetching pages on an asyncio event loop.
+    """
+    # Poogle keyword arguments that only work with threads and requests sessions
+    UNSUPPORTED = ('coalescer', 'prefetch', 'shared_session')
+
+    def __init__(self, query, per_page=10, start_page=1, **kwargs):
+        """
+        Args:
+            query(str):         The search query to execute.
+            per_page(int):      The number of results to retrieve per page.
+            start_page(int):    The starting page for queries.
+            **kwargs:           Arbitrary keyword arguments, refer to the Poogle documentation for more information.
+
+        Keyword Args:
+            session(aiohttp.ClientSession): The client session to execute queries with.
+            semaphore(asyncio.Semaphore):   Limits the number of page requests in flight, can be shared between
+                                            searches.
+
+        Raises:
+            ValueError: Raised if the supplied per_page argument is less than 1 or greater than 100
+            TypeError:  Raised if a keyword argument in UNSUPPORTED is enabled
+        """
+        unsupported = [name for name in self.UNSUPPORTED if kwargs.get(name)]
+        if unsupported:
+            raise TypeError('AsyncPoogle does not support {k}'.format(k=', '.join(unsupported)))
+
+        # Queries can't be executed from the constructor, so they are always lazy
+        kwargs['lazy'] = True
+        Poogle.__init__(self, query, per_page, start_page, **kwargs)
+
+        self._semaphore = kwargs.get('semaphore')
+
+    def _create_session(self, options):
+        # aiohttp sessions must be created inside a running event loop, so this is deferred until the first fetch
+        return None, True
+
+    async def next_page(self):
+        """
+        Get the next page of search results.
+
+        Returns:
+            poogle.containers.PoogleResultsPage
+
+        Raises:
+            PoogleRequestError: Raised if an error occurs while executing the search query.
+        """
+        url = self._next_url()
+        self._log.info('Executing search query: %s', url)
+
+        # Execute the search query
+        stats = PageStats(url)
+        if self._semaphore is not None:
+            start = timer()
+            async with self._semaphore:
+                stats.limiter_wait = timer() - start
+                content = await self._fetch(url, stats)
+        else:
+            content = await self._fetch(url, stats)
+
+        # Parse the search results page
+        return self._append_page(await self._parse_page(content, stats), stats)
+
+    async def _parse_page(self, content, stats):
+        """
+        Parse a fetched search results page, awaiting the parse executor rather than blocking the event loop on it.
+
+        Args:
+            content(bytes):                 The raw search results page HTML.
+            stats(poogle.stats.PageStats):  Record parsing statistics here.
+
+        Returns:
+            poogle.containers.PoogleResultsPage
+
+        Raises:
+            PoogleDeadlineError:    Raised if the deadline passed before the page was parsed.
+        """
+        if self._parse_executor is None:
+            return Poogle._parse_page(self, content, stats)
+
+        html = content if self._keep_html else None
+
+        start = timer()
+        future = self._parse_executor.submit(parse_page_record, content, self._parser, self._query, self.strict)
+        try:
+            record = await asyncio.wait_for(asyncio.wrap_future(future), self._wait_timeout())
+        except asyncio.TimeoutError:
+            self._log.error('Search query deadline exceeded while waiting on a page')
+            raise PoogleDeadlineError('Search query deadline exceeded')
+
+        parsed_at = timer()
+        page = PoogleResultsPage.from_record(self, record, html)
+
+        stats.parse_time   = parsed_at - start
+        stats.extract_time = timer() - parsed_at
+
+        return page
+
+    async def _fetch(self, url, stats=None):
+        """
+        Fetch the raw content of a search results page, from the cache if possible, retrying failed requests.
+
+        Args:
+            url(str):                           The search results page URL.
+            stats(poogle.stats.PageStats|None): Record request statistics here.
+
+        Returns:
+            bytes
+
+        Raises:
+            PoogleRequestError: Raised if an error occurs while executing the search query.
+        """
+        stats = stats or PageStats(url)
+
+        # Cached pages don't cost a round trip or a rate limit token
+        if self._cache is not None:
+            content = self._cache.get(url)
+            if content is not None:
+                self._log.info('Search results page loaded from cache')
+                stats.cached = True
+                return content
+
+        attempt = 0
+        while True:
+            try:
+                content = await self._request(url, stats)
+            except PoogleDeadlineError:
+                # Running out of time says nothing about the health of Google, so isn't recorded
+                raise
+            except PoogleRequestError as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            self._record()
+            break
+
+        if self._cache is not None:
+            self._cache.set(url, content)
+
+        return content
+
+    async def _request(self, url, stats):
+        """
+        Execute a single search results page request.
+
+        Args:
+            url(str):                       The search results page URL.
+            stats(poogle.stats.PageStats):  Record request statistics here.
+
+        Returns:
+            bytes
+
+        Raises:
+            PoogleThrottledError:   Raised if Google throttled the request.
+            PoogleTimeoutError:     Raised if connecting or receiving the response timed out.
+            PoogleDeadlineError:    Raised if the deadline passed before the response was received.
+            PoogleRequestError:     Raised if an error occurs while executing the search query.
+        """
+        if self._session is None:
+            self._session = create_client_session()
+
+        if self._limiter is not None:
+            # Limiters are shared with threaded searches and block, so they are waited on outside of the event loop.
+            # Searches queued behind others waiting on it give up once the deadline passes
+            start = timer()
+            acquire = asyncio.get_event_loop().run_in_executor(_get_limiter_executor(), self._acquire)
+            try:
+                await asyncio.wait_for(acquire, self._wait_timeout())
+            except asyncio.TimeoutError:
+                self._log.error('Search query deadline exceeded while rate limited')
+                raise PoogleDeadlineError('Search query deadline exceeded while rate limited')
+            stats.limiter_wait += timer() - start
+
+        # Neither timeout may run past the deadline, and neither may the request as a whole
+        connect, read = self._timeout if isinstance(self._timeout, tuple) else (self._timeout, self._timeout)
+        timeout = aiohttp.ClientTimeout(total=self._wait_timeout(), sock_connect=self._wait_timeout(connect),
+                                        sock_read=self._wait_timeout(read))
+
+        try:
+            start = timer()
+            async with self._session.get(url, timeout=timeout) as response:
+                stats.time_to_first_byte = timer() - start
+
+                if response.status in THROTTLE_STATUSES:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    self._log.error('Search query throttled with status %d', response.status)
+                    raise PoogleThrottledError('Throttled with status {s}'.format(s=response.status), retry_after,
+                                               response.status)
+
+                if is_captcha(str(response.url)):
+                    self._log.error('Search query redirected to the CAPTCHA page: %s', response.url)
+                    raise PoogleThrottledError('Redirected to the CAPTCHA page')
+
+                response.raise_for_status()
+                content = await response.read()
+                stats.download_time = timer() - start - stats.time_to_first_byte
+        except asyncio.TimeoutError as e:
+            # Running out of time is reported as such, rather than as the request timing out
+            self._wait_timeout()
+            self._log.error('The search query timed out: %s', str(e))
+            raise PoogleTimeoutError(str(e) or 'Timed out')
+        except aiohttp.ClientResponseError as e:
+            self._log.error('An error occurred when executing the search query: %s', str(e))
+            raise PoogleRequestError(str(e), e.status)
+        except aiohttp.ClientError as e:
+            self._log.error('An error occurred when executing the search query: %s', str(e))
+            raise PoogleRequestError(str(e))
+
+        stats.download_bytes = len(content)
+        if self._archive is not None:
+            self._archive.add(url, content, response.headers, response.status)
+
+        return content
+
+    async def close(self):
+        """
+        Release the client session if it is owned by this search.
+        """
+        self._results.close()
+
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+
+    def fan_out(self, count, workers=4):
+        raise TypeError('AsyncPoogle pages are fetched with await next_page(), use asyncio.gather() to fan out')
+
+    def __iter__(self):
+        # Pages can't be fetched from a plain for loop, which would otherwise never see a page and never end
+        raise TypeError('AsyncPoogle objects are not iterable, await next_page() instead')
+
+    @property
+    def results(self):
+        """
+        A lazy view of the results from all fetched pages. Pages are never fetched implicitly.
+
+        Returns:
+            poogle.retention.ResultsView
+        """
+        return ResultsView(self._results)
+
+
+async def async_google_search(query, results=10, pause=0.5, **kwargs):
+    """
+    Execute a search query on the event loop and return the requested number of results.
+
+    Args:
+        query(str):     The search query to execute.
+        results(int):   The number of results to retrieve.
+        pause(float):   The number of seconds to wait between page requests. Ignored when a rate limiter is in use.
+        **kwargs:       Keyword arguments passed on to the AsyncPoogle object.
+
+    Returns:
+        list[poogle.containers.PoogleResult]
+
+    Raises:
+        PoogleMaxQueriesError:  Raised if the query limit is reached before enough results are found, usually as too
+                                many results were skipped.
+    """
+    # A rate limiter paces our requests instead of fixed pauses
+    if kwargs.get('limiter', get_default_limiter()) is not None:
+        pause = 0
+
+    # Plan our page requests and ready our Poogle object
+    plan = plan_search(results, DEFAULT_SKIP_RATE)
+    poogle = AsyncPoogle(query, plan.per_page, **kwargs)
+
+    # Set a query limit to prevent infinite loops
+    limit = plan.requests + 2
+    query_count = 0
+
+    query_results = []
+    try:
+        while len(query_results) < results:
+            # Make sure we haven't exceeded our query limit
+            if query_count >= limit:
+                poogle._log.warning('Exceeded the query limit of %d with %d of %d results', limit, len(query_results),
+                                    results)
+                raise PoogleMaxQueriesError('Exceeded the query limit of {l} with {y} results'.format(
+                    l=limit, y=len(query_results)))
+
+            # Pause if this is not our first query
+            if pause and query_count:
+                await asyncio.sleep(pause)
+
+            try:
+                query_results += (await poogle.next_page()).results
+            except PoogleNoMoreResultsError:
+                # If we have no more results, break now
+                break
+
+            query_count += 1
+    finally:
+        await poogle.close()
+
+    return query_results[:results]
@@ -0,0 +1,233 @@
+"""
+Compressed archive of raw search results pages, so results can be rebuilt offline after parser or markup changes.
+
+Pages are appended to gzip segment files, one gzip member per page holding a JSON header line followed by the raw
+page content, so a segment can be read back with standard gzip tools. A SQLite index maps every page URL to its
+segment and offset.
+"""
+import gzip
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+#: A page read back from the archive
+ArchivedPage = namedtuple('ArchivedPage', ['url', 'fetched', 'status', 'headers', 'content'])
+
+#: The location of a page in the archive segments
+ArchiveEntry = namedtuple('ArchiveEntry', ['url', 'segment', 'offset', 'length'])
+
+
+def read_entry(path, entry):
+    """
+    Read a single page from an archive segment. Safe to run in a worker process.
+
+    Args:
+        path(str):              The archive directory.
+        entry(ArchiveEntry):    The location of the page.
+
+    Returns:
+        ArchivedPage
+    """
+    with open(os.path.join(path, PageArchive.SEGMENT_NAME.format(n=entry.segment)), 'rb') as f:
+        f.seek(entry.offset)
+        data = f.read(entry.length)
+
+    # Every page is a complete gzip member, with a gzip header and trailer
+    data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
+    header, content = data.split(b'\n', 1)
+    header = json.loads(header.decode('utf-8'))
+
+    return ArchivedPage(header['url'], header['fetched'], header['status'], header['headers'], content)
+
+
+class PageArchive(object):
+    """
+    Append-only archive of raw search results pages, with the URL, fetch time, status and headers of every page.
+
+    Pass it to Poogle or google_search as archive to record every page fetched from the network, and replay it with
+    ReplaySession.
+    """
+    SEGMENT_NAME = 'segment-{n:05d}.gz'
+    INDEX_NAME   = 'index.sqlite'
+
+    def __init__(self, path, segment_size=64 * 1024 * 1024, compress_level=6):
+        """
+        Args:
+            path(str):              The archive directory. It is created if it does not exist.
+            segment_size(int):      The size in bytes after which a new segment file is started.
+            compress_level(int):    The gzip compression level of new pages.
+        """
+        self._log  = logging.getLogger('poogle.archive')
+        self._lock = threading.Lock()
+
+        self.path           = path
+        self.segment_size   = segment_size
+        self.compress_level = compress_level
+
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+        self._db = sqlite3.connect(os.path.join(path, self.INDEX_NAME), check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS pages ('
+                         'id INTEGER PRIMARY KEY, url TEXT, fetched REAL, segment INTEGER, offset INTEGER, '
+                         'length INTEGER)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS pages_url ON pages (url, fetched)')
+        self._db.commit()
+
+        self._segment = self._db.execute('SELECT COALESCE(MAX(segment), 0) FROM pages').fetchone()[0]
+
+    def add(self, url, content, headers=None, status=200, fetched=None):
+        """
+        Append a page to the archive.
+
+        Args:
+            url(str):               The search results page URL.
+            content(bytes):         The raw page content.
+            headers(dict|None):     The response headers.
+            status(int):            The response status code.
+            fetched(float|None):    The time the page was fetched. Defaults to now.
+        """
+        if not isinstance(content, bytes):
+            content = content.encode('utf-8')
+
+        fetched = time.time() if fetched is None else fetched
+        header  = json.dumps({'url': url, 'fetched': fetched, 'status': status, 'headers': dict(headers or {})})
+
+        buf = io.BytesIO()
+        with gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=self.compress_level, mtime=0) as f:
+            f.write(header.encode('utf-8') + b'\n' + content)
+        data = buf.getvalue()
+
+        with self._lock:
+            segment = os.path.join(self.path, self.SEGMENT_NAME.format(n=self._segment))
+            if os.path.exists(segment) and os.path.getsize(segment) >= self.segment_size:
+                self._segment += 1
+                segment = os.path.join(self.path, self.SEGMENT_NAME.format(n=self._segment))
+                self._log.info('Starting archive segment: %s', segment)
+
+            with open(segment, 'ab') as f:
+                offset = f.tell()
+                f.write(data)
+
+            self._db.execute('INSERT INTO pages (url, fetched, segment, offset, length) VALUES (?, ?, ?, ?, ?)',
+                             (url, fetched, self._segment, offset, len(data)))
+            self._db.commit()
+
+        self._log.debug('Archived page: %s', url)
+
+    def get(self, url):
+        """
+        Get the most recently archived copy of a page.
+
+        Args:
+            url(str):   The search results page URL.
+
+        Returns:
+            ArchivedPage|None:  The page, or None if it has not been archived.
+        """
+        with self._lock:
+            row = self._db.execute('SELECT url, segment, offset, length FROM pages WHERE url = ? '
+                                   'ORDER BY fetched DESC LIMIT 1', (url,)).fetchone()
+
+        return read_entry(self.path, ArchiveEntry(*row)) if row else None
+
+    def entries(self):
+        """
+        Iterate over the location of every archived page, in the order the pages are stored on disk.
+
+        Yields:
+            ArchiveEntry
+        """
+        with self._lock:
+            rows = self._db.execute('SELECT url, segment, offset, length FROM pages ORDER BY segment, offset')
+
+        # Rows are read lazily, so very large indexes are never loaded into memory at once
+        for row in rows:
+            yield ArchiveEntry(*row)
+
+    def __iter__(self):
+        """
+        Iterate over every archived page, in the order the pages are stored on disk.
+
+        Yields:
+            ArchivedPage
+        """
+        for entry in self.entries():
+            yield read_entry(self.path, entry)
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def __repr__(self):
+        return '<PageArchive: {p!r} ({n} pages)>'.format(p=self.path, n=len(self))
+
+
+class ReplayResponse(object):
+    """
+    The subset of requests.Response used by Poogle, served from an archived page.
+    """
+    def __init__(self, url, page=None):
+        """
+        Args:
+            url(str):                   The requested URL.
+            page(ArchivedPage|None):    The archived page, or None if the URL is not in the archive.
+        """
+        self.url         = url
+        self.status_code = page.status if page else 404
+        self.headers     = page.headers if page else {}
+        self.content     = page.content if page else b''
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            from requests import HTTPError
+
+            reason = 'Not archived' if self.status_code == 404 else 'Archived error'
+            raise HTTPError('{s} {r}: {u}'.format(s=self.status_code, r=reason, u=self.url), response=self)
+
+    def iter_content(self, chunk_size=1):
+        return iter([self.content])
+
+    def close(self):
+        pass
+
+
+class ReplaySession(object):
+    """
+    Drop-in replacement for requests.Session serving search results pages from an archive, without touching the
+    network. Pass it to Poogle or google_search as session, and pages that were never archived fail with a
+    PoogleRequestError.
+    """
+    def __init__(self, archive):
+        """
+        Args:
+            archive(PageArchive|str):   The archive, or its directory.
+        """
+        self._log    = logging.getLogger('poogle.archive')
+        self.archive = archive if isinstance(archive, PageArchive) else PageArchive(archive)
+
+    def get(self, url, **kwargs):
+        """
+        Args:
+            url(str):   The search results page URL.
+            **kwargs:   Ignored requests.Session.get() arguments.
+
+        Returns:
+            ReplayResponse
+        """
+        page = self.archive.get(url)
+        if page is None:
+            self._log.warning('Page not found in the archive: %s', url)
+
+        return ReplayResponse(url, page)
+
+    def close(self):
+        pass
@@ -0,0 +1,133 @@
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class ResponseCache(object):
+    """
+    Persistent SQLite cache of search results pages, keyed on the search URL.
+
+    Pages are stored zlib compressed. Expired entries are dropped when they are read, and the least recently used
+    entries are evicted whenever the total compressed size exceeds max_size.
+    """
+    def __init__(self, path, ttl=86400, max_size=256 * 1024 * 1024):
+        """
+        Args:
+            path(str):      The SQLite database path. Use ':memory:' for a cache that is not persisted.
+            ttl(float):     The default number of seconds entries are kept for.
+            max_size(int):  The maximum total size of the cached pages in bytes, after compression.
+        """
+        self._log  = logging.getLogger('poogle.cache')
+        self._lock = threading.Lock()
+
+        self.path     = path
+        self.ttl      = ttl
+        self.max_size = max_size
+
+        self.hits   = 0
+        self.misses = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS pages ('
+                         'url TEXT PRIMARY KEY, content BLOB, size INTEGER, accessed REAL, expires REAL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed)')
+        self._db.commit()
+
+    def get(self, url):
+        """
+        Get a cached page.
+
+        Args:
+            url(str):   The search URL.
+
+        Returns:
+            bytes|None: The page content, or None if the page is not cached or has expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT content, expires FROM pages WHERE url = ?', (url,)).fetchone()
+
+            if row and row[1] < now:
+                self._log.debug('Cached page has expired: %s', url)
+                self._db.execute('DELETE FROM pages WHERE url = ?', (url,))
+                self._db.commit()
+                row = None
+
+            if not row:
+                self.misses += 1
+                return None
+
+            self._db.execute('UPDATE pages SET accessed = ? WHERE url = ?', (now, url))
+            self._db.commit()
+            self.hits += 1
+
+        self._log.debug('Cache hit: %s', url)
+        return zlib.decompress(row[0])
+
+    def set(self, url, content, ttl=None):
+        """
+        Cache a page.
+
+        Args:
+            url(str):           The search URL.
+            content(bytes):     The page content.
+            ttl(float|None):    The number of seconds to keep the page for. Defaults to the cache TTL.
+        """
+        if not isinstance(content, bytes):
+            content = content.encode('utf-8')
+
+        data = zlib.compress(content)
+        now  = time.time()
+        ttl  = self.ttl if ttl is None else ttl
+
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO pages (url, content, size, accessed, expires) '
+                             'VALUES (?, ?, ?, ?, ?)', (url, sqlite3.Binary(data), len(data), now, now + ttl))
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """
+        Evict the least recently used pages until the cache fits within max_size.
+        """
+        size = self.size
+        if size <= self.max_size:
+            return
+
+        rows = self._db.execute('SELECT url, size FROM pages ORDER BY accessed ASC').fetchall()
+        for url, entry_size in rows:
+            if size <= self.max_size:
+                break
+
+            self._log.debug('Evicting cached page: %s', url)
+            self._db.execute('DELETE FROM pages WHERE url = ?', (url,))
+            size -= entry_size
+
+    def clear(self):
+        """
+        Remove every cached page.
+        """
+        with self._lock:
+            self._db.execute('DELETE FROM pages')
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    @property
+    def size(self):
+        """
+        The total size of the cached pages in bytes, after compression.
+
+        Returns:
+            int
+        """
+        return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def __repr__(self):
+        return '<ResponseCache: {p!r} ({h} hits, {m} misses)>'.format(p=self.path, h=self.hits, m=self.misses)
@@ -1,6 +1,6 @@
-import os
 import click
 import logging
+from importlib import import_module
 
 from poogle import __version__
 
@@ -16,27 +16,95 @@ class Context(object):
 
 
 pass_context  = click.make_pass_decorator(Context, ensure=True)
-plugin_folder = os.path.dirname(__file__)
+
+# Command names and the modules defining them. Modules are only imported when their command is invoked.
+COMMANDS = {
+    'batch':   'poogle.cli.batch',
+    'reparse': 'poogle.cli.reparse',
+    'search':  'poogle.cli.search',
+}
+
+
+def search_options(command):
+    """
+    Add the rate limiting and caching options shared by commands that execute search queries.
+    """
+    options = [
+        click.option('--pause', help='Seconds to wait between page requests when no rate is set', default=0.5),
+        click.option('--rate', help='Maximum page requests per second, replaces --pause', type=float),
+        click.option('--burst', help='Page requests allowed back to back before --rate applies', default=1),
+        click.option('--jitter', help='Maximum random seconds added to rate limited waits', default=0.0),
+        click.option('--rate-lock', help='Share the --rate limit with other processes through this file',
+                     type=click.Path(dir_okay=False)),
+        click.option('--retries', help='Retry failed page requests with exponential backoff, pausing all requests '
+                                       'while throttled', default=0),
+        click.option('--backoff', help='Seconds to wait before the first retry, doubled for every retry after it',
+                     default=1.0),
+        click.option('--timeout', help='Seconds to wait to connect, and between bytes received, for each page request',
+                     type=float),
+        click.option('--time-limit', help='Seconds each search query may take, returning the results retrieved so '
+                                          'far once it has passed', type=float),
+        click.option('--cache', help='Cache search results pages in this SQLite database',
+                     type=click.Path(dir_okay=False)),
+        click.option('--cache-ttl', help='Seconds to keep cached search results pages for', default=86400.0),
+        click.option('--no-cache', help='Bypass the search results page cache', is_flag=True),
+        click.option('--archive', help='Record every fetched search results page in this archive directory',
+                     type=click.Path(file_okay=False)),
+        click.option('--replay', help='Serve search results pages from this archive directory instead of the network',
+                     type=click.Path(exists=True, file_okay=False)),
+    ]
+
+    for option in reversed(options):
+        command = option(command)
+
+    return command
+
+
+def search_kwargs(pause, rate, burst, jitter, rate_lock, retries, backoff, timeout, time_limit, cache, cache_ttl,
+                  no_cache, archive, replay):
+    """
+    Build google_search() keyword arguments from the options added by search_options().
+
+    Returns:
+        dict
+    """
+    from poogle.archive import PageArchive, ReplaySession
+    from poogle.cache import ResponseCache
+    from poogle.ratelimit import IntervalLimiter, create_limiter
+    from poogle.retry import CircuitBreaker, RetryPolicy
+
+    # Replayed pages don't cost anything, so they are never rate limited
+    if replay:
+        pause, rate, retries = 0, None, 0
+
+    limiter = create_limiter(rate, burst, jitter, rate_lock)
+    if retries:
+        # Every request goes through the circuit breaker, so the pause is enforced by the limiter it wraps
+        limiter = CircuitBreaker(limiter or IntervalLimiter(pause))
+
+    return {
+        'pause': pause,
+        'limiter': limiter,
+        'retry': RetryPolicy(retries, backoff) if retries else None,
+        'timeout': timeout,
+        'time_limit': time_limit,
+        'cache': ResponseCache(cache, cache_ttl) if (cache and not no_cache) else None,
+        'archive': PageArchive(archive) if archive else None,
+        'session': ReplaySession(replay) if replay else None,
+    }
 
 
 # noinspection PyAbstractClass
 class PoogleCLI(click.MultiCommand):
 
     def list_commands(self, ctx):
-        rv = []
-        for filename in os.listdir(plugin_folder):
-            if filename.endswith('.py') and not filename.startswith('_'):
-                rv.append(filename[:-3])
-        rv.sort()
-        return rv
+        return sorted(COMMANDS)
 
     def get_command(self, ctx, name):
-        ns = {}
-        fn = os.path.join(plugin_folder, name + '.py')
-        with open(fn) as f:
-            code = compile(f.read(), fn, 'exec')
-            eval(code, ns, ns)
-        return ns['cli']
+        if name not in COMMANDS:
+            return None
+
+        return import_module(COMMANDS[name]).cli
 
 
 @click.command(cls=PoogleCLI, context_settings=CONTEXT_SETTINGS)
@@ -0,0 +1,155 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from queue import Queue
+except ImportError:  # pragma: no cover
+    from Queue import Queue
+
+import click
+
+from poogle import iter_google_search
+from poogle.coalesce import RequestCoalescer
+from poogle.dedup import DedupIndex, BloomFilterIndex
+from poogle.errors import PoogleDeadlineError, PoogleMaxQueriesError
+from poogle.parallel import create_parse_executor
+from poogle.ratelimit import IntervalLimiter
+from poogle.session import create_session
+from poogle.cli import pass_context, search_options, search_kwargs, Context
+
+
+def result_record(query, rank, result):
+    """
+    Build the JSON record of a single search result.
+
+    Args:
+        query(str):                             The search query.
+        rank(int):                              The result rank, starting at 1.
+        result(poogle.containers.PoogleResult): The search result.
+
+    Returns:
+        dict
+    """
+    return {'query': query, 'rank': rank, 'page': result.page.number, 'title': result.title,
+            'url': result.url_string}
+
+
+def search_worker(key, query, results, output, stop, **kwargs):
+    """
+    Execute a search query, putting every result on the output queue as soon as its page has been parsed.
+
+    Args:
+        key(int):                   Identifies the query in output messages, as queries may be repeated.
+        query(str):                 The search query.
+        results(int):               The number of results to retrieve.
+        output(Queue):              Receives ('result', key, record) for every result, followed by either
+                                    ('done', key, None), ('incomplete', key, None) if the search ran out of time or
+                                    queries, or ('error', key, message).
+        stop(threading.Event):      Abandons the search when set.
+        **kwargs:                   Keyword arguments passed on to iter_google_search().
+    """
+    try:
+        for rank, result in enumerate(iter_google_search(query, results, **kwargs), 1):
+            if stop.is_set():
+                break
+            output.put(('result', key, result_record(query, rank, result)))
+    except (PoogleDeadlineError, PoogleMaxQueriesError):
+        output.put(('incomplete', key, None))
+    except Exception as e:
+        output.put(('error', key, str(e) or e.__class__.__name__))
+    else:
+        output.put(('done', key, None))
+
+
+@click.command('batch')
+@click.argument('queries', type=click.File('r'), default='-')
+@click.option('-r', '--results', help='The number of search results to retrieve per query', default=10)
+@click.option('-w', '--workers', help='The number of queries to execute concurrently', default=4)
+@click.option('--per-query', help='Output one JSON object per query instead of per result', is_flag=True)
+@click.option('--parse-processes', help='Parse pages in this many worker processes instead of the worker threads',
+              default=0)
+@click.option('--dedup', help='Only output each result URL once across every query', is_flag=True)
+@click.option('--dedup-bloom', help='Deduplicate with a Bloom filter sized for this many URLs, using fixed memory at '
+                                    'the cost of rarely dropping a new URL', type=int, default=0, metavar='CAPACITY')
+@search_options
+@pass_context
+def cli(ctx, queries, results, workers, per_query, parse_processes, dedup, dedup_bloom, **options):
+    """
+    Execute search queries read one per line from a file (or stdin) and stream the results as JSON lines
+    """
+    assert isinstance(ctx, Context)
+
+    # Every worker shares the same connection pool and rate limit, and duplicate queries share their page requests
+    kwargs = search_kwargs(**options)
+    if kwargs['limiter'] is None:
+        kwargs['limiter'] = IntervalLimiter(kwargs['pause'])
+    kwargs['pause'] = 0
+    if kwargs['session'] is None:
+        kwargs['session'] = create_session(pool_maxsize=workers)
+    kwargs['coalescer'] = RequestCoalescer()
+    if parse_processes:
+        kwargs['parse_executor'] = create_parse_executor(parse_processes)
+    if dedup_bloom:
+        kwargs['dedup'] = BloomFilterIndex(dedup_bloom)
+    elif dedup:
+        kwargs['dedup'] = DedupIndex()
+
+    queries = (line.strip() for line in queries)
+    queries = enumerate(query for query in queries if query)
+
+    executor = ThreadPoolExecutor(workers)
+    output   = Queue()
+    stop     = threading.Event()
+    running  = {}
+    pending  = 0
+    done     = 0
+    failed   = 0
+
+    def submit():
+        for key, query in queries:
+            running[key] = (query, [])
+            executor.submit(search_worker, key, query, results, output, stop, **kwargs)
+            return 1
+        return 0
+
+    try:
+        # Only keep a bounded window of queries pending, so huge query files aren't read up front
+        for __ in range(workers * 2):
+            pending += submit()
+
+        while pending:
+            kind, key, data = output.get()
+
+            if kind == 'result':
+                if per_query:
+                    running[key][1].append(data)
+                else:
+                    click.echo(json.dumps(data))
+                continue
+
+            pending -= 1
+            done += 1
+            query, records = running.pop(key)
+
+            if kind == 'error':
+                failed += 1
+                ctx.log.warning('Search query %r failed: %s', query, data)
+                click.echo(json.dumps({'query': query, 'error': data}))
+            elif per_query:
+                record = {'query': query, 'results': records}
+                if kind == 'incomplete':
+                    record['incomplete'] = True
+                click.echo(json.dumps(record))
+
+            if kind == 'incomplete':
+                ctx.log.warning('Search query %r stopped before every result was retrieved', query)
+
+            click.echo('[{d} done, {f} failed, {p} running] {q}'.format(d=done, f=failed, p=pending, q=query),
+                       err=True)
+            pending += submit()
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
+        if parse_processes:
+            kwargs['parse_executor'].shutdown()
@@ -0,0 +1,100 @@
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+try:
+    from urllib.parse import urlparse, parse_qs
+except ImportError:  # pragma: no cover
+    from urlparse import urlparse, parse_qs
+
+import click
+
+from poogle.archive import PageArchive
+from poogle.parallel import parse_archive_entries
+from poogle.cli import pass_context, Context
+
+
+def page_records(url, record):
+    """
+    Build the JSON records of every result on a re-parsed page.
+
+    Args:
+        url(str):                               The search results page URL.
+        record(poogle.containers.PageRecord):   The parsed page.
+
+    Returns:
+        list[dict]
+    """
+    params = parse_qs(urlparse(url).query)
+    query  = params.get('q', [''])[0]
+    start  = int(params.get('start', ['0'])[0])
+
+    return [{'query': query, 'rank': start + rank, 'page': record.number, 'title': result.title, 'url': result.url}
+            for rank, result in enumerate(record.results, 1)]
+
+
+@click.command('reparse')
+@click.argument('archive', type=click.Path(exists=True, file_okay=False))
+@click.option('-p', '--processes', help='The number of worker processes, defaults to the number of CPUs', type=int)
+@click.option('--parser', help='The HTML parser backend, defaults to the fastest available')
+@click.option('--batch-size', help='The number of pages parsed per worker task', default=100)
+@click.option('--per-page', help='Output one JSON object per page instead of per result', is_flag=True)
+@pass_context
+def cli(ctx, archive, processes, parser, batch_size, per_page):
+    """
+    Rebuild search results from every page in an archive and stream them as JSON lines, without touching the network
+    """
+    assert isinstance(ctx, Context)
+
+    archive = PageArchive(archive)
+    entries = archive.entries()
+    path    = archive.path
+
+    workers  = processes or multiprocessing.cpu_count()
+    executor = ProcessPoolExecutor(workers)
+    pending  = {}
+    pages    = 0
+    failed   = 0
+
+    def submit():
+        batch = list(islice(entries, batch_size))
+        if batch:
+            pending[executor.submit(parse_archive_entries, path, batch, parser)] = batch
+
+    def records(future, batch):
+        try:
+            return future.result()
+        except Exception as e:
+            # A batch that failed as a whole, e.g. a worker crash, is reported page by page like any other error
+            ctx.log.error('Archive batch failed: %r', e)
+            error = str(e) or e.__class__.__name__
+            return [(entry.url, None, error) for entry in batch]
+
+    try:
+        # Only keep a bounded window of batches pending, so huge archives aren't read up front
+        for __ in range(workers * 2):
+            submit()
+
+        while pending:
+            done, __ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = pending.pop(future)
+                submit()
+
+                for url, record, error in records(future, batch):
+                    pages += 1
+                    if error is not None:
+                        failed += 1
+                        ctx.log.warning('Archived page %s could not be parsed: %s', url, error)
+                        click.echo(json.dumps({'source': url, 'error': error}))
+                    elif per_page:
+                        click.echo(json.dumps({'source': url, 'results': page_records(url, record)}))
+                    else:
+                        for data in page_records(url, record):
+                            click.echo(json.dumps(data))
+
+                click.echo('[{p} pages, {f} failed]'.format(p=pages, f=failed), err=True)
+    finally:
+        executor.shutdown(wait=True)
+        archive.close()
@@ -3,15 +3,19 @@ import re
 import click
 
 from poogle import google_search
-from poogle.cli import pass_context, Context
+from poogle.containers import PoogleResultList
+from poogle.stats import SearchStats
+from poogle.cli import pass_context, search_options, search_kwargs, Context
 
 
 @click.command('search')
 @click.argument('query')
 @click.option('-r', '--results', help='The number of search results to retrieve', default=10)
 @click.option('--plain', help='Disables bolding and keyword highlighting', is_flag=True)
+@search_options
+@click.option('--stats', help='Display a timing and counters breakdown of the search', is_flag=True)
 @pass_context
-def cli(ctx, query, results, plain):
+def cli(ctx, query, results, plain, stats, **options):
     """
     Execute a Google search query and display the results
     """
@@ -19,7 +23,15 @@ def cli(ctx, query, results, plain):
 
     # Execute our search query
     click.echo('Executing search query for {q}\n'.format(q=click.style(query, 'blue', bold=True)))
-    results = google_search(query, results)
+    search_stats = SearchStats()
+    results = google_search(query, results, stats=search_stats, **search_kwargs(**options))
+    if results.incomplete:
+        if results.reason == PoogleResultList.QUERY_LIMIT:
+            message = 'Search query reached its query limit before finding enough results'
+        else:
+            message = 'Search query ran out of time'
+        click.secho('{m}, showing the {n} results retrieved\n'.format(m=message, n=len(results)), fg='yellow',
+                    err=True)
 
     # Split our query parts for highlighting
     query_parts = query.split()
@@ -41,10 +53,13 @@ def cli(ctx, query, results, plain):
 
             click.secho(title)
             click.secho('=' * 30)
-            click.secho(result.url.as_string())
+            click.secho(result.url_string)
         else:
             click.echo(result.title)
             click.echo('=' * 30)
-            click.echo(result.url.as_string())
+            click.echo(result.url_string)
 
         click.echo()
+
+    if stats:
+        click.echo(search_stats.summary())
@@ -0,0 +1,106 @@
+"""
+Single-flight coalescing of identical search results page requests made at the same time.
+"""
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError
+
+from poogle.errors import PoogleTimeoutError
+from poogle.stats import timer
+
+# Tells the callers waiting on a call to make it again themselves
+_RETRY = object()
+
+
+class RequestCoalescer(object):
+    """
+    Lets concurrent callers requesting the same key share a single call. The first caller executes it, and every
+    caller arriving while it is in flight waits for its result instead of repeating it. Safe to share between threads.
+
+    Pass it to Poogle or google_search as coalescer to share page requests, keyed on the search URL, between every
+    search using it.
+    """
+    #: Errors that depend on the caller that made the call, such as running out of its own time, so are never shared.
+    #: Waiters make the call again themselves instead
+    PRIVATE_ERRORS = (PoogleTimeoutError,)
+
+    def __init__(self, timeout=None):
+        """
+        Args:
+            timeout(float|None):    The default number of seconds a caller waits on a call in flight before giving
+                                    up. Defaults to waiting indefinitely.
+        """
+        self._log   = logging.getLogger('poogle.coalesce')
+        self._lock  = threading.Lock()
+        self._calls = {}
+
+        self.timeout = timeout
+        self.shared  = 0
+
+    def do(self, key, func, timeout=None):
+        """
+        Execute a call, or wait on the identical call already in flight.
+
+        Args:
+            key(str):               Identifies identical calls.
+            func(callable):         Executes the call. Its errors are raised to every caller waiting on it, except
+                                    for PRIVATE_ERRORS.
+            timeout(float|None):    The number of seconds to wait on a call in flight. Defaults to the coalescer
+                                    timeout. The call itself is never interrupted.
+
+        Returns:
+            tuple(object, bool):    The call result, and whether it was shared from a call made by another caller.
+
+        Raises:
+            PoogleTimeoutError: Raised if the call in flight did not complete within the timeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        end = None if timeout is None else timer() + timeout
+
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = self._calls[key] = Future()
+                else:
+                    self.shared += 1
+
+            if leader:
+                break
+
+            self._log.info('Waiting on identical request in flight: %s', key)
+            try:
+                result = future.result(None if end is None else max(end - timer(), 0))
+            except TimeoutError:
+                self._log.warning('Timed out waiting on identical request in flight: %s', key)
+                raise PoogleTimeoutError('Timed out after {t}s waiting on an identical request'.format(t=timeout))
+
+            if result is not _RETRY:
+                return result, True
+            self._log.info('Identical request in flight failed for its own caller, retrying: %s', key)
+
+        # The call is no longer in flight by the time waiters wake up, so those retrying it can take it over
+        try:
+            result = func()
+        except BaseException as e:
+            self._done(key)
+            if isinstance(e, self.PRIVATE_ERRORS):
+                future.set_result(_RETRY)
+            else:
+                future.set_exception(e)
+            raise
+
+        self._done(key)
+        future.set_result(result)
+        return result, False
+
+    def _done(self, key):
+        with self._lock:
+            del self._calls[key]
+
+    def __len__(self):
+        return len(self._calls)
+
+    def __repr__(self):
+        return '<RequestCoalescer: {n} in flight, {s} shared>'.format(n=len(self._calls), s=self.shared)
@@ -1,27 +1,46 @@
 import re
 import logging
+from collections import namedtuple
 
-from requests.utils import unquote
-from yurl import URL
+try:
+    from urllib.parse import unquote
+except ImportError:  # pragma: no cover
+    from urllib import unquote
 
 from poogle.errors import PoogleParserError, PoogleError, PoogleNoResultsError
+from poogle.parsers import ParsedPage, SoupParser
+
+#: Compact, picklable form of a parsed search results page
+PageRecord = namedtuple('PageRecord', ['number', 'total_results', 'prev_url', 'next_url', 'skipped', 'results'])
+
+#: Compact, picklable form of a parsed search result
+ResultRecord = namedtuple('ResultRecord', ['title', 'url'])
 
 
 class PoogleResultsPage(object):
     """
-    Search results page container
+    Search results page container. The parse tree is released as soon as the page has been parsed.
     """
-    def __init__(self, poogle, soup):
+    __slots__ = ('_poogle', '_soup', '_parsed', 'html', 'results', 'count', 'skipped', 'total_results', 'number',
+                 'prev_url', 'next_url')
+
+    _log = logging.getLogger('poogle.results_page')
+
+    def __init__(self, poogle, soup, html=None):
         """
         Args:
-            poogle(poogle.Poogle):      The parent Poogle object
-            soup(bs4.BeautifulSoup):    The search results page HTML soup.
+            poogle(poogle.Poogle):                      The parent Poogle object
+            soup(poogle.parsers.ParsedPage|bs4.BeautifulSoup):  The data extracted by a parser backend, or the search
+                                                                results page HTML soup.
+            html(bytes|None):                           The raw search results page HTML to keep, if any.
         """
-        self._log    = logging.getLogger('poogle.results_page')
         self._poogle = poogle
         self._soup   = soup
+        self._parsed = soup if isinstance(soup, ParsedPage) else SoupParser.extract(soup)
+        self.html    = html
         self.results = []
         self.count   = 0
+        self.skipped = 0
 
         self.total_results = 0
         self.number = 0
@@ -39,23 +58,28 @@ class PoogleResultsPage(object):
         self._parse_results()
         self._parse_page_number()
 
+        # Parsing is done, don't keep the parse tree alive for as long as the page is
+        self._soup   = None
+        self._parsed = None
+
     def _parse_results(self):
         """
         Parse search results.
         """
-        try:
-            results = self._soup.find(id='search').ol.find_all('li', {'class': 'g'})
-        except AttributeError as e:
-            self._log.debug(e.message)
+        results = self._parsed.results
+        if results is None:
+            self._log.debug('No search results list found')
             raise PoogleNoResultsError('Your search - {q} - did not match any documents.'.format(q=self._poogle.query))
 
-        for result in results:
-            try:
-                self.results.append(PoogleResult(self, result))
-            except PoogleParserError:
+        for title, href in results:
+            result = PoogleResult.from_link(self, title, href)
+            if result is None:
                 self._log.info('Skipping unparsable result')
+                self.skipped += 1
                 continue
 
+            self.results.append(result)
+
         self.count = len(self.results)
 
     def _parse_total_results_count(self):
@@ -67,11 +91,10 @@ class PoogleResultsPage(object):
         """
         # Get the raw result count string
         self._log.debug('Parsing total results count from the search results page')
-        try:
-            stats = self._soup.find(id='resultStats').text
-        except Exception as e:
-            self._log.warn('An error occurred while parsing the total results count: %s', e.message)
-            raise PoogleParserError(e.message)
+        stats = self._parsed.stats
+        if stats is None:
+            self._log.warn('An error occurred while parsing the total results count: no result count found')
+            raise PoogleParserError('No total results count found')
         self._log.debug('Results text matched: %s', stats)
 
         # Parse the result count
@@ -90,11 +113,10 @@ class PoogleResultsPage(object):
         Raises:
             PoogleParserError:  Raised if strict parsing is enabled and the page number could not be parsed.
         """
-        foot = self._soup.find(id='foot')
-        tds = foot.find_all('td')
-        for td in tds:
-            if not td.a and td.text.isdigit():
-                self.number = int(td.text)
+        tds = self._parsed.foot or []
+        for text, href in tds:
+            if href is None and text.isdigit():
+                self.number = int(text)
                 self._log.info('Page number parsed: %d', self.number)
                 break
         else:
@@ -103,17 +125,56 @@ class PoogleResultsPage(object):
                 raise PoogleParserError('Unable to parse the current page number')
 
         # Get the previous / next page links.
-        tds = foot.find_all('td')
-        p_prev = tds[0].a
-        if p_prev:
-            self.prev_url = 'https://www.google.com{q}'.format(q=p_prev.get('href'))
+        if not tds:
+            return
+
+        p_prev = tds[0][1]
+        if p_prev is not None:
+            self.prev_url = 'https://www.google.com{q}'.format(q=p_prev)
             self._log.debug('Previous page URL: %s', self.prev_url)
 
-        p_next = tds[-1].a
-        if p_next:
-            self.next_url = 'https://www.google.com{q}'.format(q=p_next.get('href'))
+        p_next = tds[-1][1]
+        if p_next is not None:
+            self.next_url = 'https://www.google.com{q}'.format(q=p_next)
             self._log.debug('Next page URL: %s', self.next_url)
 
+    @classmethod
+    def from_record(cls, poogle, record, html=None):
+        """
+        Rebuild a page from a record, without parsing anything.
+
+        Args:
+            poogle(poogle.Poogle):  The parent Poogle object
+            record(PageRecord):     The page record.
+            html(bytes|None):       The raw search results page HTML to keep, if any.
+
+        Returns:
+            PoogleResultsPage
+        """
+        page = cls.__new__(cls)
+        page._poogle = poogle
+        page._soup   = None
+        page._parsed = None
+        page.html    = html
+
+        page.number        = record.number
+        page.total_results = record.total_results
+        page.prev_url      = record.prev_url
+        page.next_url      = record.next_url
+        page.skipped       = record.skipped
+        page.results       = [PoogleResult.from_record(page, r) for r in record.results]
+        page.count         = len(page.results)
+
+        return page
+
+    def to_record(self):
+        """
+        Returns:
+            PageRecord
+        """
+        results = [ResultRecord(r.title, r.url_string) for r in self.results]
+        return PageRecord(self.number, self.total_results, self.prev_url, self.next_url, self.skipped, results)
+
     def __len__(self):
         return self.count
 
@@ -123,47 +184,120 @@ class PoogleResultsPage(object):
 
 class PoogleResult(object):
     """
-    Single search result container.
+    Single search result container. Only the raw link text and target are kept when a page is parsed, the URL is
+    decoded when it is first accessed.
     """
-    def __init__(self, page, soup):
+    __slots__ = ('page', 'title', '_raw_url', '_quoted', '_url')
+
+    url_regex = re.compile(r'^/url\?q=(?P<url>.+)&sa=\w')
+
+    def __init__(self, page, title, href):
         """
         Args:
             page(PoogleResultsPage):    The page this search result was found on
-            soup(bs4.element.Tag):      The search result HTML soup
+            title(str|None):            The search result link text
+            href(str|None):             The search result link target
+
+        Raises:
+            PoogleParserError:  Raised if the result can not be parsed for any reason
         """
-        self._log = logging.getLogger('poogle.result')
-        self._soup = soup
-        self.page = page
+        raw_url = self.match(title, href)
+        if raw_url is None:
+            raise PoogleParserError('Unable to parse search result: {t!r} ({h!r})'.format(t=title, h=href))
 
-        self.title = None
-        self.url = None
-        self.url_regex = re.compile(r'^/url\?q=(?P<url>.+)&sa=\w')
+        self._set(page, title, raw_url, True)
 
-        self._parse_result()
+    def _set(self, page, title, raw_url, quoted):
+        self.page     = page
+        self.title    = title
+        self._raw_url = raw_url
+        self._quoted  = quoted
+        self._url     = None
 
-    def _parse_result(self):
+    @classmethod
+    def match(cls, title, href):
         """
-        Parse search result data.
+        Check whether a search result link can be parsed, without raising any errors. Links without text, and links
+        that aren't result URLs (links to image results, for example), are rejected.
 
-        Raises:
-            PoogleParserError:  Raised if the result can not be parsed for any reason
+        Args:
+            title(str|None):    The search result link text
+            href(str|None):     The search result link target
+
+        Returns:
+            str|None:   The still quoted result URL, or None if the result can not be parsed.
+        """
+        if title is None or not href or not href.startswith('/url?'):
+            return None
+
+        match = cls.url_regex.match(href)
+        return match.group('url') if match else None
+
+    @classmethod
+    def from_link(cls, page, title, href):
+        """
+        Create a search result from a parsed link.
+
+        Args:
+            page(PoogleResultsPage):    The page this search result was found on
+            title(str|None):            The search result link text
+            href(str|None):             The search result link target
+
+        Returns:
+            PoogleResult|None:  The search result, or None if the result can not be parsed.
+        """
+        raw_url = cls.match(title, href)
+        if raw_url is None:
+            return None
+
+        result = cls.__new__(cls)
+        result._set(page, title, raw_url, True)
+        return result
+
+    @classmethod
+    def from_record(cls, page, record):
+        """
+        Rebuild a search result from a record, without parsing anything.
+
+        Args:
+            page(PoogleResultsPage):    The page this search result was found on
+            record(ResultRecord):       The search result record.
+
+        Returns:
+            PoogleResult
+        """
+        result = cls.__new__(cls)
+        result._set(page, record.title, record.url, False)
+        return result
+
+    @property
+    def url_string(self):
+        """
+        The result URL as a string, without building a URL object.
+
+        Returns:
+            str
+        """
+        if self._quoted:
+            self._raw_url = unquote(self._raw_url)
+            self._quoted  = False
+
+        return self._raw_url
+
+    @property
+    def url(self):
         """
-        self.title = self._soup.a.text
-        self._log.info('Result title parsed: %s', self.title)
+        The result URL, decoded the first time it is accessed.
 
-        # Make sure this is a valid result URL (and not a link to image results, as an example).
-        href = self._soup.a.get('href')
-        if not href.startswith('/url?'):
-            raise PoogleParserError('Unrecognized URL format: %s', href)
+        Returns:
+            yurl.URL
+        """
+        if self._url is None:
+            from yurl import URL
 
-        match = self.url_regex.match(href)
-        if not match or not match.group('url'):
-            self._log.error('Unable to parse search result URL: {h}'.format(h=href))
-            raise PoogleParserError('Unable to parse search result URL: %s', href)
+            self._url = URL(self.url_string)
 
-        url = unquote(match.group('url'))
-        self.url = URL(url)
-        self._log.info('Result URL parsed: %s', self.url)
+        return self._url
 
     def __repr__(self):
         return '<PoogleResult Container: "{title!r}">'.format(title=self.title)
@@ -173,3 +307,25 @@ class PoogleResult(object):
 
     def __str__(self):
         return str(self).encode('utf-8')
+
+
+class PoogleResultList(list):
+    """
+    The search results returned by poogle.google_search(). incomplete is True if the search ran out of time, or reached
+    its query limit, before every requested result was retrieved, and reason is then DEADLINE or QUERY_LIMIT.
+    """
+    DEADLINE    = 'deadline'
+    QUERY_LIMIT = 'query_limit'
+
+    incomplete = False
+    reason     = None
+
+    def stop(self, reason):
+        """
+        Mark the results as incomplete.
+
+        Args:
+            reason(str):    Why the search stopped early, DEADLINE or QUERY_LIMIT.
+        """
+        self.incomplete = True
+        self.reason     = reason
@@ -0,0 +1,174 @@
+"""
+Deduplication of search results by normalized URL, within a search or across every search of a batch.
+"""
+import hashlib
+import math
+import struct
+import threading
+
+try:
+    from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+except ImportError:  # pragma: no cover
+    from urlparse import urlsplit, urlunsplit, parse_qsl
+    from urllib import urlencode
+
+#: Query parameters that only track where a visit came from, and never change the page
+TRACKING_PARAMS = frozenset(['gclid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid', '_ga',
+                             '_gl', 'ref_src'])
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """
+    Normalize a URL so that addresses of the same page compare equal.
+
+    The scheme and host are lowercased, default ports, fragments, tracking query parameters and trailing slashes are
+    removed, and the remaining query parameters are sorted.
+
+    Args:
+        url(str):   The URL.
+
+    Returns:
+        str
+    """
+    parts  = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host   = (parts.hostname or '').rstrip('.')
+
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = '{h}:{p}'.format(h=host, p=parts.port)
+    if parts.username:
+        netloc = '{u}@{n}'.format(u=parts.username, n=netloc)
+
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+              if k not in TRACKING_PARAMS and not k.startswith(TRACKING_PREFIXES)]
+
+    return urlunsplit((scheme, netloc, parts.path.rstrip('/'), urlencode(sorted(params)), ''))
+
+
+class DedupIndex(object):
+    """
+    Exact index of the normalized URLs seen so far. Safe to share between threads, to deduplicate across searches.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = set()
+
+    def add(self, url):
+        """
+        Add a URL to the index.
+
+        Args:
+            url(str):   The URL.
+
+        Returns:
+            bool:   True if the URL had not been seen before.
+        """
+        key = normalize_url(url)
+        with self._lock:
+            if key in self._seen:
+                return False
+
+            self._seen.add(key)
+            return True
+
+    def __contains__(self, url):
+        return normalize_url(url) in self._seen
+
+    def __len__(self):
+        return len(self._seen)
+
+    def __repr__(self):
+        return '<DedupIndex: {n} URLs>'.format(n=len(self))
+
+
+class BloomFilterIndex(object):
+    """
+    Approximate index of the normalized URLs seen so far, for runs too large to keep every URL in memory. Memory use
+    is fixed up front by the capacity and error rate.
+
+    URLs are never reported as new when they have been seen, but a small fraction of new URLs, up to the error rate,
+    will be reported as seen and dropped.
+    """
+    def __init__(self, capacity=1000000, error_rate=0.001):
+        """
+        Args:
+            capacity(int):      The number of URLs expected to be added.
+            error_rate(float):  The fraction of new URLs that may be reported as seen once capacity URLs have been
+                                added.
+
+        Raises:
+            ValueError: Raised if capacity is not positive or error_rate is not between 0 and 1 (exclusive)
+        """
+        if capacity < 1:
+            raise ValueError('capacity must be a positive number')
+        if not 0 < error_rate < 1:
+            raise ValueError('error_rate must be between 0 and 1')
+
+        self._lock  = threading.Lock()
+        self._count = 0
+
+        self.capacity   = capacity
+        self.error_rate = error_rate
+
+        self.size   = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(int(round(self.size / float(capacity) * math.log(2))), 1)
+        self._bits  = bytearray((self.size + 7) // 8)
+
+    def _positions(self, url):
+        # Double hashing derives every bit position from a single digest
+        digest = hashlib.md5(normalize_url(url).encode('utf-8')).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, url):
+        """
+        Add a URL to the index.
+
+        Args:
+            url(str):   The URL.
+
+        Returns:
+            bool:   True if the URL had (probably) not been seen before.
+        """
+        positions = self._positions(url)
+        with self._lock:
+            new = False
+            for position in positions:
+                mask = 1 << (position & 7)
+                if not self._bits[position >> 3] & mask:
+                    self._bits[position >> 3] |= mask
+                    new = True
+
+            self._count += int(new)
+            return new
+
+    def __contains__(self, url):
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(url))
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return '<BloomFilterIndex: {n} of {c} URLs>'.format(n=self._count, c=self.capacity)
+
+
+def create_dedup_index(dedup):
+    """
+    Get the dedup index to use for a dedup argument.
+
+    Args:
+        dedup(bool|DedupIndex|BloomFilterIndex|None):   True for a new exact index, an existing index to share it, or
+                                                        a false value to disable deduplication.
+
+    Returns:
+        DedupIndex|BloomFilterIndex|None
+    """
+    # Indexes are compared explicitly, as an empty index is falsy
+    if dedup is None or dedup is False:
+        return None
+
+    return DedupIndex() if dedup is True else dedup
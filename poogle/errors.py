@@ -3,7 +3,17 @@ class PoogleError(Exception):
 
 
 class PoogleRequestError(PoogleError):
-    pass
+    """
+    Raised when a page request fails.
+    """
+    def __init__(self, message='', status=None):
+        """
+        Args:
+            message(str):       The error message.
+            status(int|None):   The HTTP status code of the error response, or None if no response was received.
+        """
+        PoogleError.__init__(self, message)
+        self.status = status
 
 
 class PoogleParserError(PoogleError):
@@ -20,3 +30,29 @@ class PoogleNoResultsError(PoogleError):
 
 class PoogleNoMoreResultsError(PoogleError):
     pass
+
+
+class PoogleThrottledError(PoogleRequestError):
+    """
+    Raised when Google rejects a request as rate limited, with a 429 / 503 response or its CAPTCHA interstitial.
+    """
+    def __init__(self, message, retry_after=None, status=None):
+        """
+        Args:
+            message(str):               The error message.
+            retry_after(float|None):    The number of seconds Google asked us to wait, if any.
+            status(int|None):           The HTTP status code of the response, if it was an error response.
+        """
+        PoogleRequestError.__init__(self, message, status)
+        self.retry_after = retry_after
+
+
+class PoogleTimeoutError(PoogleRequestError):
+    pass
+
+
+class PoogleDeadlineError(PoogleTimeoutError):
+    """
+    Raised when a search runs out of time before it completes, see poogle.google_search().
+    """
+    pass
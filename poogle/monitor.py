@@ -0,0 +1,224 @@
+"""
+Incremental refreshing of tracked search queries, reporting how their rankings changed between refreshes.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from poogle import Poogle
+from poogle.errors import PoogleNoMoreResultsError
+
+#: A ranked search result, as stored between refreshes
+RankedResult = namedtuple('RankedResult', ['url', 'title'])
+
+
+class RankChange(namedtuple('RankChange', ['url', 'title', 'old_rank', 'new_rank'])):
+    """
+    A URL whose rank changed between two refreshes. old_rank is None for new URLs, and new_rank is None for dropped
+    URLs.
+    """
+    __slots__ = ()
+
+    @property
+    def delta(self):
+        """
+        The number of ranks the URL moved up by, negative if it moved down, or None if it is new or dropped.
+
+        Returns:
+            int|None
+        """
+        if self.old_rank is None or self.new_rank is None:
+            return None
+
+        return self.old_rank - self.new_rank
+
+
+class RankDiff(object):
+    """
+    The ranking changes of a query between two refreshes.
+    """
+    def __init__(self, query, old, new, pages):
+        """
+        Args:
+            query(str):                 The search query.
+            old(list[RankedResult]):    The previous ranking.
+            new(list[RankedResult]):    The current ranking.
+            pages(int):                 The number of pages fetched to refresh the ranking.
+        """
+        self.query   = query
+        self.ranking = new
+        self.pages   = pages
+
+        old_ranks = _ranks(old)
+        new_ranks = _ranks(new)
+
+        self.new     = [RankChange(r.url, r.title, None, new_ranks[r.url]) for r in new if r.url not in old_ranks]
+        self.dropped = [RankChange(r.url, r.title, old_ranks[r.url], None) for r in old if r.url not in new_ranks]
+        self.moved   = [RankChange(r.url, r.title, old_ranks[r.url], new_ranks[r.url]) for r in new
+                        if r.url in old_ranks and old_ranks[r.url] != new_ranks[r.url]]
+
+    @property
+    def changed(self):
+        return bool(self.new or self.dropped or self.moved)
+
+    def __repr__(self):
+        return '<RankDiff: {q!r} ({n} new, {d} dropped, {m} moved)>'.format(q=self.query, n=len(self.new),
+                                                                            d=len(self.dropped), m=len(self.moved))
+
+
+def _ranks(ranking):
+    """
+    Map every URL in a ranking to its rank, starting at 1. Only the highest rank of a repeated URL is kept.
+
+    Args:
+        ranking(list[RankedResult]):    The ranking.
+
+    Returns:
+        dict
+    """
+    ranks = {}
+    for rank, result in enumerate(ranking, 1):
+        ranks.setdefault(result.url, rank)
+
+    return ranks
+
+
+class RankingStore(object):
+    """
+    SQLite store of the last known ranking of every tracked query.
+    """
+    def __init__(self, path=':memory:'):
+        """
+        Args:
+            path(str):  The SQLite database path. Defaults to a store that is not persisted.
+        """
+        self._lock = threading.Lock()
+        self.path  = path
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS rankings (query TEXT PRIMARY KEY, ranking TEXT, updated REAL)')
+        self._db.commit()
+
+    def get(self, query):
+        """
+        Args:
+            query(str): The search query.
+
+        Returns:
+            list[RankedResult]|None:    The last known ranking, or None if the query has never been refreshed.
+        """
+        with self._lock:
+            row = self._db.execute('SELECT ranking FROM rankings WHERE query = ?', (query,)).fetchone()
+
+        return [RankedResult(*r) for r in json.loads(row[0])] if row else None
+
+    def set(self, query, ranking):
+        """
+        Args:
+            query(str):                     The search query.
+            ranking(list[RankedResult]):    The current ranking.
+        """
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO rankings (query, ranking, updated) VALUES (?, ?, ?)',
+                             (query, json.dumps([list(r) for r in ranking]), time.time()))
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM rankings').fetchone()[0]
+
+    def __repr__(self):
+        return '<RankingStore: {p!r} ({n} queries)>'.format(p=self.path, n=len(self))
+
+
+class SearchMonitor(object):
+    """
+    Refreshes tracked search queries with as few page requests as possible.
+
+    The top ranks are always fetched. Deeper pages are only fetched while the set of URLs on each fetched page
+    differs from the last known ranking at the same ranks, as URLs moving within a page don't shift the pages below
+    it. The rest of the ranking is carried over from the last refresh.
+    """
+    def __init__(self, store=None, results=100, per_page=10, depth=None, **kwargs):
+        """
+        Args:
+            store(RankingStore|None):   Where the last known rankings are kept. Defaults to a store that is not
+                                        persisted.
+            results(int):               The number of ranks tracked for every query.
+            per_page(int):              The number of results fetched per page request.
+            depth(int|None):            The number of top ranks fetched on every refresh. Defaults to one page.
+            **kwargs:                   Keyword arguments passed on to the Poogle objects.
+        """
+        self._log = logging.getLogger('poogle.monitor')
+
+        self.store    = store if store is not None else RankingStore()
+        self.results  = results
+        self.per_page = per_page
+        self.depth    = depth or per_page
+        self.kwargs   = kwargs
+
+    def refresh(self, query):
+        """
+        Refresh the ranking of a query.
+
+        Args:
+            query(str): The search query.
+
+        Returns:
+            RankDiff:   The changes since the last refresh. Every result is new on the first refresh of a query.
+
+        Raises:
+            poogle.errors.PoogleRequestError:   Raised if an error occurs while executing the search query.
+        """
+        old = self.store.get(query)
+        new = []
+        pages = 0
+
+        search = Poogle(query, self.per_page, keep_pages=1, **self.kwargs)
+        try:
+            while len(new) < self.results:
+                try:
+                    page = search.next_page()
+                except PoogleNoMoreResultsError:
+                    break
+
+                pages += 1
+                start = len(new)
+                new += [RankedResult(r.url_string, r.title) for r in page.results]
+
+                if old is not None and page.results and len(new) >= self.depth and self._settled(old, new, start):
+                    self._log.info('Ranking of %r unchanged from rank %d, carrying over the rest', query, start + 1)
+                    seen = set(r.url for r in new)
+                    new += [r for r in old[len(new):] if r.url not in seen]
+                    break
+        finally:
+            search.close()
+
+        new = new[:self.results]
+        diff = RankDiff(query, old or [], new, pages)
+        self.store.set(query, new)
+
+        return diff
+
+    @staticmethod
+    def _settled(old, new, start):
+        """
+        Check whether the ranks on the last fetched page hold the same URLs as in the previous ranking.
+
+        Args:
+            old(list[RankedResult]):    The previous ranking.
+            new(list[RankedResult]):    The ranking fetched so far.
+            start(int):                 The index of the first result on the last fetched page.
+
+        Returns:
+            bool
+        """
+        return set(r.url for r in new[start:]) == set(r.url for r in old[start:len(new)])
+
+    def __repr__(self):
+        return '<SearchMonitor: {r} results, {p} per page>'.format(r=self.results, p=self.per_page)
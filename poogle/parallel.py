@@ -0,0 +1,84 @@
+"""
+Search results page parsing in worker processes, so parsing many pages at once isn't limited to a single core.
+"""
+import logging
+
+from poogle.containers import PoogleResultsPage
+from poogle.parsers import get_parser
+
+
+class RecordParent(object):
+    """
+    The parent Poogle attributes read while parsing a page, in a form that can be sent to a worker process.
+    """
+    def __init__(self, query=None, strict=False):
+        self.query  = query
+        self.strict = strict
+
+
+def parse_page_record(content, parser=None, query=None, strict=False):
+    """
+    Parse a search results page into a compact, picklable record. Safe to run in a worker process.
+
+    Args:
+        content(bytes):             The raw search results page HTML.
+        parser(str|object|None):    The HTML parser backend, see poogle.parsers.
+        query(str|None):            The search query, used in error messages.
+        strict(bool):               Raise errors on non-critical parsing failures.
+
+    Returns:
+        poogle.containers.PageRecord
+
+    Raises:
+        poogle.errors.PoogleError:  Raised if the page can not be parsed.
+    """
+    page = PoogleResultsPage(RecordParent(query, strict), get_parser(parser).parse(content))
+    return page.to_record()
+
+
+def parse_archive_entries(path, entries, parser=None):
+    """
+    Read and parse a batch of archived pages. Safe to run in a worker process, so only the page locations are sent to
+    the worker and the archive is read in parallel too.
+
+    Args:
+        path(str):                                  The archive directory.
+        entries(list[poogle.archive.ArchiveEntry]): The pages to parse.
+        parser(str|None):                           The HTML parser backend, see poogle.parsers.
+
+    Returns:
+        list[tuple(str, PageRecord|None, str|None)]:    The URL of every page, paired with either its record or the
+            error it could not be read or parsed with. Errors are returned as strings, as parser exceptions can't
+            always be pickled back to the parent process.
+    """
+    from poogle.archive import read_entry
+
+    log     = logging.getLogger('poogle.parallel')
+    parser  = get_parser(parser)
+    records = []
+    for entry in entries:
+        try:
+            record = parse_page_record(read_entry(path, entry).content, parser)
+        except Exception as e:
+            # Corrupt segments and unparsable pages only fail their own entry, never the whole batch
+            log.debug('Archived page %s could not be parsed: %r', entry.url, e)
+            records.append((entry.url, None, str(e) or e.__class__.__name__))
+        else:
+            records.append((entry.url, record, None))
+
+    return records
+
+
+def create_parse_executor(workers=None):
+    """
+    Create a process pool to parse search results pages with. Pass it to Poogle or google_search as parse_executor.
+
+    Args:
+        workers(int|None):  The number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        concurrent.futures.ProcessPoolExecutor
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(workers)
@@ -0,0 +1,177 @@
+import logging
+
+try:
+    string_types = basestring
+except NameError:  # pragma: no cover
+    string_types = str
+
+# The only regions of a search results page we extract anything from
+PARSE_REGIONS = ['search', 'resultStats', 'foot']
+
+
+class ParsedPage(object):
+    """
+    The raw data extracted from a search results page, before it is parsed into containers.
+    """
+    def __init__(self, results=None, stats=None, foot=None):
+        """
+        Args:
+            results(list[tuple]|None):  A (title, href) pair for every search result, or None if the page has no
+                                        search results list. Either value is None if the result has no link.
+            stats(str|None):            The total results count text.
+            foot(list[tuple]|None):     A (text, href) pair for every pagination table cell, or None if the page has
+                                        no pagination footer. href is None for cells without a link.
+        """
+        self.results = results
+        self.stats   = stats
+        self.foot    = foot
+
+
+class SoupParser(object):
+    """
+    Pure Python parser backend. Only the search results, result count and pagination regions are built into a tree.
+    """
+    name     = 'html.parser'
+    features = 'html.parser'
+
+    @staticmethod
+    def available():
+        return True
+
+    def parse(self, content):
+        """
+        Args:
+            content(bytes|str): The search results page HTML.
+
+        Returns:
+            ParsedPage
+        """
+        from bs4 import BeautifulSoup, SoupStrainer
+
+        soup = BeautifulSoup(content, self.features, parse_only=SoupStrainer(id=PARSE_REGIONS))
+        return self.extract(soup)
+
+    @staticmethod
+    def extract(soup):
+        """
+        Extract the raw search results page data from an existing HTML soup.
+
+        Args:
+            soup(bs4.BeautifulSoup):    The search results page HTML soup.
+
+        Returns:
+            ParsedPage
+        """
+        page = ParsedPage()
+
+        search = soup.find(id='search')
+        if search and search.ol:
+            page.results = []
+            for li in search.ol.find_all('li', {'class': 'g'}):
+                a = li.a
+                page.results.append((a.text, a.get('href')) if a else (None, None))
+
+        stats = soup.find(id='resultStats')
+        if stats:
+            page.stats = stats.text
+
+        foot = soup.find(id='foot')
+        if foot:
+            page.foot = [(td.text, td.a.get('href', '') if td.a else None) for td in foot.find_all('td')]
+
+        return page
+
+
+class LxmlParser(object):
+    """
+    lxml parser backend. Regions are extracted with XPath directly from the lxml tree, without building a soup.
+    """
+    name = 'lxml'
+
+    RESULTS_XPATH = "(//*[@id='search']//ol)[1]//li[contains(concat(' ', normalize-space(@class), ' '), ' g ')]"
+
+    @staticmethod
+    def available():
+        try:
+            import lxml.html
+        except ImportError:
+            return False
+
+        return True
+
+    def parse(self, content):
+        """
+        Args:
+            content(bytes|str): The search results page HTML.
+
+        Returns:
+            ParsedPage
+        """
+        import lxml.etree
+        import lxml.html
+
+        page = ParsedPage()
+        try:
+            doc = lxml.html.document_fromstring(content)
+        except lxml.etree.LxmlError as e:
+            # Empty and unparsable documents have no regions, just like they would with BeautifulSoup
+            logging.getLogger('poogle.parsers').debug('lxml could not parse the page: %r', e)
+            return page
+
+        if doc.xpath("//*[@id='search']//ol"):
+            page.results = []
+            for li in doc.xpath(self.RESULTS_XPATH):
+                a = li.find('.//a')
+                page.results.append((a.text_content(), a.get('href')) if a is not None else (None, None))
+
+        stats = doc.xpath("//*[@id='resultStats']")
+        if stats:
+            page.stats = stats[0].text_content()
+
+        foot = doc.xpath("//*[@id='foot']")
+        if foot:
+            page.foot = []
+            for td in foot[0].iter('td'):
+                a = td.find('.//a')
+                page.foot.append((td.text_content(), a.get('href', '') if a is not None else None))
+
+        return page
+
+
+PARSERS = {SoupParser.name: SoupParser, LxmlParser.name: LxmlParser}
+
+
+def available_parsers():
+    """
+    Get the names of the parser backends whose dependencies are installed. Importing them is deferred until then.
+
+    Returns:
+        list[str]
+    """
+    return sorted(name for name, parser in PARSERS.items() if parser.available())
+
+
+def get_parser(parser=None):
+    """
+    Get a parser backend.
+
+    Args:
+        parser(str|object|None):    A parser backend name or instance. Defaults to the fastest available backend.
+
+    Returns:
+        SoupParser|LxmlParser
+
+    Raises:
+        ValueError: Raised if the requested parser backend is not available
+    """
+    if parser is None:
+        parser = LxmlParser.name if LxmlParser.available() else SoupParser.name
+
+    if not isinstance(parser, string_types):
+        return parser
+
+    if parser not in PARSERS or not PARSERS[parser].available():
+        logging.getLogger('poogle.parsers').error('Parser backend not available: %s', parser)
+        raise ValueError('Unknown or unavailable parser backend: {p}'.format(p=parser))
+
+    return PARSERS[parser]()
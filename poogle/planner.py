@@ -0,0 +1,123 @@
+"""
+Planning of the page requests needed to retrieve a number of search results in as few round trips as possible.
+"""
+import logging
+import math
+
+#: The maximum number of results a single search results page can hold
+MAX_PER_PAGE = 100
+
+#: The fraction of results searches plan for being unparsable, as result pages usually hold a few news, image or video
+#: blocks that aren't search results
+DEFAULT_SKIP_RATE = 0.1
+
+
+class QueryPlan(object):
+    """
+    The page requests planned for a search. Every page is requested with the same num, so page n starts at
+    (n - 1) * per_page.
+    """
+    __slots__ = ('results', 'skip_rate', 'per_page', 'requests')
+
+    def __init__(self, results, skip_rate, per_page, requests):
+        """
+        Args:
+            results(int):       The number of results requested.
+            skip_rate(float):   The expected fraction of results on each page that can not be parsed.
+            per_page(int):      The number of results to request per page.
+            requests(int):      The number of page requests planned.
+        """
+        self.results   = results
+        self.skip_rate = skip_rate
+        self.per_page  = per_page
+        self.requests  = requests
+
+    @property
+    def pages(self):
+        """
+        The (start, num) offset pair of every planned page request.
+
+        Returns:
+            list[tuple(int, int)]
+        """
+        return [(n * self.per_page, self.per_page) for n in range(self.requests)]
+
+    @property
+    def fetched(self):
+        """
+        The total number of results requested from the search engine, including any headroom for skipped results.
+
+        Returns:
+            int
+        """
+        return self.per_page * self.requests
+
+    @property
+    def expected_results(self):
+        """
+        The number of parsable results the planned pages are expected to hold.
+
+        Returns:
+            int
+        """
+        return int(self.fetched * (1 - self.skip_rate))
+
+    def __repr__(self):
+        return '<QueryPlan: {r} results in {n} requests of {p}>'.format(r=self.results, n=self.requests,
+                                                                       p=self.per_page)
+
+
+def expected_skip_rate(stats=None):
+    """
+    Get the fraction of results expected to be unparsable, to plan a search with explicitly. Plans made from the
+    observed rate change as stats do, so their page URLs may not match earlier cache or archive entries.
+
+    Args:
+        stats(poogle.stats.SearchStats|None):   The statistics of earlier searches, if any.
+
+    Returns:
+        float:  The skip rate observed by stats, or DEFAULT_SKIP_RATE if no results have been seen yet.
+    """
+    if stats is None or not (stats.results + stats.skipped):
+        return DEFAULT_SKIP_RATE
+
+    return stats.skip_rate
+
+
+def plan_search(results, skip_rate=0.0):
+    """
+    Plan the page requests needed to retrieve a number of search results.
+
+    The fewest requests that can hold the results are planned first, and the results are then spread evenly across
+    them, so no more results than needed are downloaded. For example 150 results are planned as 2 requests of 75
+    rather than 2 requests of 100. Headroom for unparsable results is only added while it fits in those requests, as
+    an extra request would cost a round trip on every search rather than only on those that skip too many results,
+    which are topped up one page at a time anyway. For example 10 results are planned as 1 request of 12 with a skip
+    rate of 0.1, but 100 results as a single request of 100.
+
+    Args:
+        results(int):       The number of results to retrieve.
+        skip_rate(float):   The expected fraction of results on each page that can not be parsed, see
+                            expected_skip_rate().
+
+    Returns:
+        QueryPlan
+
+    Raises:
+        ValueError: Raised if skip_rate is not between 0 (inclusive) and 1 (exclusive)
+    """
+    if not 0 <= skip_rate < 1:
+        raise ValueError('skip_rate must be between 0 and 1')
+
+    results = max(results, 0)
+
+    # The number of results to fetch so that enough are left once unparsable results are skipped. Rounded first so
+    # float error doesn't cost a whole extra request
+    needed = int(math.ceil(round(results / (1.0 - skip_rate), 6)))
+
+    requests = -(-results // MAX_PER_PAGE)
+    per_page = min(max(-(-needed // requests), 1), MAX_PER_PAGE) if requests else 1
+
+    plan = QueryPlan(results, skip_rate, per_page, requests)
+    logging.getLogger('poogle.planner').debug('Planned search: %r', plan)
+    return plan
@@ -0,0 +1,262 @@
+import logging
+import os
+import random
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from poogle.errors import PoogleTimeoutError
+
+_default_limiter = None
+
+
+def _too_long(log, wait, timeout):
+    """
+    Check whether a rate limited wait would take longer than a timeout, in which case it is not waited on at all.
+
+    Args:
+        log(logging.Logger):    Logs the refused wait.
+        wait(float):            The number of seconds to wait.
+        timeout(float|None):    The maximum number of seconds to wait, or None to wait as long as needed.
+
+    Raises:
+        PoogleTimeoutError: Raised if the wait would take longer than the timeout
+    """
+    if timeout is not None and wait > timeout:
+        log.debug('Rate limited for %.3f seconds, longer than the %.3f second timeout', wait, timeout)
+        raise PoogleTimeoutError('Rate limited for {w:.3f}s, longer than the timeout'.format(w=wait))
+
+
+class IntervalLimiter(object):
+    """
+    Enforces a minimum interval between requests, shared by every thread using the limiter.
+    """
+    def __init__(self, interval):
+        """
+        Args:
+            interval(float):    The minimum number of seconds between requests.
+        """
+        self._log      = logging.getLogger('poogle.ratelimit')
+        self._lock     = threading.Lock()
+        self._next     = 0.0
+        self.interval  = interval
+
+    def acquire(self, timeout=None):
+        """
+        Block until a request may be made.
+
+        Args:
+            timeout(float|None):    The maximum number of seconds to wait. Defaults to waiting as long as needed.
+
+        Returns:
+            float:  The number of seconds spent waiting.
+
+        Raises:
+            PoogleTimeoutError: Raised without waiting, or using up the request, if it would take longer than timeout
+        """
+        with self._lock:
+            now  = time.time()
+            wait = max(self._next - now, 0.0)
+            _too_long(self._log, wait, timeout)
+            self._next = max(self._next, now) + self.interval
+
+        if wait:
+            self._log.debug('Rate limited, waiting %.3f seconds', wait)
+            time.sleep(wait)
+
+        return wait
+
+
+def _take_token(tokens, updated, now, rate, burst):
+    """
+    Refill a token bucket and take a single token from it, reserving a future token if the bucket is empty.
+
+    Args:
+        tokens(float):  The number of tokens in the bucket when it was last updated.
+        updated(float): The time the bucket was last updated.
+        now(float):     The current time.
+        rate(float):    The number of tokens added to the bucket every second.
+        burst(int):     The maximum number of tokens the bucket can hold.
+
+    Returns:
+        tuple(float, float):    The number of tokens left in the bucket, and the number of seconds to wait before
+            the taken token may be used.
+    """
+    tokens = min(float(burst), tokens + max(now - updated, 0.0) * rate) - 1
+    wait = -tokens / rate if tokens < 0 else 0.0
+
+    return tokens, wait
+
+
+class TokenBucketLimiter(object):
+    """
+    Token bucket rate limiter, shared by every thread using the limiter.
+
+    Requests are let through immediately while tokens are available, so bursts below the sustained rate are never
+    delayed.
+    """
+    def __init__(self, rate, burst=1, jitter=0.0):
+        """
+        Args:
+            rate(float):    The sustained number of requests allowed per second.
+            burst(int):     The number of requests that may be made back to back before being rate limited.
+            jitter(float):  The maximum number of random seconds added to every wait, to keep workers from waking
+                            up in lockstep.
+
+        Raises:
+            ValueError: Raised if the rate is not positive or burst is less than 1
+        """
+        if rate <= 0:
+            raise ValueError('rate must be a positive number')
+        if burst < 1:
+            raise ValueError('burst must be at least 1')
+
+        self._log     = logging.getLogger('poogle.ratelimit')
+        self._lock    = threading.Lock()
+        self.rate     = float(rate)
+        self.burst    = burst
+        self.jitter   = jitter
+
+        self._tokens  = float(burst)
+        self._updated = time.time()
+
+    def acquire(self, timeout=None):
+        """
+        Block until a request may be made.
+
+        Args:
+            timeout(float|None):    The maximum number of seconds to wait. Defaults to waiting as long as needed.
+
+        Returns:
+            float:  The number of seconds spent waiting.
+
+        Raises:
+            PoogleTimeoutError: Raised without waiting, or taking a token, if it would take longer than timeout
+        """
+        with self._lock:
+            now = time.time()
+            tokens, wait = _take_token(self._tokens, self._updated, now, self.rate, self.burst)
+            _too_long(self._log, wait, timeout)
+            self._tokens, self._updated = tokens, now
+
+        return self._wait(wait, timeout)
+
+    def _wait(self, wait, timeout=None):
+        if wait and self.jitter:
+            wait += random.uniform(0, self.jitter)
+            if timeout is not None:
+                wait = min(wait, timeout)
+
+        if wait:
+            self._log.debug('Rate limited, waiting %.3f seconds', wait)
+            time.sleep(wait)
+
+        return wait
+
+
+class FileLockLimiter(TokenBucketLimiter):
+    """
+    Token bucket rate limiter shared between processes. The bucket state is kept in a file guarded by an exclusive
+    file lock, so every process pointed at the same path draws from the same bucket.
+    """
+    def __init__(self, path, rate, burst=1, jitter=0.0):
+        """
+        Args:
+            path(str):      The path of the shared bucket state file. It is created if it does not exist.
+            rate(float):    The sustained number of requests allowed per second.
+            burst(int):     The number of requests that may be made back to back before being rate limited.
+            jitter(float):  The maximum number of random seconds added to every wait.
+
+        Raises:
+            RuntimeError:   Raised if file locking is not supported on this platform
+        """
+        if fcntl is None:
+            raise RuntimeError('File lock rate limiting is not supported on this platform')
+
+        TokenBucketLimiter.__init__(self, rate, burst, jitter)
+        self.path = path
+
+    def acquire(self, timeout=None):
+        """
+        Block until a request may be made.
+
+        Args:
+            timeout(float|None):    The maximum number of seconds to wait. Defaults to waiting as long as needed.
+
+        Returns:
+            float:  The number of seconds spent waiting.
+
+        Raises:
+            PoogleTimeoutError: Raised without waiting, or taking a token, if it would take longer than timeout
+        """
+        # The thread lock keeps threads of this process from contending on the file lock
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+
+                now = time.time()
+                try:
+                    tokens, updated = (float(v) for v in os.read(fd, 64).split())
+                except ValueError:
+                    # New or corrupt state file, start with a full bucket
+                    tokens, updated = float(self.burst), now
+
+                tokens, wait = _take_token(tokens, updated, now, self.rate, self.burst)
+                _too_long(self._log, wait, timeout)
+
+                state = '{t!r} {u!r}'.format(t=tokens, u=now).encode('ascii')
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, state)
+            finally:
+                os.close(fd)
+
+        return self._wait(wait, timeout)
+
+
+def create_limiter(rate=None, burst=1, jitter=0.0, lock_file=None):
+    """
+    Create a token bucket rate limiter.
+
+    Args:
+        rate(float|None):       The sustained number of requests allowed per second, or None for no rate limiting.
+        burst(int):             The number of requests that may be made back to back before being rate limited.
+        jitter(float):          The maximum number of random seconds added to every wait.
+        lock_file(str|None):    Share the bucket with other processes through this state file.
+
+    Returns:
+        TokenBucketLimiter|None
+    """
+    if not rate:
+        return None
+
+    if lock_file:
+        return FileLockLimiter(lock_file, rate, burst, jitter)
+
+    return TokenBucketLimiter(rate, burst, jitter)
+
+
+def get_default_limiter():
+    """
+    Get the process-wide rate limiter used by Poogle objects that are not given one explicitly.
+
+    Returns:
+        object|None
+    """
+    return _default_limiter
+
+
+def set_default_limiter(limiter):
+    """
+    Set the process-wide rate limiter used by Poogle objects that are not given one explicitly.
+
+    Args:
+        limiter(object|None):   The limiter to share, or None to disable process-wide rate limiting.
+    """
+    global _default_limiter
+    _default_limiter = limiter
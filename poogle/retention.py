@@ -0,0 +1,215 @@
+"""
+Bounded memory storage of the pages fetched by a search, so deep crawls don't keep every page in memory.
+"""
+import logging
+import os
+import pickle
+import zlib
+from bisect import bisect_right
+
+from poogle.containers import PoogleResultsPage
+
+
+class PageStore(object):
+    """
+    The (page number, page) pairs fetched by a search, in the order they were fetched.
+
+    Only the most recently fetched pages are kept in memory. Older pages are either spilled to a temporary file as
+    compact page records, and rebuilt whenever they are accessed, or dropped, in which case they are returned as None.
+    """
+    def __init__(self, poogle, keep=None, spill=False):
+        """
+        Args:
+            poogle(poogle.Poogle):  The parent Poogle object, used to rebuild spilled pages.
+            keep(int|None):         The number of pages to keep in memory. Defaults to every page.
+            spill(bool):            Spill pages that don't fit in memory to disk instead of dropping them.
+
+        Raises:
+            ValueError: Raised if keep is less than 1
+        """
+        if keep is not None and keep < 1:
+            raise ValueError('At least one page must be kept in memory')
+
+        self._log    = logging.getLogger('poogle.retention')
+        self._poogle = poogle
+
+        self.keep  = keep
+        self.spill = spill
+
+        self._numbers = []
+        self._offsets = [0]
+        self._pages   = {}
+        self._spilled = {}
+        self._file    = None
+        self._loaded  = None
+
+    def append(self, item):
+        """
+        Args:
+            item(tuple(int, PoogleResultsPage)):    The page number and page.
+        """
+        number, page = item
+        index = len(self._numbers)
+
+        self._numbers.append(number)
+        self._offsets.append(self._offsets[-1] + len(page.results))
+        self._pages[index] = page
+
+        if self.keep is not None and len(self._pages) > self.keep:
+            self._evict(index - self.keep)
+
+    def _evict(self, index):
+        """
+        Remove a page from memory, spilling it to disk if enabled.
+
+        Args:
+            index(int): The page index.
+        """
+        page = self._pages.pop(index)
+        if not self.spill:
+            self._log.debug('Dropping page %d', self._numbers[index])
+            return
+
+        if self._file is None:
+            import tempfile
+            self._file = tempfile.TemporaryFile(prefix='poogle-')
+
+        data = zlib.compress(pickle.dumps(page.to_record(), pickle.HIGHEST_PROTOCOL))
+        self._file.seek(0, os.SEEK_END)
+        self._spilled[index] = (self._file.tell(), len(data))
+        self._file.write(data)
+        self._log.debug('Spilled page %d to disk (%d bytes)', self._numbers[index], len(data))
+
+    def page(self, index):
+        """
+        Get a page, rebuilding it from disk if it was spilled.
+
+        Args:
+            index(int): The page index.
+
+        Returns:
+            PoogleResultsPage|None: The page, or None if it was dropped.
+        """
+        page = self._pages.get(index)
+        if page is not None or index not in self._spilled:
+            return page
+
+        # Keep the last rebuilt page around, so reading its results one by one doesn't rebuild it every time
+        if self._loaded is not None and self._loaded[0] == index:
+            return self._loaded[1]
+
+        offset, length = self._spilled[index]
+        self._file.seek(offset)
+        record = pickle.loads(zlib.decompress(self._file.read(length)))
+
+        page = PoogleResultsPage.from_record(self._poogle, record)
+        self._loaded = (index, page)
+        return page
+
+    def locate(self, position):
+        """
+        Find the page holding a result.
+
+        Args:
+            position(int):  The result position across every page, starting at 0.
+
+        Returns:
+            tuple(int, int):    The page index, and the position of the result on that page.
+        """
+        index = bisect_right(self._offsets, position) - 1
+        return index, position - self._offsets[index]
+
+    @property
+    def result_count(self):
+        """
+        The total number of results on every page, including spilled and dropped pages.
+
+        Returns:
+            int
+        """
+        return self._offsets[-1]
+
+    def close(self):
+        """
+        Remove the spilled pages from disk.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._spilled = {}
+        self._loaded  = None
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._numbers)
+        if not 0 <= index < len(self._numbers):
+            raise IndexError('Page index out of range')
+
+        return self._numbers[index], self.page(index)
+
+    def __iter__(self):
+        for index in range(len(self._numbers)):
+            yield self[index]
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def __repr__(self):
+        return '<PageStore: {n} pages ({m} in memory, {s} spilled)>'.format(n=len(self._numbers), m=len(self._pages),
+                                                                            s=len(self._spilled))
+
+
+class ResultsView(object):
+    """
+    Lazy, indexable view of the results on every page of a search. Results are looked up on their page when they are
+    accessed, rather than concatenated into a new list.
+
+    Positions are stable across pages: results on dropped pages raise an IndexError when accessed directly, and are
+    skipped when iterating.
+    """
+    def __init__(self, store):
+        """
+        Args:
+            store(PageStore):   The pages of the search.
+        """
+        self._store = store
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[p] for p in range(*position.indices(len(self)))]
+
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError('Search result index out of range')
+
+        index, offset = self._store.locate(position)
+        page = self._store.page(index)
+        if page is None:
+            raise IndexError('Search result {p} was on a page that has been dropped'.format(p=position))
+
+        return page.results[offset]
+
+    def __iter__(self):
+        for __, page in self._store:
+            if page is not None:
+                for result in page.results:
+                    yield result
+
+    def __len__(self):
+        return self._store.result_count
+
+    def __eq__(self, other):
+        # Compares equal to a list of the same results, as results used to be returned as a list
+        if isinstance(other, (list, ResultsView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<ResultsView: {n} results on {p} pages>'.format(n=len(self), p=len(self._store))
@@ -0,0 +1,230 @@
+"""
+Retrying of failed page requests, and a circuit breaker pausing every search sharing a rate limiter while Google is
+throttling us.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_tz, mktime_tz
+
+from poogle.errors import PoogleThrottledError, PoogleTimeoutError
+from poogle.parsers import string_types
+
+#: Response status codes Google throttles requests with
+THROTTLE_STATUSES = (429, 503)
+
+#: Google redirects throttled clients to its CAPTCHA interstitial under this path
+CAPTCHA_PATH = '/sorry/'
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value(str|None):    The header value, either a number of seconds or an HTTP date.
+
+    Returns:
+        float|None: The number of seconds to wait, or None if the value is missing or malformed.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    date = parsedate_tz(value)
+    if date is None:
+        return None
+
+    return max(mktime_tz(date) - time.time(), 0.0)
+
+
+def is_captcha(url):
+    """
+    Check whether a response was redirected to Google's CAPTCHA interstitial.
+
+    Args:
+        url(str|bytes|None):    The final response URL.
+
+    Returns:
+        bool
+    """
+    if isinstance(url, bytes):
+        url = url.decode('utf-8', 'replace')
+
+    return isinstance(url, string_types) and CAPTCHA_PATH in url
+
+
+class RetryPolicy(object):
+    """
+    Exponential backoff with jitter for failed page requests. Throttled requests wait at least as long as Google's
+    Retry-After header asks.
+    """
+    def __init__(self, retries=3, backoff=1.0, max_backoff=60.0, jitter=1.0, retry_errors=True):
+        """
+        Args:
+            retries(int):           The maximum number of times a page request is retried.
+            backoff(float):         The number of seconds to wait before the first retry, doubled for every retry
+                                    after it.
+            max_backoff(float):     The maximum number of seconds to back off for, before jitter.
+            jitter(float):          The maximum number of random seconds added to every backoff, to keep workers
+                                    from retrying in lockstep.
+            retry_errors(bool):     Retry connection errors and server error (5xx) responses as well as throttled
+                                    requests. Client errors (4xx) are never retried. Defaults to True.
+        """
+        self.retries      = retries
+        self.backoff      = backoff
+        self.max_backoff  = max_backoff
+        self.jitter       = jitter
+        self.retry_errors = retry_errors
+
+    def delay(self, attempt, error):
+        """
+        Get the number of seconds to wait before retrying a failed request.
+
+        Args:
+            attempt(int):                           The number of retries already made.
+            error(poogle.errors.PoogleRequestError): The error the request failed with.
+
+        Returns:
+            float|None: The number of seconds to wait, or None if the request should not be retried.
+        """
+        throttled = isinstance(error, PoogleThrottledError)
+        if attempt >= self.retries or not (throttled or (self.retry_errors and self.transient(error))):
+            return None
+
+        delay = min(self.backoff * (2 ** attempt), self.max_backoff)
+        if throttled and error.retry_after:
+            delay = max(delay, error.retry_after)
+
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+
+        return delay
+
+    @staticmethod
+    def transient(error):
+        """
+        Check whether a failed request may succeed when retried, as its connection failed or the server erred.
+
+        Args:
+            error(poogle.errors.PoogleRequestError):    The error the request failed with.
+
+        Returns:
+            bool
+        """
+        status = getattr(error, 'status', None)
+        return status is None or status >= 500
+
+    def __repr__(self):
+        return '<RetryPolicy: {r} retries, {b}s backoff>'.format(r=self.retries, b=self.backoff)
+
+
+class CircuitBreaker(object):
+    """
+    Rate limiter wrapper that pauses every search sharing it when too many recent requests have failed, or as soon as
+    Google asks us to back off.
+
+    Poogle reports the outcome of every request through record(). Once the failure rate of the recent requests
+    reaches the threshold the circuit opens, and acquire() blocks every worker until the cooldown has passed.
+    """
+    def __init__(self, limiter=None, threshold=0.5, window=20, min_requests=5, cooldown=60.0):
+        """
+        Args:
+            limiter(object|None):   The rate limiter to acquire from once the circuit is closed.
+            threshold(float):       The failure rate of the recent requests that opens the circuit.
+            window(int):            The number of recent requests the failure rate is calculated over.
+            min_requests(int):      The number of recent requests needed before the failure rate is considered.
+            cooldown(float):        The number of seconds the circuit stays open for.
+        """
+        self._log     = logging.getLogger('poogle.retry')
+        self._lock    = threading.Lock()
+        self._recent  = deque(maxlen=window)
+        self._until   = 0.0
+
+        self.limiter      = limiter
+        self.threshold    = threshold
+        self.min_requests = min_requests
+        self.cooldown     = cooldown
+
+    @property
+    def is_open(self):
+        return self._until > time.time()
+
+    def acquire(self, timeout=None):
+        """
+        Block while the circuit is open, then until the wrapped limiter lets a request through.
+
+        Args:
+            timeout(float|None):    The maximum number of seconds to wait. Defaults to waiting as long as needed.
+
+        Returns:
+            float:  The number of seconds spent waiting.
+
+        Raises:
+            PoogleTimeoutError: Raised as soon as it is clear the circuit, or the wrapped limiter, would hold the
+                                request for longer than timeout
+        """
+        waited = 0.0
+        while True:
+            wait = self._until - time.time()
+            if wait <= 0:
+                break
+
+            if timeout is not None and waited + wait > timeout:
+                self._log.debug('Circuit open for %.3f seconds, longer than the timeout', wait)
+                raise PoogleTimeoutError('Circuit open for {w:.3f}s, longer than the timeout'.format(w=wait))
+
+            self._log.debug('Circuit open, waiting %.3f seconds', wait)
+            time.sleep(wait)
+            waited += wait
+
+        if self.limiter is not None:
+            if timeout is None:
+                waited += self.limiter.acquire() or 0.0
+            else:
+                waited += self.limiter.acquire(max(timeout - waited, 0.0)) or 0.0
+
+        return waited
+
+    def record(self, error=None):
+        """
+        Record the outcome of a request.
+
+        Args:
+            error(poogle.errors.PoogleRequestError|None):   The error the request failed with, or None if it
+                                                            succeeded. Throttled requests open the circuit right away,
+                                                            for as long as Google asked us to wait or the cooldown.
+        """
+        with self._lock:
+            self._recent.append(error is None)
+            if error is None:
+                return
+
+            if isinstance(error, PoogleThrottledError):
+                self._open(error.retry_after or self.cooldown, 'throttled by Google')
+                return
+
+            failures = self._recent.count(False)
+            if len(self._recent) >= self.min_requests and float(failures) / len(self._recent) >= self.threshold:
+                self._open(self.cooldown, '{f} of the last {n} requests failed'.format(f=failures,
+                                                                                      n=len(self._recent)))
+
+    def _open(self, duration, reason):
+        until = time.time() + duration
+        if until <= self._until:
+            return
+
+        self._log.warning('Pausing requests for %.1f seconds, %s', duration, reason)
+        self._until = until
+
+        # Start afresh once the circuit closes again, rather than tripping on the failures that opened it
+        self._recent.clear()
+
+    def __repr__(self):
+        return '<CircuitBreaker: {s}>'.format(s='open' if self.is_open else 'closed')
@@ -0,0 +1,74 @@
+import logging
+import threading
+
+_log = logging.getLogger('poogle.session')
+
+_shared_session = None
+_shared_lock    = threading.Lock()
+
+
+def create_session(pool_connections=10, pool_maxsize=10, keep_alive=True, headers=None, max_retries=0):
+    """
+    Create a new pooled HTTP session.
+
+    Args:
+        pool_connections(int):  The number of connection pools (one per host) to cache.
+        pool_maxsize(int):      The maximum number of connections to keep alive in each pool.
+        keep_alive(bool):       Reuse connections between requests. Defaults to True.
+        headers(dict):          Default headers to send with every request.
+        max_retries(int):       The number of connection level retries performed by the adapter.
+
+    Returns:
+        requests.Session
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+
+    if headers:
+        session.headers.update(headers)
+
+    _log.debug('Created HTTP session (pool_connections=%d, pool_maxsize=%d, keep_alive=%s)',
+               pool_connections, pool_maxsize, keep_alive)
+    return session
+
+
+def get_shared_session(**kwargs):
+    """
+    Get the process-wide HTTP session, creating it on first use.
+
+    Args:
+        **kwargs:   Arguments passed to create_session() if the shared session has not been created yet.
+
+    Returns:
+        requests.Session
+    """
+    global _shared_session
+
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = create_session(**kwargs)
+        elif kwargs:
+            _log.warning('The shared session has already been created, ignoring session arguments')
+
+        return _shared_session
+
+
+def set_shared_session(session):
+    """
+    Replace the process-wide HTTP session.
+
+    Args:
+        session(requests.Session|None): The session to share, or None to create a new one on next use.
+    """
+    global _shared_session
+
+    with _shared_lock:
+        _shared_session = session
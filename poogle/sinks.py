@@ -0,0 +1,273 @@
+"""
+Sinks that searches stream their results into, buffered into columnar batches and written to CSV, JSON lines or
+Parquet files without building a record object for every result.
+"""
+import io
+import json
+import logging
+import os
+import threading
+import time
+from itertools import repeat
+
+#: The columns of every batch, in order
+COLUMNS = ('query', 'rank', 'page', 'title', 'url', 'fetched')
+
+
+class ResultSink(object):
+    """
+    Buffers search results into columns, and writes them out in batches. Safe to share between threads, so the results
+    of many searches can be streamed into the same sink.
+
+    Batches are flushed once they hold at least batch_size results, so a batch may hold up to a page of results more.
+    Subclasses implement _write_batch() and _close().
+    """
+    def __init__(self, batch_size=10000):
+        """
+        Args:
+            batch_size(int):    The number of results buffered before a batch is written.
+
+        Raises:
+            ValueError: Raised if batch_size is less than 1
+        """
+        if batch_size < 1:
+            raise ValueError('batch_size must be a positive number')
+
+        self._log  = logging.getLogger('poogle.sinks')
+        self._lock = threading.Lock()
+
+        self.batch_size = batch_size
+        self.rows       = 0
+        self.batches    = 0
+        self.closed     = False
+
+        self._columns = tuple([] for __ in COLUMNS)
+
+    def write_results(self, query, results, rank=1, fetched=None):
+        """
+        Buffer search results, writing a batch if the buffer is full.
+
+        Args:
+            query(str):                                     The search query.
+            results(list[poogle.containers.PoogleResult]):  The search results, in rank order.
+            rank(int):                                      The rank of the first result, starting at 1.
+            fetched(float|None):                            When the results were fetched, in seconds since the epoch.
+                                                            Defaults to now.
+
+        Raises:
+            ValueError: Raised if the sink has been closed
+        """
+        if fetched is None:
+            fetched = time.time()
+
+        count = len(results)
+        with self._lock:
+            if self.closed:
+                raise ValueError('Cannot write to a closed sink')
+
+            queries, ranks, pages, titles, urls, times = self._columns
+            queries.extend(repeat(query, count))
+            ranks.extend(range(rank, rank + count))
+            pages.extend(r.page.number for r in results)
+            titles.extend(r.title for r in results)
+            urls.extend(r.url_string for r in results)
+            times.extend(repeat(fetched, count))
+
+            if len(queries) >= self.batch_size:
+                self._flush()
+
+    def write_page(self, query, page, rank=1, fetched=None):
+        """
+        Buffer every result on a search results page, see write_results().
+
+        Args:
+            query(str):                                 The search query.
+            page(poogle.containers.PoogleResultsPage):  The search results page.
+            rank(int):                                  The rank of the first result on the page, starting at 1.
+            fetched(float|None):                        When the page was fetched, in seconds since the epoch.
+        """
+        self.write_results(query, page.results, rank, fetched)
+
+    def flush(self):
+        """
+        Write any buffered results as a batch, even if the buffer isn't full.
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        count = len(self._columns[0])
+        if not count:
+            return
+
+        self._write_batch(dict(zip(COLUMNS, self._columns)))
+        self._columns = tuple([] for __ in COLUMNS)
+
+        self.rows    += count
+        self.batches += 1
+        self._log.debug('Wrote a batch of %d results (%d in total)', count, self.rows)
+
+    def _write_batch(self, batch):
+        """
+        Args:
+            batch(dict):    Every column in COLUMNS, mapped to a list of values.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Write any buffered results and close the output.
+        """
+        with self._lock:
+            if self.closed:
+                return
+
+            try:
+                self._flush()
+            finally:
+                self.closed = True
+                self._close()
+
+    def _close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return '<{c}: {r} results in {b} batches>'.format(c=self.__class__.__name__, r=self.rows, b=self.batches)
+
+
+class _FileSink(ResultSink):
+    """
+    Sink writing text to a path, or to a file object that is left open.
+    """
+    def __init__(self, output, batch_size=10000):
+        """
+        Args:
+            output(str|file):   The output path, or a text file object.
+            batch_size(int):    The number of results buffered before a batch is written.
+        """
+        super(_FileSink, self).__init__(batch_size)
+
+        self._owns_file = not hasattr(output, 'write')
+        self._file = io.open(output, 'w', encoding='utf-8', newline='') if self._owns_file else output
+
+    def _close(self):
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+class CSVSink(_FileSink):
+    """
+    Writes results to a CSV file with a header row. Fetch times are written as seconds since the epoch.
+    """
+    def __init__(self, output, batch_size=10000, header=True):
+        """
+        Args:
+            output(str|file):   The output path, or a text file object.
+            batch_size(int):    The number of results buffered before a batch is written.
+            header(bool):       Write a header row naming the columns first. Defaults to True.
+        """
+        import csv
+
+        super(CSVSink, self).__init__(output, batch_size)
+
+        self._writer = csv.writer(self._file)
+        if header:
+            self._writer.writerow(COLUMNS)
+
+    def _write_batch(self, batch):
+        self._writer.writerows(zip(*(batch[c] for c in COLUMNS)))
+
+
+class JSONLSink(_FileSink):
+    """
+    Writes results to a JSON lines file, one object per result. Fetch times are written as seconds since the epoch.
+    """
+    def _write_batch(self, batch):
+        lines = (json.dumps(dict(zip(COLUMNS, row))) for row in zip(*(batch[c] for c in COLUMNS)))
+        self._file.write(u''.join(line + u'\n' for line in lines))
+
+
+class ParquetSink(ResultSink):
+    """
+    Writes results to a Parquet file with pyarrow, one row group per batch. Fetch times are written as UTC timestamps.
+    """
+    def __init__(self, output, batch_size=100000, compression='snappy'):
+        """
+        Args:
+            output(str|file):   The output path, or a binary file object.
+            batch_size(int):    The number of results buffered before a row group is written.
+            compression(str):   The Parquet compression codec. Defaults to snappy.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        super(ParquetSink, self).__init__(batch_size)
+
+        self._pa = pa
+        self.schema = pa.schema([
+            ('query', pa.string()),
+            ('rank', pa.int32()),
+            ('page', pa.int32()),
+            ('title', pa.string()),
+            ('url', pa.string()),
+            ('fetched', pa.timestamp('us', tz='UTC')),
+        ])
+        self._writer = pq.ParquetWriter(output, self.schema, compression=compression)
+
+    @staticmethod
+    def available():
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            return False
+
+        return True
+
+    def _write_batch(self, batch):
+        pa = self._pa
+        batch['fetched'] = [int(t * 1000000) for t in batch['fetched']]
+
+        arrays = [pa.array(batch[field.name], field.type) for field in self.schema]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def _close(self):
+        self._writer.close()
+
+
+#: Sink classes by format name
+SINKS = {'csv': CSVSink, 'jsonl': JSONLSink, 'parquet': ParquetSink}
+
+
+def create_sink(path, format=None, **kwargs):
+    """
+    Create a sink writing to a file.
+
+    Args:
+        path(str):          The output path.
+        format(str|None):   csv, jsonl or parquet. Defaults to the format matching the path extension.
+        **kwargs:           Keyword arguments passed on to the sink, such as batch_size.
+
+    Returns:
+        CSVSink|JSONLSink|ParquetSink
+
+    Raises:
+        ValueError: Raised if the format is unknown or not available
+    """
+    if format is None:
+        format = os.path.splitext(path)[1].lstrip('.').lower()
+        format = {'json': 'jsonl', 'ndjson': 'jsonl', 'parq': 'parquet'}.get(format, format)
+
+    sink = SINKS.get(format)
+    if sink is None or (sink is ParquetSink and not ParquetSink.available()):
+        logging.getLogger('poogle.sinks').error('Sink format not available: %s', format)
+        raise ValueError('Unknown or unavailable sink format: {f}'.format(f=format))
+
+    return sink(path, **kwargs)
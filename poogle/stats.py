@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import deque
+
+#: High resolution timer used for all measurements
+timer = getattr(time, 'perf_counter', time.time)
+
+
+class PageStats(object):
+    """
+    Timings and counters for a single search results page.
+
+    requests does not expose DNS resolution and connection times separately, so they are included in time_to_first_byte
+    whenever no pooled keep-alive connection was available for the request.
+    """
+    __slots__ = ('url', 'page', 'cached', 'coalesced', 'limiter_wait', 'time_to_first_byte', 'download_time',
+                 'download_bytes', 'parse_time', 'extract_time', 'results', 'skipped')
+
+    def __init__(self, url=None):
+        """
+        Args:
+            url(str):   The search results page URL.
+        """
+        self.url                = url
+        self.page               = 0
+        self.cached             = False
+        self.coalesced          = False
+        self.limiter_wait       = 0.0
+        self.time_to_first_byte = 0.0
+        self.download_time      = 0.0
+        self.download_bytes     = 0
+        self.parse_time         = 0.0
+        self.extract_time       = 0.0
+        self.results            = 0
+        self.skipped            = 0
+
+    @property
+    def network_time(self):
+        return self.time_to_first_byte + self.download_time
+
+    def __repr__(self):
+        return '<PageStats: Page {p!r} ({n:.3f}s network, {t:.3f}s parsing, {w:.3f}s throttled)>'.format(
+            p=self.page, n=self.network_time, t=self.parse_time + self.extract_time, w=self.limiter_wait
+        )
+
+
+class SearchStats(object):
+    """
+    Totals of the page statistics of one or more searches. Safe to share between threads.
+
+    Only running totals and the statistics of the most recent pages are kept, so a long running batch sharing a single
+    SearchStats doesn't grow without limit. len() is the total number of pages added.
+    """
+    _FIELDS = ('limiter_wait', 'time_to_first_byte', 'download_time', 'download_bytes', 'parse_time',
+               'extract_time', 'results', 'skipped')
+
+    def __init__(self, keep_pages=100):
+        """
+        Args:
+            keep_pages(int|None):   The number of most recent PageStats to keep in pages, or None to keep every page.
+        """
+        self._lock  = threading.Lock()
+        self.pages      = deque(maxlen=keep_pages)
+        self.page_count = 0
+        self.cached     = 0
+        self.coalesced  = 0
+
+        for field in self._FIELDS:
+            setattr(self, field, 0)
+
+    def add(self, page_stats):
+        """
+        Add the statistics of a page to the totals.
+
+        Args:
+            page_stats(PageStats):  The page statistics.
+        """
+        with self._lock:
+            self.pages.append(page_stats)
+            self.page_count += 1
+            self.cached += int(page_stats.cached)
+            self.coalesced += int(page_stats.coalesced)
+
+            for field in self._FIELDS:
+                setattr(self, field, getattr(self, field) + getattr(page_stats, field))
+
+    @property
+    def network_time(self):
+        return self.time_to_first_byte + self.download_time
+
+    @property
+    def skip_rate(self):
+        """
+        The fraction of results that could not be parsed, or 0.0 if no results have been seen yet.
+
+        Returns:
+            float
+        """
+        seen = self.results + self.skipped
+        return float(self.skipped) / seen if seen else 0.0
+
+    def summary(self):
+        """
+        Format a human readable breakdown of the totals.
+
+        Returns:
+            str
+        """
+        return '\n'.join([
+            'Pages fetched:       {p} ({c} from cache)'.format(p=self.page_count, c=self.cached),
+            'Shared requests:     {s}'.format(s=self.coalesced),
+            'Rate limit wait:     {t:.3f}s'.format(t=self.limiter_wait),
+            'Time to first byte:  {t:.3f}s'.format(t=self.time_to_first_byte),
+            'Download:            {t:.3f}s ({b:,} bytes)'.format(t=self.download_time, b=self.download_bytes),
+            'Parse (tree):        {t:.3f}s'.format(t=self.parse_time),
+            'Parse (results):     {t:.3f}s'.format(t=self.extract_time),
+            'Results:             {r} parsed, {s} skipped'.format(r=self.results, s=self.skipped),
+        ])
+
+    def __len__(self):
+        return self.page_count
+
+    def __repr__(self):
+        return '<SearchStats: {p} pages ({n:.3f}s network, {t:.3f}s parsing, {w:.3f}s throttled)>'.format(
+            p=self.page_count, n=self.network_time, t=self.parse_time + self.extract_time, w=self.limiter_wait
+        )
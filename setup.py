@@ -34,11 +34,17 @@ setup(
         'Topic :: Utilities'
     ],
     keywords=['google', 'web search', 'search engine'],
-    packages=find_packages(exclude=['tests']),
+    packages=find_packages(exclude=['tests', 'benchmarks']),
     entry_points={
         'console_scripts': [
             'poogle = poogle.cli:cli'
         ],
     },
-    install_requires=['requests>=2.8.1,<2.9', 'click>=6.2,<6.3', 'beautifulsoup4>=4.4.1,<4.5', 'yurl>=0.13,<0.14'],
+    install_requires=['requests>=2.8.1,<2.9', 'click>=6.2,<6.3', 'beautifulsoup4>=4.4.1,<4.5', 'yurl>=0.13,<0.14',
+                      'futures>=3.0; python_version < "3"'],
+    extras_require={
+        'async': ['aiohttp'],
+        'lxml': ['lxml'],
+        'parquet': ['pyarrow'],
+    },
 )
@@ -0,0 +1,199 @@
+"""
+The asyncio tests, imported by test_aio only on Python versions that can compile them.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest import mock
+
+from poogle import aio, containers, parallel
+from poogle.archive import PageArchive
+from poogle.cache import ResponseCache
+from poogle.errors import PoogleMaxQueriesError, PoogleThrottledError
+from poogle.retry import RetryPolicy
+from poogle.stats import timer
+
+
+class PoogleAsyncTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.html_dir = os.path.join(os.path.dirname(__file__), 'html')
+        with open(os.path.join(self.html_dir, 'test.html'), "r") as f:
+            self.html = f.read()
+
+    def test_next_page(self):
+
+        async def run():
+            obj = aio.AsyncPoogle('test', 20)
+            with mock.patch.object(obj, '_fetch', mock.AsyncMock(return_value=self.html)) as mock_fetch:
+                self.assertEqual(obj.results, [])
+
+                page = await obj.next_page()
+                self.assertIsInstance(page, containers.PoogleResultsPage)
+                await obj.next_page()
+
+            self.assertEqual(mock_fetch.call_count, 2)
+            self.assertEqual(len(obj.results), 40)
+            self.assertEqual(obj.total_results, 2390000000)
+            self.assertIsNone(obj._session)
+
+        asyncio.run(run())
+
+    @mock.patch('poogle.aio.AsyncPoogle._fetch')
+    def test_concurrent_searches(self, mock_fetch):
+
+        in_flight = {'now': 0, 'max': 0}
+
+        async def fetch(url, stats=None):
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            await asyncio.sleep(0.01)
+            in_flight['now'] -= 1
+            return self.html
+
+        mock_fetch.side_effect = fetch
+
+        async def run():
+            semaphore = asyncio.Semaphore(2)
+            searches = [aio.async_google_search('test %d' % i, 20, semaphore=semaphore) for i in range(5)]
+            return await asyncio.gather(*searches)
+
+        results = asyncio.run(run())
+
+        self.assertEqual([len(r) for r in results], [20] * 5)
+        self.assertEqual(mock_fetch.call_count, 5)
+        self.assertEqual(in_flight['max'], 2)
+
+    @mock.patch('poogle.aio.AsyncPoogle._fetch')
+    def test_query_limit(self, mock_fetch):
+
+        # Pages that only hold unparsable results never get any closer to the results requested
+        mock_fetch.return_value = self.html.replace('class="g"', 'class="g-news"')
+
+        with self.assertRaises(PoogleMaxQueriesError):
+            asyncio.run(aio.async_google_search('test', 20, pause=0, strict=False))
+        self.assertEqual(mock_fetch.call_count, 3)
+
+    def response(self, status=200, url='https://www.google.com/search?q=test'):
+        read = mock.AsyncMock(return_value=self.html.encode('utf-8'))
+        return mock.Mock(status=status, url=url, headers={}, read=read)
+
+    def session(self, *responses):
+        session = mock.MagicMock()
+        session.get.return_value.__aenter__.side_effect = responses
+        return session
+
+    def test_shared_limiter(self):
+
+        limiter = mock.Mock()
+
+        async def run():
+            obj = aio.AsyncPoogle('test', 20, session=self.session(self.response()), limiter=limiter)
+            await obj.next_page()
+
+        asyncio.run(run())
+        limiter.acquire.assert_called_once_with()
+        limiter.record.assert_called_once_with(None)
+
+    @mock.patch('poogle.aio.AsyncPoogle._fetch')
+    def test_limiter_pacing(self, mock_fetch):
+
+        mock_fetch.return_value = self.html.replace('class="g"', 'class="g-news"')
+        limiter = mock.Mock()
+
+        # Requests are only paced by the limiter, not by pauses as well
+        with mock.patch('asyncio.sleep') as mock_sleep, self.assertRaises(PoogleMaxQueriesError):
+            asyncio.run(aio.async_google_search('test', 20, pause=5, limiter=limiter))
+        mock_sleep.assert_not_called()
+
+    def test_limiter_executor(self):
+
+        limiter = mock.Mock()
+
+        async def run():
+            # Limiters are never waited on in the event loop's default executor
+            default = ThreadPoolExecutor(1)
+            default.submit = mock.Mock(side_effect=AssertionError('Default executor used'))
+            asyncio.get_running_loop().set_default_executor(default)
+
+            obj = aio.AsyncPoogle('test', 20, session=self.session(self.response()), limiter=limiter)
+            await obj.next_page()
+
+        asyncio.run(run())
+        limiter.acquire.assert_called_once_with()
+
+    def test_cache_and_archive(self):
+
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        cache = ResponseCache(os.path.join(path, 'cache.sqlite'))
+        page_archive = PageArchive(os.path.join(path, 'archive'))
+        self.addCleanup(cache.close)
+        self.addCleanup(page_archive.close)
+
+        async def run():
+            session = self.session(self.response())
+            for __ in range(2):
+                obj = aio.AsyncPoogle('test', 20, session=session, limiter=None, cache=cache, archive=page_archive)
+                await obj.next_page()
+
+            return session
+
+        # The second search is served from the cache, and only the page fetched from the network is archived
+        session = asyncio.run(run())
+        self.assertEqual(session.get.call_count, 1)
+        self.assertEqual(len(page_archive), 1)
+        self.assertIsNotNone(cache.get('https://www.google.com/search?q=test&num=20&start=0'))
+
+    @mock.patch('asyncio.sleep')
+    def test_retry(self, mock_sleep):
+
+        async def run(*responses):
+            obj = aio.AsyncPoogle('test', 20, session=self.session(*responses), limiter=None,
+                                  retry=RetryPolicy(retries=2, jitter=0))
+            return await obj.next_page()
+
+        # Throttled requests are retried, and CAPTCHA redirects are recognised as throttling rather than parsed
+        page = asyncio.run(run(self.response(503), self.response(url='https://www.google.com/sorry/index'),
+                               self.response()))
+        self.assertEqual(len(page), 20)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+        with self.assertRaises(PoogleThrottledError):
+            asyncio.run(run(*[self.response(429)] * 3))
+
+    def test_unsupported_arguments(self):
+
+        self.assertRaises(TypeError, aio.AsyncPoogle, 'test', coalescer=mock.Mock())
+        self.assertRaises(TypeError, aio.AsyncPoogle, 'test', prefetch=True)
+        aio.AsyncPoogle('test', prefetch=False)
+
+    def test_parse_executor(self):
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            record = parallel.parse_page_record(self.html, 'html.parser', 'test')
+
+            # The parse only completes once the event loop runs again, so blocking on it would run out of time
+            def submit(*args):
+                future = Future()
+                loop.call_soon(future.set_result, record)
+                return future
+
+            executor = mock.Mock(submit=mock.Mock(side_effect=submit))
+            obj = aio.AsyncPoogle('test', 20, parse_executor=executor, deadline=timer() + 1)
+            with mock.patch.object(obj, '_fetch', mock.AsyncMock(return_value=self.html)):
+                return await obj.next_page()
+
+        page = asyncio.run(run())
+        self.assertEqual(len(page), 20)
+
+    def test_not_iterable(self):
+
+        obj = aio.AsyncPoogle('test')
+        self.assertRaises(TypeError, iter, obj)
+        self.assertRaises(TypeError, obj.fan_out, 2)
@@ -0,0 +1,13 @@
+import sys
+import unittest
+
+# The tests use async def, asyncio.run() and AsyncMock, which don't even compile on older versions
+if sys.version_info < (3, 8):
+    raise unittest.SkipTest('The asyncio tests require Python 3.8+')
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is only installed with the async extra
+    raise unittest.SkipTest('aiohttp is not installed')
+
+from tests.aio_cases import PoogleAsyncTestCase  # noqa: F401
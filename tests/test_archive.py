@@ -0,0 +1,112 @@
+import gzip
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from mock import mock
+
+import poogle
+from poogle import archive, parallel, parsers
+from poogle.errors import PoogleRequestError
+
+
+class PoogleArchiveTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        with open(os.path.join(os.path.dirname(__file__), 'html', 'test.html'), 'rb') as f:
+            self.html = f.read()
+
+        self.path = tempfile.mkdtemp()
+        self.archive = archive.PageArchive(self.path)
+
+    def tearDown(self):
+
+        self.archive.close()
+        shutil.rmtree(self.path)
+
+    def test_add_get(self):
+
+        self.archive.add('http://example.com/1', b'first', {'Content-Type': 'text/html'}, fetched=100.0)
+        self.archive.add('http://example.com/1', b'second', fetched=200.0)
+        self.archive.add('http://example.com/2', u'third')
+
+        self.assertEqual(len(self.archive), 3)
+        self.assertIsNone(self.archive.get('http://example.com/3'))
+
+        # The most recent copy of a page is served
+        page = self.archive.get('http://example.com/1')
+        self.assertEqual((page.content, page.fetched, page.status, page.headers), (b'second', 200.0, 200, {}))
+
+        self.assertEqual([p.content for p in self.archive], [b'first', b'second', b'third'])
+        self.assertEqual(next(iter(self.archive)).headers, {'Content-Type': 'text/html'})
+
+        # Segments are plain gzip files
+        with gzip.open(os.path.join(self.path, 'segment-00000.gz'), 'rb') as f:
+            self.assertEqual(f.read().count(b'"url": "http://example.com/1"'), 2)
+
+    def test_segments(self):
+
+        self.archive.segment_size = 1
+        for n in range(3):
+            self.archive.add('http://example.com/{n}'.format(n=n), self.html)
+
+        self.assertEqual(sorted(e.segment for e in self.archive.entries()), [0, 1, 2])
+        self.assertEqual(self.archive.get('http://example.com/1').content, self.html)
+
+        # Reopened archives keep appending to the last segment
+        reopened = archive.PageArchive(self.path)
+        reopened.segment_size = 64 * 1024 * 1024
+        reopened.add('http://example.com/3', self.html)
+        self.assertEqual(list(reopened.entries())[-1].segment, 2)
+        reopened.close()
+
+    @mock.patch('requests.Session.get')
+    def test_record_and_replay(self, mock_get):
+
+        mock_get.return_value = mock.Mock(content=self.html, status_code=200, url='https://www.google.com/search',
+                                          headers={'Content-Type': 'text/html'})
+
+        results = poogle.google_search('test', 20, pause=0, archive=self.archive)
+        url = mock_get.call_args[0][0]
+        self.assertEqual(self.archive.get(url).headers, {'Content-Type': 'text/html'})
+
+        # Replayed searches never touch the network
+        mock_get.reset_mock()
+        replayed = poogle.google_search('test', 20, pause=0, session=archive.ReplaySession(self.path))
+        mock_get.assert_not_called()
+        self.assertEqual([r.title for r in replayed], [r.title for r in results])
+
+    def test_replay_missing(self):
+
+        obj = poogle.Poogle('missing', session=archive.ReplaySession(self.archive))
+        self.assertRaises(PoogleRequestError, obj.next_page)
+
+    def test_parse_archive_entries(self):
+
+        self.archive.add('http://example.com/1', self.html)
+        self.archive.add('http://example.com/2', b'<html></html>')
+
+        records = parallel.parse_archive_entries(self.path, list(self.archive.entries()), 'html.parser')
+        self.assertEqual([(url, error) for url, __, error in records],
+                         [('http://example.com/1', None), ('http://example.com/2', mock.ANY)])
+        self.assertEqual(len(records[0][1].results), 20)
+        self.assertIsNone(records[1][1])
+
+    def test_parse_archive_errors(self):
+
+        self.archive.add('http://example.com/empty', b'')
+        self.archive.add('http://example.com/1', self.html)
+        empty, entry = list(self.archive.entries())
+        corrupt = entry._replace(url='http://example.com/corrupt', length=entry.length // 2)
+
+        # Unparsable and corrupt pages are reported as picklable error strings, without failing the valid pages
+        for parser in parsers.available_parsers():
+            records = parallel.parse_archive_entries(self.path, [empty, corrupt, entry], parser)
+            self.assertEqual([url for url, __, __ in records], ['http://example.com/empty',
+                                                                 'http://example.com/corrupt', 'http://example.com/1'])
+            self.assertEqual([r is None for __, r, __ in records], [True, True, False])
+            self.assertTrue(all(isinstance(error, str) for __, __, error in records[:2]))
+            self.assertEqual(pickle.loads(pickle.dumps(records)), records)
@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import mock
+
+import poogle
+from poogle.cache import ResponseCache
+
+
+class PoogleCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.html_dir = os.path.join(os.path.dirname(__file__), 'html')
+        with open(os.path.join(self.html_dir, 'test.html'), "rb") as f:
+            self.html = f.read()
+
+        self.cache = ResponseCache(':memory:')
+
+    def test_get_set(self):
+        self.assertIsNone(self.cache.get('http://example.com/a'))
+        self.cache.set('http://example.com/a', self.html)
+
+        self.assertEqual(self.cache.get('http://example.com/a'), self.html)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(len(self.cache), 1)
+
+        # Pages are stored compressed
+        self.assertLess(self.cache.size, len(self.html))
+
+    @mock.patch('poogle.cache.time.time')
+    def test_ttl(self, mock_time):
+        mock_time.return_value = 100.0
+        self.cache.set('http://example.com/a', b'a', ttl=10)
+        self.cache.set('http://example.com/b', b'b')
+
+        mock_time.return_value = 111.0
+        self.assertIsNone(self.cache.get('http://example.com/a'))
+        self.assertEqual(self.cache.get('http://example.com/b'), b'b')
+        self.assertEqual(len(self.cache), 1)
+
+    @mock.patch('poogle.cache.time.time')
+    def test_lru_eviction(self, mock_time):
+        mock_time.return_value = 100.0
+        self.cache.set('http://example.com/a', self.html)
+        self.cache.max_size = self.cache.size * 2 + 64
+
+        mock_time.return_value = 101.0
+        self.cache.set('http://example.com/b', self.html + b' ')
+
+        # Accessing a makes b the least recently used entry
+        mock_time.return_value = 102.0
+        self.cache.get('http://example.com/a')
+
+        mock_time.return_value = 103.0
+        self.cache.set('http://example.com/c', self.html + b'  ')
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get('http://example.com/b'))
+        self.assertIsNotNone(self.cache.get('http://example.com/a'))
+        self.assertLessEqual(self.cache.size, self.cache.max_size)
+
+    def test_persistence(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'cache.db')
+
+        cache = ResponseCache(path)
+        cache.set('http://example.com/a', b'a')
+        cache.close()
+
+        self.assertEqual(ResponseCache(path).get('http://example.com/a'), b'a')
+
+    @mock.patch('requests.Session.get')
+    def test_poogle_cache(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+        limiter = mock.Mock()
+
+        first = poogle.google_search('test', 20, cache=self.cache, limiter=limiter)
+        second = poogle.google_search('test', 20, cache=self.cache, limiter=limiter)
+
+        self.assertEqual(len(first), len(second))
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(limiter.acquire.call_count, 1)
+        self.assertEqual(self.cache.hits, 1)
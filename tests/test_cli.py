@@ -1,13 +1,24 @@
+import json
 import os
+import shutil
+import subprocess
+import sys
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 import click
 from bs4 import BeautifulSoup
 from mock import mock
 from click.testing import CliRunner
+from requests import RequestException
 
 import poogle
-from poogle.cli import PoogleCLI, cli, search
+from poogle.archive import PageArchive
+from poogle.cli import PoogleCLI, cli, batch, reparse, search
+from poogle.containers import PoogleResultList
+from poogle.ratelimit import IntervalLimiter, TokenBucketLimiter
+from poogle.retry import CircuitBreaker
 
 
 class PoogleCliTestCase(unittest.TestCase):
@@ -28,8 +39,19 @@ class PoogleHelpTestCase(PoogleCliTestCase):
         ctx_mock = mock.Mock()
 
         cli = PoogleCLI()
-        self.assertListEqual(cli.list_commands(ctx_mock), ['search'])
+        self.assertListEqual(cli.list_commands(ctx_mock), ['batch', 'reparse', 'search'])
         self.assertIsInstance(cli.get_command(ctx_mock, 'search'), click.core.Command)
+        self.assertIsNone(cli.get_command(ctx_mock, 'missing'))
+
+    def test_lazy_imports(self):
+
+        # Network and parser dependencies shouldn't be imported until a search is executed
+        script = ('import sys\n'
+                  'from poogle.cli import cli\n'
+                  'cli.main(["search", "--help"], standalone_mode=False)\n'
+                  'print(",".join(m for m in ("requests", "bs4", "yurl", "lxml") if m in sys.modules))')
+        output = subprocess.check_output([sys.executable, '-c', script])
+        self.assertEqual(output.decode('utf-8').splitlines()[-1], '')
 
     def test_version(self):
 
@@ -41,7 +63,7 @@ class PoogleHelpTestCase(PoogleCliTestCase):
 
 class PoogleSearchTestCase(PoogleCliTestCase):
 
-    @mock.patch('poogle.requests.get')
+    @mock.patch('requests.Session.get')
     def test_search(self, mock_get):
 
         mock_get_response = mock.Mock()
@@ -69,7 +91,7 @@ https://en.wikipedia.org/wiki/Test
 '''
         self.assertEqual(result.output, expected_output)
 
-    @mock.patch('poogle.requests.get')
+    @mock.patch('requests.Session.get')
     def test_search_plain(self, mock_get):
 
         mock_get_response = mock.Mock()
@@ -97,3 +119,207 @@ https://en.wikipedia.org/wiki/Test
 '''
         self.assertEqual(result.output, expected_output)
 
+
+    @mock.patch('poogle.cli.search.google_search')
+    def test_search_rate(self, mock_search):
+
+        mock_search.return_value = PoogleResultList()
+
+        runner = CliRunner()
+        result = runner.invoke(search.cli, ['--rate', '2', '--burst', '4', 'test'])
+
+        self.assertEqual(result.exit_code, 0)
+        limiter = mock_search.call_args[1]['limiter']
+        self.assertIsInstance(limiter, TokenBucketLimiter)
+        self.assertEqual(limiter.rate, 2)
+        self.assertEqual(limiter.burst, 4)
+
+    @mock.patch('poogle.cli.search.google_search')
+    def test_search_retries(self, mock_search):
+
+        mock_search.return_value = PoogleResultList()
+
+        runner = CliRunner()
+        result = runner.invoke(search.cli, ['--retries', '3', '--backoff', '2', 'test'])
+
+        self.assertEqual(result.exit_code, 0)
+        kwargs = mock_search.call_args[1]
+        self.assertEqual((kwargs['retry'].retries, kwargs['retry'].backoff), (3, 2.0))
+        self.assertIsInstance(kwargs['limiter'], CircuitBreaker)
+        self.assertIsInstance(kwargs['limiter'].limiter, IntervalLimiter)
+
+    @mock.patch('poogle.cli.search.google_search')
+    def test_search_time_limit(self, mock_search):
+
+        mock_search.return_value = PoogleResultList()
+        mock_search.return_value.stop(PoogleResultList.DEADLINE)
+
+        runner = CliRunner()
+        result = runner.invoke(search.cli, ['--timeout', '5', '--time-limit', '20', 'test'])
+
+        self.assertEqual(result.exit_code, 0)
+        kwargs = mock_search.call_args[1]
+        self.assertEqual((kwargs['timeout'], kwargs['time_limit']), (5.0, 20.0))
+        self.assertIn('Search query ran out of time', result.output)
+
+        # Searches that ran out of queries aren't reported as out of time
+        mock_search.return_value = PoogleResultList()
+        mock_search.return_value.stop(PoogleResultList.QUERY_LIMIT)
+
+        result = runner.invoke(search.cli, ['test'])
+        self.assertIn('Search query reached its query limit', result.output)
+        self.assertNotIn('ran out of time', result.output)
+
+    @mock.patch('requests.Session.get')
+    def test_search_stats(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        runner = CliRunner()
+        result = runner.invoke(search.cli, ['-r 3', '--plain', '--stats', 'test'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('Pages fetched:       1 (0 from cache)', result.output)
+        self.assertIn('Results:             20 parsed, 0 skipped', result.output)
+
+
+class PoogleBatchTestCase(PoogleCliTestCase):
+
+    def json_lines(self, output):
+        # Progress is reported on stderr, which may be mixed into the output
+        return [json.loads(line) for line in output.splitlines() if line.startswith('{')]
+
+    @mock.patch('requests.Session.get')
+    def test_batch(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        runner = CliRunner()
+        result = runner.invoke(batch.cli, ['-r', '3', '-w', '2', '--pause', '0'], input='first\n\nsecond\nfirst\n')
+
+        self.assertEqual(result.exit_code, 0)
+        records = self.json_lines(result.output)
+        self.assertEqual(len(records), 9)
+        self.assertEqual(sorted(r['query'] for r in records), ['first'] * 6 + ['second'] * 3)
+        self.assertEqual(records[0]['page'], 1)
+
+        second = [r for r in records if r['query'] == 'second']
+        self.assertEqual([r['rank'] for r in second], [1, 2, 3])
+        self.assertEqual(second[0]['title'], 'Speedtest.net by Ookla - The Global Broadband Speed Test')
+        self.assertEqual(second[0]['url'], 'http://www.speedtest.net/')
+
+    @mock.patch('requests.Session.get')
+    def test_batch_per_query(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        runner = CliRunner()
+        result = runner.invoke(batch.cli, ['-r', '3', '--per-query', '--pause', '0', '--parse-processes', '2'],
+                               input='first\nsecond\n')
+
+        self.assertEqual(result.exit_code, 0)
+        records = sorted(self.json_lines(result.output), key=lambda r: r['query'])
+        self.assertEqual([r['query'] for r in records], ['first', 'second'])
+        self.assertEqual([len(r['results']) for r in records], [3, 3])
+
+    @mock.patch('requests.Session.get')
+    def test_batch_dedup(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        runner = CliRunner()
+        for options in (['--dedup'], ['--dedup-bloom', '1000']):
+            result = runner.invoke(batch.cli, ['-r', '5', '-w', '1', '--pause', '0'] + options, input='first\nsecond\n')
+
+            self.assertEqual(result.exit_code, 0)
+            urls = [r['url'] for r in self.json_lines(result.output)]
+            self.assertEqual(len(urls), 10)
+            self.assertEqual(len(set(urls)), 10)
+
+    @mock.patch('requests.Session.get')
+    def test_batch_errors(self, mock_get):
+
+        mock_get.side_effect = RequestException('Service Unavailable')
+
+        runner = CliRunner()
+        result = runner.invoke(batch.cli, ['--pause', '0'], input='first\n')
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(self.json_lines(result.output), [{'query': 'first', 'error': 'Service Unavailable'}])
+
+
+class PoogleReparseTestCase(PoogleBatchTestCase):
+
+    def setUp(self):
+
+        PoogleBatchTestCase.setUp(self)
+        self.path = tempfile.mkdtemp()
+
+        page_archive = PageArchive(self.path)
+        page_archive.add('https://www.google.com/search?q=first&num=20&start=20', self.html)
+        page_archive.add('https://www.google.com/search?q=second&num=20&start=0', '<html></html>')
+        page_archive.close()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.path)
+
+    def test_reparse(self):
+
+        runner = CliRunner()
+        result = runner.invoke(reparse.cli, [self.path, '-p', '2', '--batch-size', '1'])
+
+        self.assertEqual(result.exit_code, 0)
+        records = self.json_lines(result.output)
+        self.assertEqual(len(records), 21)
+
+        results = [r for r in records if 'error' not in r]
+        self.assertEqual({r['query'] for r in results}, {'first'})
+        self.assertEqual([r['rank'] for r in results], list(range(21, 41)))
+        self.assertEqual(results[0]['url'], 'http://www.speedtest.net/')
+
+        errors = [r for r in records if 'error' in r]
+        self.assertEqual([r['source'] for r in errors], ['https://www.google.com/search?q=second&num=20&start=0'])
+
+    def test_reparse_errors(self):
+
+        page_archive = PageArchive(self.path)
+        page_archive.add('https://www.google.com/search?q=third&num=20&start=0', b'')
+        page_archive.close()
+
+        # Empty pages only fail their own record
+        runner = CliRunner()
+        result = runner.invoke(reparse.cli, [self.path, '-p', '1'])
+
+        self.assertEqual(result.exit_code, 0)
+        records = self.json_lines(result.output)
+        self.assertEqual(len([r for r in records if 'error' not in r]), 20)
+        self.assertEqual([r['source'] for r in records if 'error' in r],
+                         ['https://www.google.com/search?q=second&num=20&start=0',
+                          'https://www.google.com/search?q=third&num=20&start=0'])
+
+        # And batches failing as a whole are reported page by page
+        with mock.patch('poogle.cli.reparse.ProcessPoolExecutor', ThreadPoolExecutor), \
+                mock.patch('poogle.cli.reparse.parse_archive_entries', side_effect=TypeError('cannot pickle')):
+            result = runner.invoke(reparse.cli, [self.path, '-p', '1', '--batch-size', '2'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual([r['error'] for r in self.json_lines(result.output)], ['cannot pickle'] * 3)
+
+    def test_reparse_per_page(self):
+
+        runner = CliRunner()
+        result = runner.invoke(reparse.cli, [self.path, '-p', '1', '--per-page'])
+
+        self.assertEqual(result.exit_code, 0)
+        records = [r for r in self.json_lines(result.output) if 'results' in r]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(len(records[0]['results']), 20)
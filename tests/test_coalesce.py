@@ -0,0 +1,122 @@
+import os
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from mock import mock
+
+import poogle
+from poogle.coalesce import RequestCoalescer
+from poogle.errors import PoogleDeadlineError, PoogleRequestError, PoogleTimeoutError
+
+
+class PoogleCoalesceTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        with open(os.path.join(os.path.dirname(__file__), 'html', 'test.html'), 'r') as f:
+            self.html = f.read()
+
+        self.release  = threading.Event()
+        self.executor = ThreadPoolExecutor(4)
+
+    def tearDown(self):
+
+        self.release.set()
+        self.executor.shutdown(wait=True)
+
+    def blocking(self, result):
+        def call():
+            self.release.wait(5)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return call
+
+    def wait_in_flight(self, coalescer, waiters):
+        # Block until every waiter has joined the call in flight
+        for __ in range(500):
+            if coalescer.shared >= waiters:
+                return
+            threading.Event().wait(0.01)
+        self.fail('Waiters never joined the call in flight')
+
+    def test_shared_call(self):
+
+        coalescer = RequestCoalescer()
+        func = mock.Mock(side_effect=self.blocking('page'))
+
+        leader = self.executor.submit(coalescer.do, 'url', func)
+        waiters = [self.executor.submit(coalescer.do, 'url', func) for __ in range(2)]
+        self.wait_in_flight(coalescer, 2)
+        self.assertEqual(len(coalescer), 1)
+
+        self.release.set()
+        self.assertEqual(leader.result(), ('page', False))
+        self.assertEqual([w.result() for w in waiters], [('page', True)] * 2)
+        self.assertEqual(func.call_count, 1)
+        self.assertEqual(len(coalescer), 0)
+
+        # Calls made once the first completed are executed again
+        self.assertEqual(coalescer.do('url', lambda: 'fresh'), ('fresh', False))
+
+    def test_shared_error(self):
+
+        coalescer = RequestCoalescer()
+
+        leader = self.executor.submit(coalescer.do, 'url', self.blocking(PoogleRequestError('Service Unavailable')))
+        waiter = self.executor.submit(coalescer.do, 'url', mock.Mock())
+        self.wait_in_flight(coalescer, 1)
+
+        self.release.set()
+        self.assertRaises(PoogleRequestError, leader.result)
+        self.assertRaises(PoogleRequestError, waiter.result)
+
+    def test_private_error(self):
+
+        coalescer = RequestCoalescer()
+
+        leader = self.executor.submit(coalescer.do, 'url', self.blocking(PoogleDeadlineError('Deadline exceeded')))
+        waiter = self.executor.submit(coalescer.do, 'url', lambda: 'page')
+        self.wait_in_flight(coalescer, 1)
+
+        # Running out of the leader's time doesn't fail the waiter, which makes the call itself
+        self.release.set()
+        self.assertRaises(PoogleDeadlineError, leader.result)
+        self.assertEqual(waiter.result(), ('page', False))
+        self.assertEqual(len(coalescer), 0)
+
+    def test_waiter_timeout(self):
+
+        coalescer = RequestCoalescer(timeout=5)
+
+        leader = self.executor.submit(coalescer.do, 'url', self.blocking('page'))
+        while not len(coalescer):
+            threading.Event().wait(0.01)
+
+        # Waiters give up on their own timeout, without interrupting the call in flight
+        self.assertRaises(PoogleTimeoutError, coalescer.do, 'url', mock.Mock(), timeout=0.01)
+        self.release.set()
+        self.assertEqual(leader.result(), ('page', False))
+
+    @mock.patch.object(poogle.Poogle, '_fetch')
+    def test_poogle_shared_page(self, mock_fetch):
+
+        mock_fetch.side_effect = lambda url, stats: self.blocking(self.html)()
+        coalescer = RequestCoalescer()
+
+        searches = [poogle.Poogle('test', 20, coalescer=coalescer) for __ in range(3)]
+        pages = [self.executor.submit(s.next_page) for s in searches]
+        self.wait_in_flight(coalescer, 2)
+
+        self.release.set()
+        pages = [p.result() for p in pages]
+        self.assertEqual(mock_fetch.call_count, 1)
+        self.assertIs(pages[0], pages[1])
+        self.assertIs(pages[0], pages[2])
+
+        for search in searches:
+            self.assertEqual(len(search.results), 20)
+            self.assertEqual(search._query_count, 1)
+
+        self.assertEqual(sorted(s.stats.coalesced for s in searches), [0, 1, 1])
@@ -0,0 +1,141 @@
+import os
+import time
+import unittest
+from concurrent.futures import Future
+
+from mock import mock
+from requests import RequestException, Timeout
+
+import poogle
+from poogle import ratelimit, retry
+from poogle.containers import PoogleResultList
+from poogle.errors import PoogleDeadlineError, PoogleRequestError, PoogleThrottledError, PoogleTimeoutError
+from poogle.stats import timer
+
+
+class PoogleDeadlineTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        with open(os.path.join(os.path.dirname(__file__), 'html', 'test.html'), 'rb') as f:
+            self.html = f.read()
+
+    def response(self, delay=0):
+        def iter_content(chunk_size):
+            time.sleep(delay)
+            yield self.html
+
+        return mock.Mock(content=self.html, iter_content=iter_content, status_code=200,
+                         url='https://www.google.com/search')
+
+    @mock.patch('requests.Session.get')
+    def test_request_timeout(self, mock_get):
+
+        mock_get.return_value = self.response()
+
+        poogle.Poogle('test').next_page()
+        self.assertEqual(mock_get.call_args[1]['timeout'], poogle.Poogle.TIMEOUT)
+
+        poogle.Poogle('test', timeout=5).next_page()
+        self.assertEqual(mock_get.call_args[1]['timeout'], (5, 5))
+
+        # Timeouts are shortened to end by the deadline
+        poogle.Poogle('test', timeout=(None, 30), deadline=timer() + 2).next_page()
+        self.assertTrue(all(t <= 2 for t in mock_get.call_args[1]['timeout']))
+
+        mock_get.side_effect = Timeout('Read timed out')
+        self.assertRaises(PoogleTimeoutError, poogle.Poogle('test').next_page)
+
+    @mock.patch('requests.Session.get')
+    def test_deadline_passed(self, mock_get):
+
+        obj = poogle.Poogle('test', deadline=timer() - 1)
+        self.assertRaises(PoogleDeadlineError, obj.next_page)
+        mock_get.assert_not_called()
+
+    @mock.patch('requests.Session.get')
+    def test_deadline_download(self, mock_get):
+
+        mock_get.return_value = self.response(0.2)
+
+        obj = poogle.Poogle('test', deadline=timer() + 0.1)
+        self.assertRaises(PoogleDeadlineError, obj.next_page)
+        mock_get.return_value.close.assert_called_once_with()
+
+    @mock.patch('poogle.sleep')
+    @mock.patch('requests.Session.get')
+    def test_no_retry_past_deadline(self, mock_get, mock_sleep):
+
+        mock_get.side_effect = RequestException('Connection reset')
+        breaker = mock.Mock()
+
+        obj = poogle.Poogle('test', retry=retry.RetryPolicy(retries=3, backoff=10, jitter=0), limiter=breaker,
+                            deadline=timer() + 5)
+        self.assertRaises(PoogleDeadlineError, obj.next_page)
+        self.assertEqual(mock_get.call_count, 1)
+        mock_sleep.assert_not_called()
+
+        # Only the request error is reported to the limiter
+        self.assertEqual(breaker.record.call_count, 1)
+        self.assertIsInstance(breaker.record.call_args[0][0], PoogleRequestError)
+
+    @mock.patch('requests.Session.get')
+    def test_search_time_limit(self, mock_get):
+
+        mock_get.side_effect = [self.response(), self.response(0.3)]
+
+        results = poogle.google_search('test', 30, 0, time_limit=0.2)
+        self.assertEqual(len(results), 20)
+        self.assertTrue(results.incomplete)
+        self.assertEqual(results.reason, PoogleResultList.DEADLINE)
+
+        mock_get.side_effect = None
+        mock_get.return_value = self.response()
+        results = poogle.google_search('test', 30, 0, time_limit=5)
+        self.assertEqual(len(results), 30)
+        self.assertFalse(results.incomplete)
+
+    @mock.patch('requests.Session.get')
+    def test_slow_limiter(self, mock_get):
+
+        mock_get.return_value = self.response()
+
+        # The next request is held for 2 seconds, longer than the search may take
+        limiter = ratelimit.IntervalLimiter(2)
+        limiter.acquire()
+
+        start = timer()
+        results = poogle.google_search('test', 10, 0, time_limit=0.5, limiter=limiter)
+        self.assertLess(timer() - start, 0.5)
+        self.assertEqual(len(results), 0)
+        self.assertTrue(results.incomplete)
+        mock_get.assert_not_called()
+
+        # An open circuit breaker gives up as soon as it would run past the deadline
+        breaker = retry.CircuitBreaker(cooldown=60)
+        breaker.record(PoogleThrottledError('Throttled'))
+
+        start = timer()
+        self.assertTrue(poogle.google_search('test', 10, 0, time_limit=0.5, limiter=breaker).incomplete)
+        self.assertLess(timer() - start, 0.5)
+
+    @mock.patch('requests.Session.get')
+    def test_parse_executor_deadline(self, mock_get):
+
+        mock_get.return_value = self.response()
+        executor = mock.Mock()
+        executor.submit.return_value = Future()
+
+        obj = poogle.Poogle('test', parse_executor=executor, deadline=timer() + 0.1)
+        self.assertRaises(PoogleDeadlineError, obj.next_page)
+
+    @mock.patch.object(poogle.Poogle, '_fetch')
+    def test_fan_out_time_limit(self, mock_fetch):
+
+        mock_fetch.side_effect = lambda url, stats: time.sleep(0.3) or self.html
+
+        start = timer()
+        results = poogle.google_search('test', 200, 0, fan_out=2, time_limit=0.1)
+        self.assertLess(timer() - start, 0.3)
+        self.assertEqual(len(results), 0)
+        self.assertTrue(results.incomplete)
@@ -0,0 +1,116 @@
+import os
+import unittest
+
+from mock import mock
+
+import poogle
+from poogle import dedup
+from poogle.containers import PoogleResultList
+
+
+class PoogleNormalizeUrlTestCase(unittest.TestCase):
+
+    def test_normalize_url(self):
+
+        normalize = dedup.normalize_url
+
+        self.assertEqual(normalize('HTTP://Example.COM:80/Path/?b=2&a=1#top'), 'http://example.com/Path?a=1&b=2')
+        self.assertEqual(normalize('https://example.com:443/'), 'https://example.com')
+        self.assertEqual(normalize('https://example.com:8443/'), 'https://example.com:8443')
+        self.assertEqual(normalize('https://example.com/?utm_source=x&gclid=y&q=1'), 'https://example.com?q=1')
+
+        # Paths and query values are case sensitive
+        self.assertNotEqual(normalize('http://example.com/A'), normalize('http://example.com/a'))
+        self.assertNotEqual(normalize('http://example.com/?q=A'), normalize('http://example.com/?q=a'))
+
+
+class PoogleDedupIndexTestCase(unittest.TestCase):
+
+    def test_dedup_index(self):
+
+        index = dedup.DedupIndex()
+        self.assertTrue(index.add('http://example.com/'))
+        self.assertFalse(index.add('HTTP://EXAMPLE.COM#top'))
+        self.assertTrue(index.add('http://example.com/other'))
+        self.assertIn('http://example.com?utm_medium=email', index)
+        self.assertEqual(len(index), 2)
+
+    def test_bloom_filter_index(self):
+
+        index = dedup.BloomFilterIndex(1000, 0.01)
+        urls = ['http://example.com/{n}'.format(n=n) for n in range(1000)]
+
+        added = sum(index.add(url) for url in urls)
+        self.assertGreater(added, 980)
+        self.assertEqual(len(index), added)
+
+        # Seen URLs are never reported as new
+        self.assertFalse(any(index.add(url) for url in urls))
+        self.assertTrue(all(url in index for url in urls))
+
+        self.assertRaises(ValueError, dedup.BloomFilterIndex, 0)
+        self.assertRaises(ValueError, dedup.BloomFilterIndex, 10, 1.5)
+
+    def test_create_dedup_index(self):
+
+        index = dedup.DedupIndex()
+        self.assertIs(dedup.create_dedup_index(index), index)
+        self.assertIsInstance(dedup.create_dedup_index(True), dedup.DedupIndex)
+        self.assertIsNone(dedup.create_dedup_index(False))
+        self.assertIsNone(dedup.create_dedup_index(None))
+
+
+@mock.patch.object(poogle.Poogle, '_fetch')
+class PoogleDedupSearchTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        with open(os.path.join(os.path.dirname(__file__), 'html', 'test.html'), 'r') as f:
+            self.html = f.read()
+
+    def test_search_dedup(self, mock_fetch):
+
+        mock_fetch.return_value = self.html
+
+        # Every page holds the same 20 results
+        results = poogle.google_search('test', 30, 0)
+        self.assertEqual(len(results), 30)
+        self.assertEqual(len(set(r.url_string for r in results)), 20)
+
+        # Duplicates are skipped, and further pages fetched for unique results until the query limit is reached,
+        # returning the unique results found so far
+        mock_fetch.reset_mock()
+        results = poogle.google_search('test', 30, 0, dedup=True)
+
+        self.assertEqual(len(results), 20)
+        self.assertEqual(len(set(r.url_string for r in results)), 20)
+        self.assertTrue(results.incomplete)
+        self.assertEqual(results.reason, PoogleResultList.QUERY_LIMIT)
+        self.assertEqual(mock_fetch.call_count, 4)
+
+    def test_shared_index(self, mock_fetch):
+
+        mock_fetch.return_value = self.html
+        everything = [r.url_string for r in poogle.google_search('test', 20, 0)]
+
+        index = dedup.DedupIndex()
+        first  = poogle.google_search('first', 5, 0, dedup=index)
+        second = poogle.google_search('second', 5, 0, dedup=index)
+
+        self.assertEqual([r.url_string for r in first], everything[:5])
+        self.assertEqual([r.url_string for r in second], everything[5:10])
+        self.assertEqual(len(index), 10)
+
+    def test_search_many(self, mock_fetch):
+
+        mock_fetch.return_value = self.html
+
+        results = dict(poogle.google_search_many(['first', 'second'], 10, 0, workers=2, dedup=True))
+        urls = [r.url_string for r in results['first'] + results['second']]
+        self.assertEqual(len(urls), 20)
+        self.assertEqual(len(set(urls)), 20)
+
+        # Queries left without unique results return what they found rather than failing
+        results = dict(poogle.google_search_many(['first', 'second', 'third'], 10, 0, workers=1, dedup=True))
+        self.assertEqual(sorted(len(r) for r in results.values()), [0, 10, 10])
+        self.assertEqual(sorted(r.incomplete for r in results.values()), [False, False, True])
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+
+from mock import mock
+
+from poogle import monitor
+from poogle.errors import PoogleNoMoreResultsError
+
+
+class FakeSearch(object):
+    """
+    Serves a ranking of URLs one page at a time.
+    """
+    ranking = []
+    fetched = 0
+
+    def __init__(self, query, per_page, **kwargs):
+        self.per_page = per_page
+        self.page = 0
+
+    def next_page(self):
+        start = self.page * self.per_page
+        if start >= len(self.ranking):
+            raise PoogleNoMoreResultsError()
+
+        self.page += 1
+        FakeSearch.fetched += 1
+        urls = self.ranking[start:start + self.per_page]
+        return mock.Mock(results=[mock.Mock(url_string=url, title=url.upper()) for url in urls])
+
+    def close(self):
+        pass
+
+
+@mock.patch('poogle.monitor.Poogle', FakeSearch)
+class PoogleMonitorTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        FakeSearch.ranking = ['u%d' % n for n in range(1, 51)]
+        FakeSearch.fetched = 0
+        self.monitor = monitor.SearchMonitor(results=50, per_page=10)
+
+    def refresh(self, ranking=None):
+        if ranking is not None:
+            FakeSearch.ranking = ranking
+        FakeSearch.fetched = 0
+        return self.monitor.refresh('test')
+
+    def test_first_refresh(self):
+
+        diff = self.refresh()
+        self.assertEqual(diff.pages, 5)
+        self.assertEqual(len(diff.new), 50)
+        self.assertEqual(diff.new[0], monitor.RankChange('u1', 'U1', None, 1))
+        self.assertEqual([r.url for r in self.monitor.store.get('test')], FakeSearch.ranking)
+
+    def test_unchanged(self):
+
+        self.refresh()
+        diff = self.refresh()
+
+        # Only the first page is fetched while the ranking is stable
+        self.assertEqual(diff.pages, 1)
+        self.assertFalse(diff.changed)
+        self.assertEqual(len(diff.ranking), 50)
+
+    def test_moved_within_page(self):
+
+        self.refresh()
+
+        ranking = list(FakeSearch.ranking)
+        ranking[0], ranking[4] = ranking[4], ranking[0]
+        diff = self.refresh(ranking)
+
+        self.assertEqual(diff.pages, 1)
+        self.assertEqual(sorted((c.url, c.delta) for c in diff.moved), [('u1', -4), ('u5', 4)])
+        self.assertEqual(diff.new, [])
+        self.assertEqual(diff.dropped, [])
+
+    def test_new_and_dropped(self):
+
+        self.refresh()
+
+        # A new URL enters at rank 3, shifting every rank below it down until u20 drops off page two
+        ranking = ['u1', 'u2', 'new'] + ['u%d' % n for n in range(3, 20)] + ['u21'] + ['u%d' % n for n in range(22, 51)]
+        diff = self.refresh(ranking)
+
+        self.assertEqual(diff.pages, 3)
+        self.assertEqual(diff.new, [monitor.RankChange('new', 'NEW', None, 3)])
+        self.assertEqual([(c.url, c.old_rank) for c in diff.dropped], [('u20', 20)])
+        self.assertEqual(len(diff.moved), 17)
+        self.assertTrue(all(c.delta == -1 for c in diff.moved))
+        self.assertEqual([r.url for r in diff.ranking], ranking)
+
+    def test_depth(self):
+
+        self.monitor.depth = 30
+        self.refresh()
+        self.assertEqual(self.refresh().pages, 3)
+
+    def test_persistent_store(self):
+
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            store = monitor.RankingStore(path)
+            store.set('test', [monitor.RankedResult('u1', 'U1')])
+            store.close()
+
+            store = monitor.RankingStore(path)
+            self.assertEqual(store.get('test'), [monitor.RankedResult('u1', 'U1')])
+            self.assertIsNone(store.get('missing'))
+            self.assertEqual(len(store), 1)
+            store.close()
+        finally:
+            os.remove(path)
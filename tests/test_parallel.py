@@ -0,0 +1,67 @@
+import os
+import pickle
+import unittest
+
+from mock import mock
+
+import poogle
+from poogle import containers, parallel, parsers
+from poogle.errors import PoogleNoResultsError
+
+
+class PoogleParallelTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = parallel.create_parse_executor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def setUp(self):
+
+        self.html_dir = os.path.join(os.path.dirname(__file__), 'html')
+        with open(os.path.join(self.html_dir, 'test.html'), "rb") as f:
+            self.html = f.read()
+
+        self.mock_poogle = mock.Mock()
+        self.mock_poogle.strict = False
+
+    def test_page_record(self):
+        record = parallel.parse_page_record(self.html, 'html.parser', 'test')
+        self.assertIsInstance(record, containers.PageRecord)
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+
+        expected = containers.PoogleResultsPage(self.mock_poogle, parsers.get_parser().parse(self.html))
+        page = containers.PoogleResultsPage.from_record(self.mock_poogle, record)
+
+        self.assertEqual(page.number, expected.number)
+        self.assertEqual(page.total_results, expected.total_results)
+        self.assertEqual(page.prev_url, expected.prev_url)
+        self.assertEqual(page.next_url, expected.next_url)
+        self.assertEqual(len(page), len(expected))
+        self.assertEqual([(r.title, r.url) for r in page.results], [(r.title, r.url) for r in expected.results])
+        self.assertIs(page.results[0].page, page)
+
+    def test_executor(self):
+        futures = [self.executor.submit(parallel.parse_page_record, self.html, None, 'test') for __ in range(4)]
+        records = [f.result() for f in futures]
+        self.assertEqual(len(records[0].results), 20)
+        self.assertTrue(all(r == records[0] for r in records))
+
+    def test_executor_errors(self):
+        future = self.executor.submit(parallel.parse_page_record, b'<html></html>', None, 'test')
+        self.assertRaises(PoogleNoResultsError, future.result)
+
+    @mock.patch('requests.Session.get')
+    def test_poogle_parse_executor(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        results = poogle.google_search('test', 30, parse_executor=self.executor)
+        self.assertEqual(len(results), 30)
+        self.assertEqual(results[0].url.as_string(), 'http://www.speedtest.net/')
+        self.assertEqual(results[0].page.total_results, 2390000000)
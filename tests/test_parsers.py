@@ -0,0 +1,69 @@
+import os
+import unittest
+
+from bs4 import BeautifulSoup
+from mock import mock
+
+from benchmarks import fixtures
+from poogle import containers, parsers
+
+
+class PoogleParsersTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.html_dir = os.path.join(os.path.dirname(__file__), 'html')
+        with open(os.path.join(self.html_dir, 'test.html'), "rb") as f:
+            self.html = f.read()
+
+        self.mock_poogle = mock.Mock()
+        self.mock_poogle.strict = False
+
+    def page_data(self, parsed):
+        page = containers.PoogleResultsPage(self.mock_poogle, parsed)
+        results = [(r.title, r.url.as_string()) for r in page.results]
+        return results, page.total_results, page.number, page.prev_url, page.next_url
+
+    def test_backends_identical(self):
+        expected = self.page_data(BeautifulSoup(self.html, 'html.parser'))
+        self.assertEqual(len(expected[0]), 20)
+
+        for name in parsers.available_parsers():
+            parsed = parsers.get_parser(name).parse(self.html)
+            self.assertEqual(self.page_data(parsed), expected, name)
+
+            # Text input is handled the same as bytes
+            parsed = parsers.get_parser(name).parse(self.html.decode('utf-8'))
+            self.assertEqual(self.page_data(parsed), expected, name)
+
+    def test_empty_page(self):
+        for name in parsers.available_parsers():
+            for content in (b'<html><body><p>Nothing here</p></body></html>', b'', u'', b'  \n'):
+                parsed = parsers.get_parser(name).parse(content)
+                self.assertIsNone(parsed.results)
+                self.assertIsNone(parsed.stats)
+                self.assertIsNone(parsed.foot)
+
+    def test_get_parser(self):
+        self.assertIsInstance(parsers.get_parser('html.parser'), parsers.SoupParser)
+        self.assertIsInstance(parsers.get_parser(u'html.parser'), parsers.SoupParser)
+
+        # The default is the fastest backend installed
+        default = parsers.LxmlParser if parsers.LxmlParser.available() else parsers.SoupParser
+        self.assertIsInstance(parsers.get_parser(), default)
+
+        custom = parsers.SoupParser()
+        self.assertIs(parsers.get_parser(custom), custom)
+
+        self.assertRaises(ValueError, parsers.get_parser, 'html6lib')
+
+    def test_benchmark_fixtures(self):
+        for size in fixtures.SIZES:
+            html = fixtures.search_page(size)
+            for name in parsers.available_parsers():
+                results, total, number, prev_url, next_url = self.page_data(parsers.get_parser(name).parse(html))
+                self.assertEqual(len(results), size)
+                self.assertEqual(total, 2390000000)
+                self.assertEqual(number, 1)
+                self.assertIsNone(prev_url)
+                self.assertIn('start={s}'.format(s=size * 9), next_url)
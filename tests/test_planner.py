@@ -0,0 +1,108 @@
+import os
+import unittest
+
+from mock import mock
+
+import poogle
+from poogle import planner, stats
+
+
+class PoogleQueryPlanTestCase(unittest.TestCase):
+
+    def test_single_page(self):
+
+        plan = planner.plan_search(10)
+        self.assertEqual((plan.requests, plan.per_page), (1, 10))
+        self.assertEqual(plan.pages, [(0, 10)])
+
+        # A full page of 100 no longer needs a second request
+        plan = planner.plan_search(100)
+        self.assertEqual((plan.requests, plan.per_page), (1, 100))
+
+    def test_results_spread_across_pages(self):
+
+        plan = planner.plan_search(150)
+        self.assertEqual((plan.requests, plan.per_page), (2, 75))
+        self.assertEqual(plan.pages, [(0, 75), (75, 75)])
+        self.assertEqual(plan.fetched, 150)
+
+        plan = planner.plan_search(201)
+        self.assertEqual((plan.requests, plan.per_page), (3, 67))
+
+    def test_skip_rate(self):
+
+        plan = planner.plan_search(90, skip_rate=0.1)
+        self.assertEqual((plan.requests, plan.per_page), (1, 100))
+        self.assertGreaterEqual(plan.expected_results, 90)
+
+        # Headroom for skipped results never costs an extra request
+        plan = planner.plan_search(100, skip_rate=0.1)
+        self.assertEqual((plan.requests, plan.per_page), (1, 100))
+
+        plan = planner.plan_search(150, skip_rate=0.1)
+        self.assertEqual((plan.requests, plan.per_page), (2, 84))
+
+        for results, requests in ((200, 2), (500, 5)):
+            plan = planner.plan_search(results, skip_rate=0.1)
+            self.assertEqual((plan.requests, plan.per_page), (requests, 100))
+
+        self.assertRaises(ValueError, planner.plan_search, 10, skip_rate=1)
+        self.assertRaises(ValueError, planner.plan_search, 10, skip_rate=-0.1)
+
+    def test_no_results(self):
+
+        plan = planner.plan_search(0)
+        self.assertEqual((plan.requests, plan.per_page), (0, 1))
+        self.assertEqual(plan.pages, [])
+
+    def test_stats_skip_rate(self):
+
+        search_stats = stats.SearchStats()
+        self.assertEqual(search_stats.skip_rate, 0.0)
+
+        page_stats = stats.PageStats()
+        page_stats.results = 18
+        page_stats.skipped = 2
+        search_stats.add(page_stats)
+        self.assertAlmostEqual(search_stats.skip_rate, 0.1)
+
+    def test_expected_skip_rate(self):
+
+        # Some results are assumed unparsable until a search has seen otherwise
+        search_stats = stats.SearchStats()
+        self.assertEqual(planner.expected_skip_rate(), planner.DEFAULT_SKIP_RATE)
+        self.assertEqual(planner.expected_skip_rate(search_stats), planner.DEFAULT_SKIP_RATE)
+
+        page_stats = stats.PageStats()
+        page_stats.results = 20
+        search_stats.add(page_stats)
+        self.assertEqual(planner.expected_skip_rate(search_stats), 0.0)
+
+    @mock.patch('requests.Session.get')
+    def test_google_search_default_plan(self, mock_get):
+
+        with open(os.path.join(os.path.dirname(__file__), 'html', 'test.html'), 'r') as f:
+            mock_get.return_value = mock.Mock(content=f.read())
+
+        # Headroom is requested for skipped results, rather than planning on every result parsing
+        poogle.google_search('test query', 10, pause=0)
+        self.assertIn('&num=12&start=0', mock_get.call_args[0][0])
+
+        # The plan doesn't change with the skip rate seen, so the same search requests the same pages every time
+        search_stats = stats.SearchStats()
+        page_stats = stats.PageStats()
+        page_stats.results = 20
+        search_stats.add(page_stats)
+
+        poogle.google_search('test query', 10, pause=0, stats=search_stats)
+        self.assertIn('&num=12&start=0', mock_get.call_args[0][0])
+
+    @mock.patch('requests.Session.get')
+    def test_google_search_plan(self, mock_get):
+
+        with open(os.path.join(os.path.dirname(__file__), 'html', 'test.html'), 'r') as f:
+            mock_get.return_value = mock.Mock(content=f.read())
+
+        poogle.google_search('test query', 20, pause=0, plan=planner.plan_search(20))
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertIn('&num=20&start=0', mock_get.call_args[0][0])
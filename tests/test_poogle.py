@@ -1,14 +1,18 @@
+import gc
 import os
+import tempfile
+import threading
 import unittest
+from itertools import islice
 
 import yurl
 from bs4 import BeautifulSoup
 from mock import mock
-from poogle.errors import PoogleRequestError
+from poogle.errors import PoogleNoResultsError, PoogleParserError, PoogleRequestError, PoogleTimeoutError
 from requests import RequestException
 
 import poogle
-from poogle import containers
+from poogle import containers, parsers, session, ratelimit, stats
 
 
 class PoogleBaseTestCase(unittest.TestCase):
@@ -24,7 +28,7 @@ class PoogleBaseTestCase(unittest.TestCase):
 
 class PoogleTestCase(PoogleBaseTestCase):
 
-    @mock.patch('poogle.requests.get')
+    @mock.patch('requests.Session.get')
     def test_poogle_attributes(self, mock_get):
 
         mock_get_response = mock.Mock()
@@ -72,7 +76,215 @@ class PoogleTestCase(PoogleBaseTestCase):
         self.assertEqual(len(obj._results), 2)
         self.assertEqual(obj._results[1][0], 2)
 
-    @mock.patch('poogle.requests.get')
+    @mock.patch('requests.Session.get')
+    def test_poogle_iteration(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        obj = poogle.Poogle('test', 20)
+        results = iter(obj)
+
+        self.assertEqual(len(list(islice(results, 20))), 20)
+        self.assertEqual(mock_get.call_count, 1)
+
+        next(results)
+        self.assertEqual(mock_get.call_count, 2)
+
+        # Iteration stops cleanly on the last page
+        obj.last.next_url = None
+        self.assertEqual(len(list(results)), 19)
+        self.assertEqual(len(list(obj)), 40)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @mock.patch.object(poogle.Poogle, '_fetch')
+    def test_poogle_prefetch(self, mock_fetch):
+
+        mock_fetch.return_value = self.html
+
+        obj = poogle.Poogle('test', 20, prefetch=True)
+        obj.next_page()
+
+        # The second page is requested in the background right away
+        url, future, stats = obj._prefetched
+        self.assertEqual(future.result(), self.html)
+        self.assertEqual(mock_fetch.call_args_list, [mock.call(mock.ANY, mock.ANY), mock.call(url, stats)])
+
+        # And used by the next call rather than requested again
+        obj.next_page()
+        obj._prefetched[1].result()
+        self.assertEqual(mock_fetch.call_count, 3)
+        self.assertNotEqual(obj._prefetched[0], url)
+
+        obj.close()
+        self.assertIsNone(obj._prefetched)
+
+    @mock.patch.object(poogle.Poogle, '_fetch')
+    def test_poogle_prefetch_error(self, mock_fetch):
+
+        mock_fetch.side_effect = [self.html, PoogleRequestError('Service Unavailable')]
+
+        obj = poogle.Poogle('test', 20, prefetch=True)
+        obj.next_page()
+
+        # Errors from the prefetch are raised by the call that uses it
+        self.assertRaises(PoogleRequestError, obj.next_page)
+        obj.close()
+
+    @mock.patch.object(poogle.Poogle, '_fetch')
+    def test_poogle_prefetch_close(self, mock_fetch):
+
+        release = threading.Event()
+        self.addCleanup(release.set)
+        # Only the prefetched second page is slow
+        mock_fetch.side_effect = lambda url, stats: (mock_fetch.call_count == 1 or release.wait(5)) and self.html
+
+        obj = poogle.Poogle('test', 20, prefetch=True)
+        obj.next_page()
+
+        # Closing doesn't wait on the prefetch already in flight
+        with mock.patch.object(obj._session, 'close') as mock_close:
+            start = stats.timer()
+            obj.close()
+            self.assertLess(stats.timer() - start, 1)
+            mock_close.assert_not_called()
+
+            # The session is closed once the abandoned prefetch completes
+            release.set()
+            for __ in range(500):
+                if mock_close.called:
+                    break
+                threading.Event().wait(0.01)
+            mock_close.assert_called_once_with()
+
+    @mock.patch.object(poogle.Poogle, '_fetch')
+    def test_search_prefetch_needed(self, mock_fetch):
+
+        mock_fetch.return_value = self.html
+
+        # The first page covers every result, so nothing is prefetched
+        self.assertEqual(len(poogle.google_search('test', 10, 0, prefetch=True)), 10)
+        self.assertEqual(mock_fetch.call_count, 1)
+
+    def test_poogle_page_offsets(self):
+
+        obj = poogle.Poogle('test', 20)
+        self.assertTrue(obj.page_url(1).endswith('&num=20&start=0'))
+        self.assertTrue(obj.page_url(2).endswith('&num=20&start=20'))
+        self.assertTrue(obj.page_url(5).endswith('&num=20&start=80'))
+
+    @mock.patch.object(poogle.Poogle, '_fetch')
+    def test_poogle_fan_out(self, mock_fetch):
+
+        mock_fetch.return_value = self.html
+
+        obj = poogle.Poogle('test', 20)
+        pages = list(obj.fan_out(3, workers=3))
+
+        # Every planned offset is requested, and pages are appended in rank order
+        self.assertEqual(len(pages), 3)
+        urls = sorted(c[0][0] for c in mock_fetch.call_args_list)
+        self.assertEqual(urls, sorted(obj.page_url(n) for n in (1, 2, 3)))
+        self.assertEqual(obj._query_count, 3)
+        self.assertEqual(len(obj.results), 60)
+
+        # Fanning out again continues from the last page
+        list(obj.fan_out(1))
+        self.assertEqual(mock_fetch.call_args[0][0], obj.page_url(4))
+
+    @mock.patch.object(poogle.Poogle, '_fetch')
+    def test_poogle_fan_out_close(self, mock_fetch):
+
+        release = threading.Event()
+        self.addCleanup(release.set)
+        # Only the first page returns right away
+        mock_fetch.side_effect = lambda url, stats: (url == obj.page_url(1) or release.wait(5)) and self.html
+
+        obj = poogle.Poogle('test', 20)
+        planned = obj.fan_out(3, workers=3)
+        next(planned)
+        while mock_fetch.call_count < 3:
+            threading.Event().wait(0.01)
+
+        # Closing during a fan-out doesn't wait on the pages still in flight, or close the session under them
+        with mock.patch.object(obj._session, 'close') as mock_close:
+            planned.close()
+            obj.close()
+            mock_close.assert_not_called()
+
+            release.set()
+            for __ in range(500):
+                if mock_close.called:
+                    break
+                threading.Event().wait(0.01)
+            mock_close.assert_called_once_with()
+
+    @mock.patch.object(poogle.Poogle, '_fetch')
+    def test_poogle_fan_out_last_page(self, mock_fetch):
+
+        last_page = self.html.replace('id="foot"', 'id="nofoot"')
+        mock_fetch.side_effect = [self.html, last_page] + [self.html] * 3
+
+        obj = poogle.Poogle('test', 20)
+        pages = list(obj.fan_out(5, workers=1))
+
+        # Pages after the one without a next page link are discarded
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(len(obj.results), 40)
+        self.assertRaises(poogle.PoogleNoMoreResultsError, obj.next_page)
+
+    @mock.patch('requests.Session.get')
+    def test_poogle_stats(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        observer = mock.Mock()
+        shared = stats.SearchStats()
+
+        obj = poogle.Poogle('test', 20, observers=[observer], stats=shared, limiter=mock.Mock())
+        obj.next_page()
+        obj.next_page()
+
+        self.assertIs(obj.stats, shared)
+        self.assertEqual(len(obj.stats), 2)
+        self.assertEqual(observer.call_count, 2)
+
+        page_stats = observer.call_args[0][0]
+        self.assertIsInstance(page_stats, stats.PageStats)
+        self.assertEqual(page_stats.page, 1)
+        self.assertEqual(page_stats.results, 20)
+        self.assertEqual(page_stats.skipped, 0)
+        self.assertEqual(page_stats.download_bytes, len(self.html))
+        self.assertGreater(page_stats.parse_time, 0)
+        self.assertGreater(page_stats.extract_time, 0)
+        self.assertGreaterEqual(page_stats.limiter_wait, 0)
+        self.assertFalse(page_stats.cached)
+
+        self.assertEqual(obj.stats.results, 40)
+        self.assertEqual(obj.stats.download_bytes, len(self.html) * 2)
+        self.assertIn('Pages fetched:       2 (0 from cache)', obj.stats.summary())
+
+    def test_search_stats_bounded(self):
+
+        page_stats = [stats.PageStats('https://www.google.com/search?start={n}'.format(n=n)) for n in range(5)]
+
+        # Only the most recent pages are kept, while the totals cover every page
+        bounded = stats.SearchStats(keep_pages=2)
+        unbounded = stats.SearchStats(keep_pages=None)
+        for page in page_stats:
+            page.results = 10
+            bounded.add(page)
+            unbounded.add(page)
+
+        self.assertEqual(list(bounded.pages), page_stats[-2:])
+        self.assertEqual(list(unbounded.pages), page_stats)
+        self.assertEqual((len(bounded), bounded.results), (5, 50))
+        self.assertIn('Pages fetched:       5', bounded.summary())
+
+    @mock.patch('requests.Session.get')
     @mock.patch.object(poogle.Poogle, 'next_page')
     def test_poogle_eager_loading(self, mock_next_page, mock_get):
 
@@ -83,7 +295,7 @@ class PoogleTestCase(PoogleBaseTestCase):
         obj = poogle.Poogle('test', 20, lazy=False)
         mock_next_page.assert_called_once_with()
 
-    @mock.patch('poogle.requests.get')
+    @mock.patch('requests.Session.get')
     @mock.patch.object(poogle.Poogle, 'next_page')
     def test_poogle_lazy_loading(self, mock_next_page, mock_get):
 
@@ -96,7 +308,7 @@ class PoogleTestCase(PoogleBaseTestCase):
         mock_next_page.assert_called_once_with()
 
 
-    @mock.patch('poogle.requests.get')
+    @mock.patch('requests.Session.get')
     def test_poogle_bad_arguments(self, mock_get):
 
         mock_get_response = mock.Mock()
@@ -106,12 +318,61 @@ class PoogleTestCase(PoogleBaseTestCase):
         self.assertRaises(ValueError, poogle.Poogle, 'test', 101)
         self.assertRaises(ValueError, poogle.Poogle, 'test', -1)
 
-    @mock.patch('poogle.requests.get')
+    @mock.patch('requests.Session.get')
     def test_request_error(self, mock_get):
 
         mock_get.side_effect = RequestException()
         self.assertRaises(PoogleRequestError, poogle.Poogle, 'test', 20, lazy=False)
 
+    @mock.patch('requests.Session.get')
+    def test_empty_response(self, mock_get):
+
+        mock_get.return_value = mock.Mock(content=b'', status_code=200, url='https://www.google.com/search')
+
+        # Every backend fails the same way on an empty page
+        for parser in parsers.available_parsers():
+            self.assertRaises(PoogleNoResultsError, poogle.google_search, 'test', 10, 0, parser=parser)
+
+
+class PoogleSessionTestCase(PoogleBaseTestCase):
+
+    def tearDown(self):
+        session.set_shared_session(None)
+
+    @mock.patch('requests.Session.get')
+    def test_session_reused_between_pages(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        obj = poogle.Poogle('test', 20)
+        obj.next_page()
+        obj.next_page()
+
+        self.assertTrue(obj._owns_session)
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_custom_session(self):
+        custom = session.create_session()
+        obj = poogle.Poogle('test', 20, session=custom)
+        self.assertIs(obj._session, custom)
+        self.assertFalse(obj._owns_session)
+
+    def test_shared_session(self):
+        first = poogle.Poogle('test', 20, shared_session=True)
+        second = poogle.Poogle('test', 20, shared_session=True)
+        self.assertIs(first._session, second._session)
+        self.assertIs(first._session, session.get_shared_session())
+
+    def test_create_session(self):
+        s = session.create_session(pool_connections=2, pool_maxsize=20, keep_alive=False, headers={'X-Test': '1'})
+        adapter = s.get_adapter('https://www.google.com')
+        self.assertEqual(adapter._pool_connections, 2)
+        self.assertEqual(adapter._pool_maxsize, 20)
+        self.assertEqual(s.headers['Connection'], 'close')
+        self.assertEqual(s.headers['X-Test'], '1')
+
 
 class PoogleResultsTestCase(PoogleBaseTestCase):
 
@@ -123,7 +384,9 @@ class PoogleResultsTestCase(PoogleBaseTestCase):
 
     def test_results_page_container_attributes(self):
         self.assertIs(self.results_page._poogle, self.mock_poogle)
-        self.assertIs(self.results_page._soup, self.soup)
+        self.assertIsNone(self.results_page._soup)
+        self.assertIsNone(self.results_page._parsed)
+        self.assertIsNone(self.results_page.html)
 
         self.assertEqual(self.results_page.count, 20)
         self.assertEqual(len(self.results_page.results), 20)
@@ -134,6 +397,41 @@ class PoogleResultsTestCase(PoogleBaseTestCase):
         self.assertIsNone(self.results_page.prev_url)
         self.assertIsNotNone(self.results_page.next_url)
 
+    def test_results_memory(self):
+        try:
+            import tracemalloc
+        except ImportError:  # pragma: no cover
+            raise unittest.SkipTest('tracemalloc requires Python 3.4+')
+
+        parser = parsers.get_parser()
+        html = self.html.encode('utf-8')
+        gc.collect()
+
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            pages = [containers.PoogleResultsPage(self.mock_poogle, parser.parse(html)) for __ in range(20)]
+            gc.collect()
+            used = tracemalloc.get_traced_memory()[0] - baseline
+        finally:
+            tracemalloc.stop()
+
+        # Only the parsed values are retained, not the parse tree
+        count = sum(len(page) for page in pages)
+        per_result = used / count
+        self.assertLess(per_result, 2048, 'Retained {b:.0f} bytes per result'.format(b=per_result))
+        self.assertLess(used, len(html) * len(pages) / 4)
+
+    @mock.patch('requests.Session.get')
+    def test_keep_html(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        self.assertIsNone(poogle.Poogle('test').next_page().html)
+        self.assertEqual(poogle.Poogle('test', keep_html=True).next_page().html, self.html)
+
     def test_results_container_attributes(self):
         first = self.results_page.results[0]
         self.assertEqual(first.title, 'Speedtest.net by Ookla - The Global Broadband Speed Test')
@@ -151,9 +449,35 @@ class PoogleResultsTestCase(PoogleBaseTestCase):
         self.assertEqual(last.url.as_string(), 'https://www.politicalcompass.org/test')
 
 
+    def test_results_lazy_decoding(self):
+        first = self.results_page.results[0]
+
+        # URLs are only decoded when first accessed, and then kept
+        self.assertIsNone(first._url)
+        self.assertEqual(first.url_string, 'http://www.speedtest.net/')
+        self.assertIsNone(first._url)
+        self.assertIs(first.url, first.url)
+
+        record = containers.ResultRecord(first.title, first.url_string)
+        rebuilt = containers.PoogleResult.from_record(self.results_page, record)
+        self.assertEqual(rebuilt.url.as_string(), 'http://www.speedtest.net/')
+
+    def test_results_precheck(self):
+        match = containers.PoogleResult.match
+        self.assertEqual(match('Title', '/url?q=http://example.com/%3Fa%3D1&sa=U&ved=0'), 'http://example.com/%3Fa%3D1')
+        self.assertIsNone(match(None, '/url?q=http://example.com/&sa=U'))
+        self.assertIsNone(match('Title', None))
+        self.assertIsNone(match('Title', '/images?q=test'))
+        self.assertIsNone(match('Title', '/url?q=http://example.com/'))
+
+        self.assertIsNone(containers.PoogleResult.from_link(self.results_page, 'Title', '/images?q=test'))
+        with self.assertRaises(PoogleParserError):
+            containers.PoogleResult(self.results_page, 'Title', '/images?q=test')
+
+
 class PoogleGoogleSearchTestCase(PoogleBaseTestCase):
 
-    @mock.patch('poogle.requests.get')
+    @mock.patch('requests.Session.get')
     @mock.patch('poogle.sleep')
     def test_standard_calls(self, mock_sleep, mock_get):
 
@@ -169,8 +493,84 @@ class PoogleGoogleSearchTestCase(PoogleBaseTestCase):
 
         mock_sleep.assert_not_called()
 
-    # TODO: We need a large sample to test this with
-    # @mock.patch('poogle.requests.get')
+    @mock.patch('requests.Session.get')
+    def test_iter_google_search(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        results = poogle.iter_google_search('test query', 50, pause=0)
+        self.assertIsInstance(next(results), containers.PoogleResult)
+        self.assertEqual(mock_get.call_count, 1)
+
+        self.assertEqual(len(list(results)), 49)
+        self.assertEqual(mock_get.call_count, 3)
+
+    @mock.patch('requests.Session.get')
+    def test_fan_out_google_search(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        # The planned page holds fewer results than requested, so the rest is fetched sequentially
+        results = poogle.google_search('test query', 50, pause=0, fan_out=4)
+        self.assertEqual(len(results), 50)
+        self.assertEqual(mock_get.call_count, 3)
+
+    @mock.patch('requests.Session.get')
+    def test_search_many(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        queries = ['query %d' % i for i in range(10)]
+        results = dict(poogle.google_search_many(iter(queries), 20, pause=0, workers=3))
+
+        self.assertEqual(sorted(results), sorted(queries))
+        for query_results in results.values():
+            self.assertEqual(len(query_results), 20)
+
+    @mock.patch('requests.Session.get')
+    def test_search_many_errors(self, mock_get):
+
+        mock_get.side_effect = RequestException()
+
+        results = list(poogle.google_search_many(['first', 'second'], pause=0, workers=2))
+        self.assertEqual(len(results), 2)
+        for __, error in results:
+            self.assertIsInstance(error, PoogleRequestError)
+
+    @mock.patch('requests.Session.close')
+    @mock.patch('requests.Session.get')
+    def test_search_many_session(self, mock_get, mock_close):
+
+        mock_get.return_value = mock.Mock(content=self.html)
+
+        # Only the session created for the queries is closed, once they are done
+        list(poogle.google_search_many(['first', 'second'], 20, pause=0, workers=2))
+        self.assertEqual(mock_close.call_count, 1)
+
+        session = mock.Mock()
+        session.get.return_value = mock.Mock(content=self.html)
+        list(poogle.google_search_many(['first'], 20, pause=0, session=session))
+        session.close.assert_not_called()
+
+    @mock.patch('requests.Session.get')
+    def test_search_many_shared_limiter(self, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        limiter = mock.Mock()
+        list(poogle.google_search_many(['first', 'second', 'third'], 20, workers=2, limiter=limiter))
+        self.assertEqual(limiter.acquire.call_count, 3)
+
+        # TODO: We need a large sample to test this with
+    # @mock.patch('requests.Session.get')
     # @mock.patch('poogle.sleep')
     # def test_large_calls(self, mock_sleep, mock_get):
     #
@@ -182,3 +582,114 @@ class PoogleGoogleSearchTestCase(PoogleBaseTestCase):
     #     self.assertEqual(len(results), 150)
     #     mock_sleep.assert_called_once_with(0.1)
 
+
+
+class PoogleRateLimitTestCase(PoogleBaseTestCase):
+
+    @mock.patch('poogle.ratelimit.time.sleep')
+    @mock.patch('poogle.ratelimit.time.time')
+    def test_interval_limiter(self, mock_time, mock_sleep):
+
+        mock_time.return_value = 100.0
+        limiter = ratelimit.IntervalLimiter(0.5)
+
+        self.assertEqual(limiter.acquire(), 0)
+        self.assertEqual(limiter.acquire(), 0.5)
+        self.assertEqual(limiter.acquire(), 1.0)
+        mock_sleep.assert_has_calls([mock.call(0.5), mock.call(1.0)])
+
+    @mock.patch('poogle.ratelimit.time.sleep')
+    @mock.patch('poogle.ratelimit.time.time')
+    def test_token_bucket_limiter(self, mock_time, mock_sleep):
+
+        mock_time.return_value = 100.0
+        limiter = ratelimit.TokenBucketLimiter(2, burst=3)
+
+        # Bursts are let through immediately
+        self.assertEqual([limiter.acquire() for __ in range(3)], [0, 0, 0])
+        mock_sleep.assert_not_called()
+
+        # Then requests are paced at the sustained rate
+        self.assertEqual(limiter.acquire(), 0.5)
+        self.assertEqual(limiter.acquire(), 1.0)
+
+        # And the bucket refills while idle
+        mock_time.return_value = 110.0
+        self.assertEqual(limiter.acquire(), 0)
+
+    @mock.patch('poogle.ratelimit.time.sleep')
+    @mock.patch('poogle.ratelimit.random.uniform')
+    def test_token_bucket_jitter(self, mock_uniform, mock_sleep):
+
+        mock_uniform.return_value = 0.25
+        limiter = ratelimit.TokenBucketLimiter(1, jitter=0.5)
+
+        self.assertEqual(limiter.acquire(), 0)
+        self.assertAlmostEqual(limiter.acquire(), 1.25, places=2)
+        mock_uniform.assert_called_once_with(0, 0.5)
+
+    @mock.patch('poogle.ratelimit.time.sleep')
+    @mock.patch('poogle.ratelimit.time.time')
+    def test_limiter_timeout(self, mock_time, mock_sleep):
+
+        mock_time.return_value = 100.0
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        for limiter in (ratelimit.IntervalLimiter(1), ratelimit.TokenBucketLimiter(1),
+                        ratelimit.FileLockLimiter(path, 1)):
+            self.assertEqual(limiter.acquire(0.5), 0)
+
+            # Waits longer than the timeout are refused without using up the request
+            self.assertRaises(PoogleTimeoutError, limiter.acquire, 0.5)
+            self.assertEqual(limiter.acquire(1.0), 1.0)
+
+        mock_sleep.assert_has_calls([mock.call(1.0)] * 3)
+
+    def test_token_bucket_bad_arguments(self):
+        self.assertRaises(ValueError, ratelimit.TokenBucketLimiter, 0)
+        self.assertRaises(ValueError, ratelimit.TokenBucketLimiter, 1, 0)
+
+    @mock.patch('poogle.ratelimit.time.sleep')
+    @mock.patch('poogle.ratelimit.time.time')
+    def test_file_lock_limiter(self, mock_time, mock_sleep):
+
+        mock_time.return_value = 100.0
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        # Separate limiters pointed at the same file draw from the same bucket
+        first = ratelimit.FileLockLimiter(path, 1, burst=2)
+        second = ratelimit.FileLockLimiter(path, 1, burst=2)
+
+        self.assertEqual(first.acquire(), 0)
+        self.assertEqual(second.acquire(), 0)
+        self.assertEqual(first.acquire(), 1.0)
+        self.assertEqual(second.acquire(), 2.0)
+
+    def test_create_limiter(self):
+        self.assertIsNone(ratelimit.create_limiter())
+        self.assertIsInstance(ratelimit.create_limiter(2, 5), ratelimit.TokenBucketLimiter)
+        self.assertIsInstance(ratelimit.create_limiter(2, lock_file='/tmp/poogle.lock'), ratelimit.FileLockLimiter)
+
+    @mock.patch('requests.Session.get')
+    @mock.patch('poogle.sleep')
+    def test_default_limiter(self, mock_sleep, mock_get):
+
+        mock_get_response = mock.Mock()
+        mock_get_response.content = self.html
+        mock_get.return_value = mock_get_response
+
+        limiter = mock.Mock()
+        ratelimit.set_default_limiter(limiter)
+        self.addCleanup(ratelimit.set_default_limiter, None)
+
+        self.assertIs(poogle.Poogle('test')._limiter, limiter)
+        self.assertIsNone(poogle.Poogle('test', limiter=None)._limiter)
+
+        # Fixed pauses are replaced by the limiter
+        poogle.google_search('test', 30)
+        self.assertEqual(limiter.acquire.call_count, 2)
+        mock_sleep.assert_not_called()
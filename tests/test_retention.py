@@ -0,0 +1,86 @@
+import os
+import unittest
+
+from mock import mock
+
+import poogle
+from poogle import containers, retention
+
+
+class PoogleRetentionTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        with open(os.path.join(os.path.dirname(__file__), 'html', 'test.html'), 'r') as f:
+            self.html = f.read()
+
+    def fetch(self, pages, **kwargs):
+        with mock.patch.object(poogle.Poogle, '_fetch', return_value=self.html):
+            obj = poogle.Poogle('test', 20, **kwargs)
+            for __ in range(pages):
+                obj.next_page()
+        return obj
+
+    def test_keep_all(self):
+
+        obj = self.fetch(3)
+        self.assertEqual(len(obj._results), 3)
+        self.assertEqual([n for n, __ in obj._results], [1, 2, 3])
+        self.assertEqual(len(obj._results._pages), 3)
+
+        results = obj.results
+        self.assertIsInstance(results, retention.ResultsView)
+        self.assertEqual(len(results), 60)
+        self.assertEqual(results, list(results))
+        self.assertIs(results[20], obj._results[1][1].results[0])
+        self.assertIs(results[-1], obj.last.results[-1])
+        self.assertEqual(len(results[15:25]), 10)
+        self.assertRaises(IndexError, results.__getitem__, 60)
+
+    def test_drop(self):
+
+        obj = self.fetch(3, keep_pages=1)
+        self.assertEqual(len(obj._results._pages), 1)
+        self.assertIsNone(obj._results[0][1])
+        self.assertIs(obj._results[2][1], obj.last)
+
+        # Positions are unaffected by dropped pages
+        results = obj.results
+        self.assertEqual(len(results), 60)
+        self.assertRaises(IndexError, results.__getitem__, 0)
+        self.assertIs(results[40], obj.last.results[0])
+        self.assertEqual(len(list(results)), 20)
+
+    def test_spill(self):
+
+        obj = self.fetch(3, keep_pages=1, spill_pages=True)
+        self.assertEqual(len(obj._results._pages), 1)
+        self.assertEqual(len(obj._results._spilled), 2)
+
+        # Spilled pages are rebuilt from disk
+        page = obj._results[0][1]
+        self.assertIsInstance(page, containers.PoogleResultsPage)
+        self.assertEqual(page.number, obj.last.number)
+        self.assertEqual([r.title for r in page.results], [r.title for r in obj.last.results])
+
+        results = obj.results
+        self.assertEqual(len(list(results)), 60)
+        self.assertEqual(results[5].url.as_string(), obj.last.results[5].url.as_string())
+
+        obj.close()
+        self.assertIsNone(obj._results._file)
+
+    def test_iteration(self):
+
+        with mock.patch.object(poogle.Poogle, '_fetch', return_value=self.html):
+            obj = poogle.Poogle('test', 20, keep_pages=1)
+
+            # Only the page being iterated over is kept
+            iterator = iter(obj)
+            self.assertEqual(len([next(iterator) for __ in range(50)]), 50)
+            self.assertEqual(len(obj._results), 3)
+            self.assertEqual(len(obj._results._pages), 1)
+
+    def test_bad_arguments(self):
+
+        self.assertRaises(ValueError, poogle.Poogle, 'test', keep_pages=0)
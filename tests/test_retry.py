@@ -0,0 +1,202 @@
+import io
+import os
+import unittest
+
+import requests
+from mock import mock
+from requests import RequestException
+
+import poogle
+from poogle import retry
+from poogle.errors import PoogleRequestError, PoogleThrottledError, PoogleTimeoutError
+
+
+class PoogleRetryPolicyTestCase(unittest.TestCase):
+
+    def test_parse_retry_after(self):
+
+        self.assertEqual(retry.parse_retry_after('120'), 120.0)
+        self.assertIsNone(retry.parse_retry_after(None))
+        self.assertIsNone(retry.parse_retry_after('soon'))
+
+        with mock.patch('time.time', return_value=784111717.0):
+            self.assertEqual(retry.parse_retry_after('Sun, 06 Nov 1994 08:49:37 GMT'), 60.0)
+
+    def test_is_captcha(self):
+
+        self.assertTrue(retry.is_captcha('https://www.google.com/sorry/index?continue=https://www.google.com/search'))
+        self.assertFalse(retry.is_captcha('https://www.google.com/search?q=sorry'))
+
+        # Text and bytes URLs are both checked
+        self.assertTrue(retry.is_captcha(u'https://www.google.com/sorry/index'))
+        self.assertTrue(retry.is_captcha(b'https://www.google.com/sorry/index'))
+        self.assertFalse(retry.is_captcha(None))
+
+    def test_backoff(self):
+
+        policy = retry.RetryPolicy(retries=3, backoff=1.0, max_backoff=3.0, jitter=0)
+        error = PoogleRequestError('Service Unavailable')
+
+        self.assertEqual([policy.delay(n, error) for n in range(4)], [1.0, 2.0, 3.0, None])
+
+        # Throttled requests wait at least as long as Google asks
+        self.assertEqual(policy.delay(0, PoogleThrottledError('Throttled', 30.0)), 30.0)
+
+        policy.retry_errors = False
+        self.assertIsNone(policy.delay(0, error))
+        self.assertEqual(policy.delay(0, PoogleThrottledError('Throttled')), 1.0)
+
+    @mock.patch('random.uniform', return_value=0.25)
+    def test_backoff_jitter(self, mock_uniform):
+
+        policy = retry.RetryPolicy(backoff=1.0, jitter=0.5)
+        self.assertEqual(policy.delay(1, PoogleRequestError()), 2.25)
+        mock_uniform.assert_called_once_with(0, 0.5)
+
+
+class PoogleCircuitBreakerTestCase(unittest.TestCase):
+
+    @mock.patch('time.sleep')
+    @mock.patch('time.time')
+    def test_error_rate(self, mock_time, mock_sleep):
+
+        mock_time.return_value = 100.0
+        limiter = mock.Mock()
+        limiter.acquire.return_value = 0.0
+        breaker = retry.CircuitBreaker(limiter, threshold=0.5, window=4, min_requests=4, cooldown=10.0)
+
+        breaker.record()
+        breaker.record(PoogleRequestError())
+        breaker.record()
+        self.assertFalse(breaker.is_open)
+
+        # Two of the last four requests failed
+        breaker.record(PoogleRequestError())
+        self.assertTrue(breaker.is_open)
+
+        mock_sleep.side_effect = lambda seconds: mock_time.configure_mock(return_value=mock_time() + seconds)
+        self.assertEqual(breaker.acquire(), 10.0)
+        mock_sleep.assert_called_once_with(10.0)
+        limiter.acquire.assert_called_once_with()
+        self.assertFalse(breaker.is_open)
+
+    @mock.patch('time.time', return_value=100.0)
+    def test_throttled(self, mock_time):
+
+        breaker = retry.CircuitBreaker(cooldown=60.0)
+
+        breaker.record(PoogleThrottledError('Throttled', 5.0))
+        self.assertEqual(breaker._until, 105.0)
+
+        # The circuit is only ever held open for longer
+        breaker.record(PoogleThrottledError('Throttled'))
+        self.assertEqual(breaker._until, 160.0)
+        breaker.record(PoogleThrottledError('Throttled', 5.0))
+        self.assertEqual(breaker._until, 160.0)
+
+
+    @mock.patch('time.sleep')
+    @mock.patch('time.time')
+    def test_acquire_timeout(self, mock_time, mock_sleep):
+
+        mock_time.return_value = 100.0
+        limiter = mock.Mock()
+        limiter.acquire.return_value = 0.0
+        breaker = retry.CircuitBreaker(limiter, cooldown=60.0)
+        breaker.record(PoogleThrottledError('Throttled'))
+
+        # An open circuit is never waited on for longer than the timeout
+        self.assertRaises(PoogleTimeoutError, breaker.acquire, 5.0)
+        mock_sleep.assert_not_called()
+        limiter.acquire.assert_not_called()
+
+        # And the wrapped limiter gets the rest of it
+        mock_time.return_value = 161.0
+        breaker.acquire(5.0)
+        limiter.acquire.assert_called_once_with(5.0)
+
+
+class PoogleRetryTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        with open(os.path.join(os.path.dirname(__file__), 'html', 'test.html'), 'r') as f:
+            self.ok = mock.Mock(content=f.read(), status_code=200, url='https://www.google.com/search')
+
+    @mock.patch('poogle.sleep')
+    @mock.patch('requests.Session.get')
+    def test_retry_throttled(self, mock_get, mock_sleep):
+
+        throttled = mock.Mock(status_code=429, headers={'Retry-After': '7'})
+        mock_get.side_effect = [throttled, RequestException('Connection reset'), self.ok]
+
+        breaker = mock.Mock()
+        obj = poogle.Poogle('test', retry=retry.RetryPolicy(retries=2, jitter=0), limiter=breaker)
+
+        self.assertEqual(len(obj.results), 20)
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(mock_sleep.call_args_list, [mock.call(7.0), mock.call(2.0)])
+
+        # Every outcome is reported to the limiter, so it can pause other searches sharing it
+        self.assertEqual(breaker.acquire.call_count, 3)
+        errors = [c[0][0] for c in breaker.record.call_args_list]
+        self.assertIsInstance(errors[0], PoogleThrottledError)
+        self.assertEqual(errors[0].retry_after, 7.0)
+        self.assertIsInstance(errors[1], PoogleRequestError)
+        self.assertIsNone(errors[2])
+
+    @mock.patch('poogle.sleep')
+    @mock.patch('requests.Session.get')
+    def test_retries_exhausted(self, mock_get, mock_sleep):
+
+        captcha = mock.Mock(status_code=200, url='https://www.google.com/sorry/index')
+        mock_get.return_value = captcha
+
+        obj = poogle.Poogle('test', retry=retry.RetryPolicy(retries=1, jitter=0))
+        self.assertRaises(PoogleThrottledError, obj.next_page)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    @mock.patch('poogle.sleep')
+    @mock.patch('requests.Session.get')
+    def test_no_retry_by_default(self, mock_get, mock_sleep):
+
+        mock_get.return_value = mock.Mock(status_code=503, headers={})
+
+        obj = poogle.Poogle('test')
+        self.assertRaises(PoogleThrottledError, obj.next_page)
+        self.assertEqual(mock_get.call_count, 1)
+        mock_sleep.assert_not_called()
+
+        # The response is released, so its connection can be reused
+        mock_get.return_value.close.assert_called_once_with()
+
+    @mock.patch('poogle.sleep')
+    @mock.patch('requests.Session.get')
+    def test_retry_server_errors_only(self, mock_get, mock_sleep):
+
+        def error_response(status):
+            response = requests.Response()
+            response.status_code = status
+            response.url = 'https://www.google.com/search'
+            response.raw = io.BytesIO(b'Error')
+            return response
+
+        policy = retry.RetryPolicy(retries=2, jitter=0)
+
+        # Client errors are permanent
+        mock_get.return_value = error_response(404)
+        with self.assertRaises(PoogleRequestError) as error:
+            poogle.Poogle('test', retry=policy).next_page()
+        self.assertEqual(error.exception.status, 404)
+        self.assertEqual(mock_get.call_count, 1)
+        mock_sleep.assert_not_called()
+
+        mock_get.reset_mock()
+        mock_get.return_value = None
+        mock_get.side_effect = [error_response(500), self.ok]
+        self.assertEqual(len(poogle.Poogle('test', retry=policy).results), 20)
+        self.assertEqual(mock_get.call_count, 2)
+
+        self.assertTrue(policy.transient(PoogleRequestError('Connection reset')))
+        self.assertFalse(policy.transient(PoogleRequestError('Forbidden', 403)))
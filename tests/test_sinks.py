@@ -0,0 +1,138 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import mock
+
+import poogle
+from poogle import sinks
+
+
+class PoogleSinksTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        with open(os.path.join(os.path.dirname(__file__), 'html', 'test.html'), 'r') as f:
+            self.html = f.read()
+
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tmp_dir)
+
+    def page(self):
+        with mock.patch.object(poogle.Poogle, '_fetch', return_value=self.html):
+            return poogle.Poogle('test', 20).next_page()
+
+    def test_batches(self):
+
+        page = self.page()
+        sink = sinks.ResultSink(batch_size=30)
+        sink._write_batch = mock.Mock()
+
+        sink.write_page('first', page, fetched=100.0)
+        sink._write_batch.assert_not_called()
+
+        # Batches are written once full
+        sink.write_page('second', page, rank=21, fetched=200.0)
+        self.assertEqual(sink._write_batch.call_count, 1)
+
+        batch = sink._write_batch.call_args[0][0]
+        self.assertEqual(sorted(batch), sorted(sinks.COLUMNS))
+        self.assertEqual(batch['query'], ['first'] * 20 + ['second'] * 20)
+        self.assertEqual(batch['rank'], list(range(1, 41)))
+        self.assertEqual(batch['page'], [1] * 40)
+        self.assertEqual(batch['url'][0], 'http://www.speedtest.net/')
+        self.assertEqual(batch['fetched'][19:21], [100.0, 200.0])
+
+        # The rest is written when the sink is closed
+        sink.write_results('third', page.results[:5])
+        sink.close()
+        self.assertEqual(sink._write_batch.call_count, 2)
+        self.assertEqual((sink.rows, sink.batches), (45, 2))
+
+        self.assertRaises(ValueError, sink.write_page, 'fourth', page)
+        self.assertRaises(ValueError, sinks.ResultSink, 0)
+
+    def test_csv(self):
+
+        path = os.path.join(self.tmp_dir, 'results.csv')
+        with sinks.create_sink(path, batch_size=10) as sink:
+            sink.write_page('test', self.page(), fetched=100.0)
+        self.assertIsInstance(sink, sinks.CSVSink)
+        self.assertEqual(sink.batches, 1)
+
+        with io.open(path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.reader(f))
+
+        self.assertEqual(rows[0], list(sinks.COLUMNS))
+        self.assertEqual(len(rows), 21)
+        self.assertEqual(rows[1][:3], ['test', '1', '1'])
+        self.assertEqual(rows[1][4:], ['http://www.speedtest.net/', '100.0'])
+
+    def test_jsonl(self):
+
+        output = io.StringIO()
+        with sinks.JSONLSink(output) as sink:
+            sink.write_page('test', self.page(), fetched=100.0)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(records), 20)
+        self.assertEqual(records[0], {'query': 'test', 'rank': 1, 'page': 1, 'url': 'http://www.speedtest.net/',
+                                      'title': 'Speedtest.net by Ookla - The Global Broadband Speed Test',
+                                      'fetched': 100.0})
+        self.assertEqual(records[-1]['rank'], 20)
+
+    def test_parquet(self):
+
+        path = os.path.join(self.tmp_dir, 'results.parquet')
+        if not sinks.ParquetSink.available():
+            self.assertRaises(ValueError, sinks.create_sink, path)
+            return
+
+        import pyarrow.parquet as pq
+
+        with sinks.create_sink(path, batch_size=10) as sink:
+            sink.write_page('test', self.page(), fetched=100.0)
+
+        table = pq.read_table(path)
+        self.assertEqual(table.num_rows, 20)
+        self.assertEqual(table.column_names, list(sinks.COLUMNS))
+        self.assertEqual(table.column('url')[0].as_py(), 'http://www.speedtest.net/')
+
+    def test_unknown_format(self):
+
+        self.assertRaises(ValueError, sinks.create_sink, os.path.join(self.tmp_dir, 'results.xml'))
+
+    @mock.patch.object(poogle.Poogle, '_fetch')
+    def test_search_sink(self, mock_fetch):
+
+        mock_fetch.return_value = self.html
+        sink = sinks.ResultSink()
+        sink._write_batch = mock.Mock()
+
+        # Searches only write the results they return
+        results = poogle.google_search('test', 25, 0, sink=sink)
+        sink.close()
+
+        batch = sink._write_batch.call_args[0][0]
+        self.assertEqual(batch['rank'], list(range(1, 26)))
+        self.assertEqual(batch['url'], [r.url_string for r in results])
+
+        # Poogle objects write every result on each page
+        sink = sinks.ResultSink()
+        sink._write_batch = mock.Mock()
+
+        search = poogle.Poogle('test', 20, sink=sink)
+        search.next_page()
+        search.next_page()
+        sink.close()
+
+        batch = sink._write_batch.call_args[0][0]
+        self.assertEqual(batch['rank'], list(range(1, 41)))
+        self.assertEqual(batch['query'], ['test'] * 40)